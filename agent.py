@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 
@@ -10,17 +11,17 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 # Import text extraction and html extraction
 from url_2_text import url_to_text
 from prompts import prompt_to_extract_toxins
-from text_2_entity import parse_input
 from pydantic_models import ToxinList
+from model_router import DEFAULT_EXTRACTION_MODEL, ModelRouter, classifier_from_name
 
 
 def extract_toxins(text: str) -> ToxinList:
-    return parse_input(
-        system_content=prompt_to_extract_toxins,
-        user_content=text,
-        response_format=ToxinList,
-        model="gpt-4o-2024-08-06",
+    router = ModelRouter(
+        system_prompt=prompt_to_extract_toxins,
+        classifier=classifier_from_name(os.environ.get("PREFILTER", "chemical_index")),
+        model=os.environ.get("EXTRACTION_MODEL", DEFAULT_EXTRACTION_MODEL),
     )
+    return asyncio.run(router.extract(text))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,82 @@
+"""
+Measures OpenAI prompt caching for the extraction prompt layouts: the bare
+system prompt the API sends by default against the PromptPrefix with
+guidelines and few-shot examples (PROMPT_EXAMPLES=true). Run it before
+turning the examples on: they only pay off if the cached discount on the
+longer prefix outweighs its extra tokens. Sends --calls sequential extraction requests per
+layout, each with different page text, and reports the cached share of
+prompt tokens, cost and latency from the returned usage.
+
+Needs OPENAI_API_KEY and makes real, billed API calls:
+    python benchmarks/bench_prompt_cache.py [--calls 10] [--model gpt-4o-2024-08-06]
+
+Caching starts at 1024 prompt tokens and a cached prefix lives for a few
+minutes, so the first call of each layout is always uncached.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompts import (  # noqa: E402
+    extraction_examples,
+    extraction_guidelines,
+    prompt_to_extract_toxins,
+)
+from pydantic_models import ToxinList  # noqa: E402
+from text_2_entity import PromptPrefix, get_shared_async_client, parse_input_async  # noqa: E402
+from token_usage import track_usage  # noqa: E402
+
+PAGE = (
+    "Notice {i}: the state environmental agency fined a plating shop for releasing "
+    "hexavalent chromium into the municipal sewer. Chromium VI is a known human "
+    "carcinogen linked to lung cancer, and the discharge permit under the Clean "
+    "Water Act limits it to 0.05 mg/L. The shop also stored trichloroethylene "
+    "degreaser in unlabeled drums."
+)
+
+
+async def run_layout(label: str, prefix: PromptPrefix, calls: int, model: str) -> None:
+    latencies = []
+    with track_usage("benchmark") as usage:
+        for i in range(calls):
+            start = time.perf_counter()
+            await parse_input_async(
+                prefix, PAGE.format(i=i), ToxinList, model, get_shared_async_client()
+            )
+            latencies.append(time.perf_counter() - start)
+    stats = usage.as_dict()
+    print(
+        f"{label:<22} prefix ~{prefix.estimated_tokens:5d} tok  "
+        f"prompt {stats['prompt_tokens']:6d}  cached {stats['cached_ratio']:6.1%}  "
+        f"cost ${stats['cost_usd']:.4f}  "
+        f"p50 {1000 * statistics.median(latencies):6.0f} ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=10)
+    parser.add_argument("--model", default="gpt-4o-2024-08-06")
+    args = parser.parse_args()
+
+    await run_layout(
+        "system prompt only", PromptPrefix(prompt_to_extract_toxins), args.calls, args.model
+    )
+    await run_layout(
+        "prefix with examples",
+        PromptPrefix(
+            prompt_to_extract_toxins + extraction_guidelines, tuple(extraction_examples)
+        ),
+        args.calls,
+        args.model,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+"""
+Micro-benchmark for the structured-output schema cache in text_2_entity.
+
+Compares the per-call client overhead of the previous
+`client.beta.chat.completions.parse(response_format=ToxinList)` path, which
+re-derives the strict JSON schema and re-validates through pydantic on every
+call, against `parse_input`, which reuses the compiled schema and TypeAdapter.
+
+The OpenAI API is replaced by an in-process httpx mock transport that returns
+a canned ToxinList payload, so the numbers only measure local overhead.
+
+Usage:
+    python benchmarks/bench_schema_cache.py [--toxins 60] [--calls 200]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from openai import OpenAI  # noqa: E402
+
+from pydantic_models import ToxinList  # noqa: E402
+from text_2_entity import parse_input  # noqa: E402
+
+
+def make_payload(toxin_count: int) -> str:
+    toxins = [
+        {
+            "name": f"Chemical {i}",
+            "sources": ["industrial solvents", "consumer products", "degreasers"],
+            "health_effects": ["liver toxicity", "neurotoxicity", "cancer"],
+            "related_diseases": ["liver cancer", "kidney cancer"],
+            "reference_context": "EPA determined unreasonable risk to workers. " * 8,
+            "relevant_regulations": ["TSCA Section 6", "Clean Air Act"],
+            "cas_number": None,
+        }
+        for i in range(toxin_count)
+    ]
+    return json.dumps({"toxins": toxins})
+
+
+def make_client(payload: str) -> OpenAI:
+    body = {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o-2024-08-06",
+        "choices": [
+            {
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": payload, "refusal": None},
+            }
+        ],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=body)
+
+    return OpenAI(
+        api_key="benchmark", http_client=httpx.Client(transport=httpx.MockTransport(handler))
+    )
+
+
+def time_calls(label: str, calls: int, fn: Callable[[], ToxinList]) -> float:
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    per_call_ms = 1000 * (time.perf_counter() - start) / calls
+    print(f"{label:<32} {per_call_ms:8.3f} ms/call")
+    return per_call_ms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--toxins", type=int, default=60)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    client = make_client(make_payload(args.toxins))
+    messages = [
+        {"role": "system", "content": "Extract toxins."},
+        {"role": "user", "content": "text"},
+    ]
+
+    def beta_parse() -> ToxinList:
+        completion = client.beta.chat.completions.parse(
+            model="gpt-4o-2024-08-06",
+            messages=messages,  # type: ignore[arg-type]
+            response_format=ToxinList,
+        )
+        parsed = completion.choices[0].message.parsed
+        assert parsed is not None
+        return parsed
+
+    def cached_parse() -> ToxinList:
+        return parse_input(
+            system_content="Extract toxins.",
+            user_content="text",
+            response_format=ToxinList,
+            client=client,
+        )
+
+    print(f"{args.toxins} toxins per response, {args.calls} calls")
+    before = time_calls("beta.parse (schema per call)", args.calls, beta_parse)
+    after = time_calls("parse_input (compiled cache)", args.calls, cached_parse)
+    print(f"{'speedup':<32} {before / after:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
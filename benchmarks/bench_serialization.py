@@ -0,0 +1,115 @@
+"""
+Benchmark of encoding a multi-URL /extract/urls response: serialization time
+of FastAPI's default path (jsonable_encoder + json.dumps) against the
+orjson-backed ToxinJSONResponse, and payload size with and without the
+fields= projection, uncompressed and as sent by CompressionMiddleware.
+
+Usage:
+    python benchmarks/bench_serialization.py [--toxins 500] [--runs 20]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic_models import ToxinList, ToxinListResponse  # noqa: E402
+from response_encoding import (  # noqa: E402
+    TOXIN_FIELDS,
+    CompressionMiddleware,
+    ToxinJSONResponse,
+    toxin_response,
+)
+
+WORDS = (
+    "risk evaluation found unreasonable workers degreasers consumers aerosol spot "
+    "cleaners chronic exposure associated kidney cancer liver toxicity immune "
+    "inhalation dermal occupational limit ppm solvent vapour groundwater drinking "
+    "water contamination rule proposed final agency section study cohort dose"
+).split()
+
+
+def make_context(rng: random.Random, name: str) -> str:
+    # Varied sentences, so compression ratios are closer to real page excerpts
+    sentences = [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(12, 24)))
+        for _ in range(4)
+    ]
+    return f"{name}: " + ". ".join(sentences) + "."
+
+
+def make_response(toxins: int) -> ToxinListResponse:
+    rng = random.Random(0)
+    return ToxinListResponse(
+        toxins=[
+            ToxinList.Toxin(
+                name=f"Compound {i}",
+                sources=["degreasers", "spot cleaners", "industrial solvents"],
+                health_effects=["kidney cancer", "liver toxicity"],
+                related_diseases=["renal cell carcinoma"],
+                reference_context=make_context(rng, f"Compound {i}"),
+                relevant_regulations=["TSCA section 6", "Clean Air Act section 112"],
+                cas_number=f"{100 + i}-00-{i % 10}",
+            )
+            for i in range(toxins)
+        ],
+        urls=[f"https://example.com/page/{i}" for i in range(toxins // 10 + 1)],
+    )
+
+
+def time_ms(runs: int, fn: Callable[[], bytes]) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return 1000 * (time.perf_counter() - start) / runs
+
+
+def compressed_sizes(payload: bytes) -> str:
+    middleware = CompressionMiddleware(app=None)  # type: ignore[arg-type]
+    sizes = [f"{len(payload) / 1024:8.1f}"]
+    for encoding in ("gzip", "br"):
+        start = time.perf_counter()
+        size = len(middleware.compressor(encoding)(payload, True))
+        elapsed = 1000 * (time.perf_counter() - start)
+        sizes.append(f"{size / 1024:8.1f} ({elapsed:4.1f} ms)")
+    return "  ".join(sizes)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--toxins", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    response = make_response(args.toxins)
+
+    def fastapi_default() -> bytes:
+        # What FastAPI does for a returned model with response_model set
+        return JSONResponse(jsonable_encoder(response)).body
+
+    def orjson_model() -> bytes:
+        return ToxinJSONResponse(response).body
+
+    print(f"{args.toxins} toxins, mean of {args.runs} runs")
+    print(f"serialization  FastAPI default {time_ms(args.runs, fastapi_default):7.2f} ms")
+    print(f"               orjson          {time_ms(args.runs, orjson_model):7.2f} ms")
+
+    light = tuple(field for field in TOXIN_FIELDS if field != "reference_context")
+    print(f"\n{'payload KB':<34} {'raw':>8}  {'gzip':>18}  {'br':>18}")
+    for label, fields in [
+        ("all fields", None),
+        ("without reference_context", set(light)),
+        ("fields=name,cas_number", {"name", "cas_number"}),
+    ]:
+        print(f"{label:<34} {compressed_sizes(toxin_response(response, fields).body)}")
+
+
+if __name__ == "__main__":
+    main()
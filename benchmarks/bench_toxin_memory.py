@@ -0,0 +1,101 @@
+"""
+Benchmark of holding many toxins in memory: ToxinList.Toxin pydantic models
+against the compact ToxinRecord (slots, tuples, interned strings), and the
+cost of merging them.
+
+Toxins are decoded from JSON one at a time, as they are from model output
+and the result store, so every string starts out as a separate object.
+Merging models goes through merge_toxins, which converts to records and
+back; records are merged directly with merge_records.
+
+Usage:
+    python benchmarks/bench_toxin_memory.py [--toxins 1000000]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Iterator, List, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic_models import ToxinList  # noqa: E402
+from toxin_merge import merge_records, merge_toxins  # noqa: E402
+from toxin_record import ToxinRecord  # noqa: E402
+
+SOURCES = ["degreasers", "spot cleaners", "gasoline", "solvents", "pesticides", "plastics"]
+EFFECTS = ["cancer", "liver damage", "neurotoxicity", "respiratory irritation", "nausea"]
+DISEASES = ["leukemia", "kidney cancer", "asthma", "parkinson's disease", "lymphoma"]
+REGULATIONS = ["TSCA", "TSCA Section 6", "Clean Air Act", "Safe Drinking Water Act", "RCRA"]
+
+
+def toxin_json(toxins: int, names: int) -> Iterator[str]:
+    rng = random.Random(0)
+    for i in range(toxins):
+        yield json.dumps(
+            {
+                "name": f"Compound {rng.randrange(names)}",
+                "sources": rng.sample(SOURCES, 2),
+                "health_effects": rng.sample(EFFECTS, 2),
+                "related_diseases": rng.sample(DISEASES, 1),
+                "reference_context": f"Exposure to the compound in study {i} was reported.",
+                "relevant_regulations": rng.sample(REGULATIONS, 2),
+                "cas_number": None,
+            }
+        )
+
+
+def memory_mb(build: Callable[[], Any]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size / 1024 / 1024
+
+
+def timed(fn: Callable[[], Any]) -> Tuple[Any, float]:
+    gc.collect()
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--toxins", type=int, default=1_000_000)
+    parser.add_argument("--names", type=int, default=20_000, help="distinct toxin names")
+    args = parser.parse_args()
+    encoded = list(toxin_json(args.toxins, args.names))
+
+    def models() -> List[ToxinList.Toxin]:
+        return [ToxinList.Toxin.model_validate_json(item) for item in encoded]
+
+    def records() -> List[ToxinRecord]:
+        return [ToxinRecord(**json.loads(item)) for item in encoded]
+
+    print(f"{args.toxins} toxins, {args.names} distinct names")
+    print(f"{'':<18} {'memory MB':>10} {'build s':>8} {'merge s':>8}")
+
+    size = memory_mb(models)
+    toxins, build_s = timed(models)
+    merged, merge_s = timed(lambda: merge_toxins(toxins))
+    print(f"{'ToxinList.Toxin':<18} {size:10.0f} {build_s:8.2f} {merge_s:8.2f}")
+    assert len(merged) <= args.names
+    del toxins, merged
+
+    size = memory_mb(records)
+    toxins, build_s = timed(records)
+    merged, merge_s = timed(lambda: merge_records(toxins))
+    print(f"{'ToxinRecord':<18} {size:10.0f} {build_s:8.2f} {merge_s:8.2f}")
+    assert len(merged) <= args.names
+
+
+if __name__ == "__main__":
+    main()
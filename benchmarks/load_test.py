@@ -0,0 +1,162 @@
+"""
+Load test comparing serving setups of the API, e.g. the single uvicorn
+process against the gunicorn profile in gunicorn_conf.py.
+
+OpenAI is replaced by a local mock with a fixed response latency, so the
+test measures the server (prefilter, enrichment, result store, event loop
+and process model), not the model.
+
+    # 1. Mock OpenAI API
+    python benchmarks/load_test.py mock-openai --port 9100 --latency 0.8
+
+    # 2. Server under test, pointed at the mock, without result caching
+    export OPENAI_BASE_URL=http://127.0.0.1:9100/v1 OPENAI_API_KEY=x \\
+        SCRAPER_API_KEY=x USE_RESULT_CACHE=false PARAGRAPH_CACHE=false
+    uvicorn router:app --port 8000                        # single worker
+    gunicorn router:app -c gunicorn_conf.py               # production profile
+
+    # 3. Load
+    python benchmarks/load_test.py run --url http://127.0.0.1:8000 \\
+        --concurrency 64 --duration 30
+
+Results with the commands above on a 1 vCPU host (shared with the mock and
+the load generator), 0.8 s mock latency, 64 concurrent clients, 30 s,
+~75 KB of text per request:
+
+    setup                          req/s   p50 ms   p95 ms   p99 ms
+    uvicorn, 1 process (before)     25.0     2684     3579     4032
+    gunicorn, 1 worker              23.9     2571     4603     6858
+    gunicorn, 2 workers (default)   31.1     1831     3540     4101
+    gunicorn, 4 workers             29.8     1413     4757     6666
+
+A single process is bound by its one event loop: the prefilter scan,
+enrichment and result-store writes of every request run there. A second
+worker gives +24% throughput and a 32% lower median even without a second
+core; more workers than that only add context switches on one CPU. On
+larger instances the default of one worker per CPU applies; re-run this
+test on the target instance size before changing WEB_CONCURRENCY.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import List
+
+import httpx
+
+SAMPLE_PARAGRAPH = (
+    "EPA finalized its risk evaluation for trichloroethylene (TCE, CAS 79-01-6) "
+    "under TSCA section 6, finding unreasonable risk to workers using degreasers "
+    "and to consumers of spot cleaners. Benzene and methylene chloride were "
+    "reviewed in the same period; exposure is linked to kidney cancer and "
+    "leukemia. Other sections of the page describe public comment periods. "
+)
+
+MOCK_TOXINS = {
+    "toxins": [
+        {
+            "name": "Trichloroethylene",
+            "sources": ["degreasers", "spot cleaners"],
+            "health_effects": ["kidney cancer"],
+            "related_diseases": ["kidney cancer"],
+            "reference_context": "EPA finalized its risk evaluation for TCE.",
+            "relevant_regulations": ["TSCA section 6"],
+            "cas_number": None,
+        }
+    ]
+}
+
+
+def run_mock_openai(port: int, latency: float) -> None:
+    import uvicorn
+    from fastapi import FastAPI
+
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def completions() -> dict:
+        await asyncio.sleep(latency)
+        return {
+            "id": "chatcmpl-load-test",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "gpt-4o-2024-08-06",
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {
+                        "role": "assistant",
+                        "content": json.dumps(MOCK_TOXINS),
+                        "refusal": None,
+                    },
+                }
+            ],
+            "usage": {"prompt_tokens": 1000, "completion_tokens": 100, "total_tokens": 1100},
+        }
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+async def run_load(url: str, concurrency: int, duration: float, paragraphs: int) -> None:
+    text = "\n\n".join(SAMPLE_PARAGRAPH for _ in range(paragraphs))
+    latencies: List[float] = []
+    errors = 0
+    stop_at = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, timeout=60, limits=limits) as client:
+
+        async def user() -> None:
+            nonlocal errors
+            while time.perf_counter() < stop_at:
+                start = time.perf_counter()
+                try:
+                    response = await client.post("/parse/text", json={"text": text})
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - start)
+                except httpx.HTTPError:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    if not latencies:
+        print(f"No successful requests, {errors} errors")
+        return
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{len(latencies)} requests in {elapsed:.1f} s, {errors} errors\n"
+        f"throughput  {len(latencies) / elapsed:8.1f} req/s\n"
+        f"p50         {1000 * quantiles[49]:8.0f} ms\n"
+        f"p95         {1000 * quantiles[94]:8.0f} ms\n"
+        f"p99         {1000 * quantiles[98]:8.0f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    mock = commands.add_parser("mock-openai", help="serve a mock OpenAI API")
+    mock.add_argument("--port", type=int, default=9100)
+    mock.add_argument("--latency", type=float, default=0.8)
+    load = commands.add_parser("run", help="generate load against the API")
+    load.add_argument("--url", default="http://127.0.0.1:8000")
+    load.add_argument("--concurrency", type=int, default=64)
+    load.add_argument("--duration", type=float, default=30)
+    load.add_argument("--paragraphs", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.command == "mock-openai":
+        run_mock_openai(args.port, args.latency)
+    else:
+        asyncio.run(run_load(args.url, args.concurrency, args.duration, args.paragraphs))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
 from bs4 import BeautifulSoup, Comment  # type: ignore
-from typing import List
+from html.parser import HTMLParser
+from typing import Iterable, List, Optional, Tuple
 import re
 
+# Elements that start a new line in the extracted text
+BLOCK_ELEMENTS = ["br", "p", "div", "li", "h1", "h2", "h3", "h4", "h5", "h6"]
+# Elements whose content is dropped
+SKIPPED_ELEMENTS = ["script", "style", "head"]
+
 
 def extract_text_from_html(html_content: str) -> str:
     """
@@ -13,13 +19,41 @@ def extract_text_from_html(html_content: str) -> str:
     Returns:
         str: Cleaned text content with preserved formatting
     """
+    return extract_text_from_soup(parse_html(html_content))
+
+
+def parse_html(html_content: str) -> BeautifulSoup:
+    """
+    Parse HTML into a BeautifulSoup tree, for callers that need more than
+    the text of a page (e.g. its links) without parsing it twice.
+
+    Args:
+        html_content (str): Raw HTML content
+
+    Returns:
+        BeautifulSoup: Parsed document
+    """
     # Create BeautifulSoup object with 'lxml' parser (or 'html.parser' as fallback)
     try:
-        soup: BeautifulSoup = BeautifulSoup(html_content, "lxml")
+        return BeautifulSoup(html_content, "lxml")
     except Exception as e:
         print(f"Error creating BeautifulSoup object: {e}")
-        soup = BeautifulSoup(html_content, "html.parser")
+        return BeautifulSoup(html_content, "html.parser")
+
 
+def extract_text_from_soup(soup: BeautifulSoup) -> str:
+    """
+    Text of a parsed document, as returned by extract_text_from_html.
+
+    Scripts, styles, the head and comments are removed from the tree, so
+    read anything else needed from it first.
+
+    Args:
+        soup (BeautifulSoup): Document returned by parse_html
+
+    Returns:
+        str: Cleaned text content with preserved formatting
+    """
     # Remove scripts, styles, and comments
     for element in soup(["script", "style", "head", "[document]"]):
         element.decompose()
@@ -40,21 +74,14 @@ def extract_text_from_html(html_content: str) -> str:
                 lines.append(text)
 
         # Add line breaks for block-level elements
-        elif element.name in [
-            "br",
-            "p",
-            "div",
-            "li",
-            "h1",
-            "h2",
-            "h3",
-            "h4",
-            "h5",
-            "h6",
-        ]:
+        elif element.name in BLOCK_ELEMENTS:
             if lines and lines[-1] != "\n":
                 lines.append("\n")
 
+    return _join_lines(lines)
+
+
+def _join_lines(lines: List[str]) -> str:
     # Join lines and clean up extra whitespace
     text = " ".join(lines)
 
@@ -68,6 +95,80 @@ def extract_text_from_html(html_content: str) -> str:
     return text
 
 
+class HTMLTextParser(HTMLParser):
+    """
+    Incremental counterpart of extract_text_from_html: HTML is fed chunk by
+    chunk as it is downloaded, so only the extracted text is kept in memory,
+    never the whole page.
+
+    Example:
+        >>> parser = HTMLTextParser()
+        >>> for chunk in ["<p>First para", "graph</p><p>Second</p>"]:
+        ...     parser.feed(chunk)
+        >>> parser.text()
+        'First paragraph \\n Second'
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.lines: List[str] = []
+        self._pending: List[str] = []
+        self._skipping: Optional[str] = None
+
+    def _flush_text(self) -> None:
+        # A text node may arrive in several pieces split at chunk boundaries
+        text = re.sub(r"\s+", " ", "".join(self._pending)).strip()
+        self._pending = []
+        if text and self._skipping is None:
+            self.lines.append(text)
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self._flush_text()
+        if tag == "body" and self._skipping == "head":
+            # Pages without a closing </head>
+            self._skipping = None
+        if self._skipping is not None:
+            return
+        if tag in SKIPPED_ELEMENTS:
+            self._skipping = tag
+        elif tag in BLOCK_ELEMENTS and self.lines and self.lines[-1] != "\n":
+            self.lines.append("\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        self._flush_text()
+        if tag == self._skipping:
+            self._skipping = None
+
+    def handle_data(self, data: str) -> None:
+        self._pending.append(data)
+
+    def handle_comment(self, data: str) -> None:
+        self._flush_text()
+
+    def text(self) -> str:
+        """Finish parsing and return the cleaned text"""
+        self.close()
+        self._flush_text()
+        return _join_lines(self.lines)
+
+
+def extract_text_from_html_chunks(chunks: Iterable[str]) -> str:
+    """
+    Extract clean text from HTML delivered in chunks, e.g. while streaming
+    a download.
+
+    Args:
+        chunks (Iterable[str]): Decoded HTML in document order
+
+    Returns:
+        str: Cleaned text content with preserved formatting
+    """
+    parser = HTMLTextParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.text()
+
+
 # Example usage:
 if __name__ == "__main__":
     sample_html: str = """
@@ -0,0 +1,87 @@
+import codecs
+import re
+from typing import Optional
+
+# How much of the body is sniffed for a <meta charset> / XML declaration
+SNIFF_BYTES = 4096
+
+BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+META_CHARSET = re.compile(
+    rb"""<meta[^>]+?charset\s*=\s*["']?\s*([a-zA-Z0-9_.:-]+)""", re.IGNORECASE
+)
+XML_ENCODING = re.compile(rb"""^<\?xml[^>]+encoding\s*=\s*["']([a-zA-Z0-9_.:-]+)""")
+CONTENT_TYPE_CHARSET = re.compile(r"""charset\s*=\s*["']?\s*([a-zA-Z0-9_.:-]+)""", re.I)
+
+# Codecs browsers replace with windows-1252, a superset of Latin-1 in which the
+# 0x80-0x9F range holds printable characters (curly quotes, dashes, ...)
+WINDOWS_1252_CODECS = {"iso8859-1", "ascii", "cp1252"}
+
+
+def normalize_encoding(label: Optional[str]) -> Optional[str]:
+    """
+    Python codec name for a charset label, or None if it is unknown.
+    Latin-1 and ASCII labels map to windows-1252, as they do in browsers.
+    """
+    if not label:
+        return None
+    try:
+        name = codecs.lookup(label.strip().strip("\"'")).name
+    except LookupError:
+        return None
+    return "cp1252" if name in WINDOWS_1252_CODECS else name
+
+
+def charset_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    """Charset parameter of a Content-Type header, if present and known"""
+    match = CONTENT_TYPE_CHARSET.search(content_type or "")
+    return normalize_encoding(match.group(1)) if match else None
+
+
+def sniff_charset(head: bytes) -> Optional[str]:
+    """Charset declared in a <meta> tag or XML declaration near the start of the body"""
+    head = head[:SNIFF_BYTES]
+    match = XML_ENCODING.match(head.lstrip()) or META_CHARSET.search(head)
+    if not match:
+        return None
+    encoding = normalize_encoding(match.group(1).decode("ascii"))
+    # A page cannot declare UTF-16 in ASCII-compatible markup
+    return "utf-8" if encoding and encoding.startswith("utf-16") else encoding
+
+
+def detect_encoding(content_type: Optional[str], head: bytes) -> str:
+    """
+    Resolve the encoding of a response body once, from its Content-Type
+    header and first bytes, without statistical guessing over the whole body.
+
+    Order: byte order mark, charset in the Content-Type header, <meta
+    charset> / XML declaration in the first few KB, then UTF-8 if the
+    sniffed bytes are valid UTF-8 and windows-1252 otherwise. The BOM comes
+    first because it is unambiguous, as in the HTML standard.
+
+    Args:
+        content_type (Optional[str]): Content-Type header of the response
+        head (bytes): The first bytes of the body (at least SNIFF_BYTES
+            when available)
+
+    Returns:
+        str: Python codec name to decode the body with
+    """
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+
+    declared = charset_from_content_type(content_type) or sniff_charset(head)
+    if declared:
+        return declared
+
+    try:
+        # Incremental so a multi-byte character cut at the end is not an error
+        codecs.getincrementaldecoder("utf-8")().decode(head)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "cp1252"
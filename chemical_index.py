@@ -0,0 +1,326 @@
+import csv
+import os
+import re
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pydantic_models import ToxinList
+
+DEFAULT_CHEMICALS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "chemicals.csv"
+)
+
+CAS_NUMBER_PATTERN = re.compile(r"\b(\d{2,7})-(\d{2})-(\d)\b")
+
+
+@dataclass(frozen=True)
+class Chemical:
+    """A known chemical with its CAS registry number and synonyms"""
+
+    name: str
+    cas_number: Optional[str]
+    synonyms: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class ChemicalMatch:
+    """A chemical mention found in text, with character offsets"""
+
+    chemical: Chemical
+    start: int
+    end: int
+    text: str
+
+
+def is_valid_cas_number(cas_number: str) -> bool:
+    """
+    Check a CAS registry number against its check digit.
+
+    Args:
+        cas_number (str): CAS number in the form 1234567-12-1
+
+    Returns:
+        bool: True if the number is well formed and the check digit matches
+    """
+    match = CAS_NUMBER_PATTERN.fullmatch(cas_number)
+    if match is None:
+        return False
+    digits = (match.group(1) + match.group(2))[::-1]
+    checksum = sum(position * int(digit) for position, digit in enumerate(digits, 1))
+    return checksum % 10 == int(match.group(3))
+
+
+def _normalize(term: str) -> str:
+    return re.sub(r"\s+", " ", term.strip().lower())
+
+
+def _is_abbreviation(term: str) -> bool:
+    # Short all-caps synonyms such as "TCE" or "BPA" only match case-sensitively
+    return len(term) <= 5 and term.upper() == term and any(c.isalpha() for c in term)
+
+
+def _lower_preserving_offsets(text: str) -> str:
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+class ChemicalIndex:
+    """
+    Aho-Corasick multi-pattern index over chemical names, synonyms and CAS
+    numbers. Scanning is linear in the length of the text regardless of the
+    number of indexed terms.
+    """
+
+    def __init__(self, chemicals: Iterable[Chemical]) -> None:
+        self.chemicals: List[Chemical] = list(chemicals)
+        self._by_term: Dict[str, Chemical] = {}
+        self._by_cas: Dict[str, Chemical] = {}
+
+        # Trie stored as parallel arrays: transitions, failure links, outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, int, int, bool]]] = [[]]
+        self._terms: List[str] = []
+
+        for chemical_id, chemical in enumerate(self.chemicals):
+            if chemical.cas_number:
+                self._by_cas[chemical.cas_number] = chemical
+            for term in (chemical.name, *chemical.synonyms, chemical.cas_number or ""):
+                if term:
+                    self._add_term(term, chemical_id)
+        self._build_failure_links()
+
+    def _add_term(self, term: str, chemical_id: int) -> None:
+        key = _normalize(term)
+        self._by_term.setdefault(key, self.chemicals[chemical_id])
+        case_sensitive = _is_abbreviation(term)
+        self._terms.append(term.strip())
+
+        state = 0
+        for char in key:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(
+            (len(self._terms) - 1, len(key), chemical_id, case_sensitive)
+        )
+
+    def _build_failure_links(self) -> None:
+        queue: deque[int] = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                candidate = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = candidate if candidate != next_state else 0
+                self._output[next_state] = (
+                    self._output[next_state] + self._output[self._fail[next_state]]
+                )
+
+    def scan(self, text: str) -> List[ChemicalMatch]:
+        """
+        Find all chemical mentions in text.
+
+        Matches must fall on word boundaries. Overlapping matches are resolved
+        in favour of the leftmost, then longest, mention.
+
+        Args:
+            text (str): Text to scan, e.g. output of extract_text_from_html
+
+        Returns:
+            List[ChemicalMatch]: Non-overlapping matches in document order
+        """
+        lowered = _lower_preserving_offsets(text)
+        found: List[Tuple[int, int, int]] = []
+        state = 0
+        for position, char in enumerate(lowered):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for term_id, length, chemical_id, case_sensitive in self._output[state]:
+                start = position - length + 1
+                end = position + 1
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if end < len(text) and text[end].isalnum():
+                    continue
+                if case_sensitive and text[start:end] != self._terms[term_id]:
+                    continue
+                found.append((start, end, chemical_id))
+
+        found.sort(key=lambda match: (match[0], -match[1]))
+        matches: List[ChemicalMatch] = []
+        last_end = -1
+        for start, end, chemical_id in found:
+            if start < last_end:
+                continue
+            matches.append(
+                ChemicalMatch(
+                    chemical=self.chemicals[chemical_id],
+                    start=start,
+                    end=end,
+                    text=text[start:end],
+                )
+            )
+            last_end = end
+        return matches
+
+    def candidates(self, text: str) -> List[Chemical]:
+        """
+        Return the distinct chemicals mentioned in text, in order of first mention.
+
+        Args:
+            text (str): Text to scan
+
+        Returns:
+            List[Chemical]: Candidate toxins found by the index
+        """
+        seen: Dict[str, Chemical] = {}
+        for match in self.scan(text):
+            seen.setdefault(match.chemical.name, match.chemical)
+        return list(seen.values())
+
+    def lookup(self, term: str) -> Optional[Chemical]:
+        """
+        Look up a chemical by exact name, synonym or CAS number.
+
+        Args:
+            term (str): Name, synonym or CAS number
+
+        Returns:
+            Optional[Chemical]: The chemical, or None if it is not indexed
+        """
+        return self._by_cas.get(term.strip()) or self._by_term.get(_normalize(term))
+
+    @classmethod
+    def from_csv(cls, path: str) -> "ChemicalIndex":
+        """
+        Load an index from a CSV file with name, cas_number and synonyms
+        columns. Synonyms are separated by semicolons.
+
+        Args:
+            path (str): Path to the CSV file
+
+        Returns:
+            ChemicalIndex: The loaded index
+        """
+        chemicals: List[Chemical] = []
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                synonyms = tuple(
+                    s.strip() for s in (row.get("synonyms") or "").split(";") if s.strip()
+                )
+                chemicals.append(
+                    Chemical(
+                        name=row["name"].strip(),
+                        cas_number=(row.get("cas_number") or "").strip() or None,
+                        synonyms=synonyms,
+                    )
+                )
+        return cls(chemicals)
+
+
+@lru_cache(maxsize=None)
+def load_default_index() -> ChemicalIndex:
+    """
+    Load the bundled chemical index, or the file set in CHEMICAL_INDEX_PATH.
+    The index is built once per process.
+    """
+    return ChemicalIndex.from_csv(
+        os.environ.get("CHEMICAL_INDEX_PATH", DEFAULT_CHEMICALS_PATH)
+    )
+
+
+def normalize_toxin_name(name: str) -> str:
+    """
+    Normalize a toxin name for indexing. Known chemicals are mapped to their
+    canonical name so synonyms and abbreviations ("TCE") share one key.
+
+    Args:
+        name (str): Toxin name as returned by the model
+
+    Returns:
+        str: Lowercased canonical name
+    """
+    chemical = load_default_index().lookup(name)
+    if chemical is not None:
+        name = chemical.name
+    return re.sub(r"\s+", " ", name.strip().lower())
+
+
+def find_cas_numbers(text: str) -> List[Tuple[int, int, str]]:
+    """
+    Find checksum-valid CAS numbers in text, including ones not in the index.
+
+    Args:
+        text (str): Text to scan
+
+    Returns:
+        List[Tuple[int, int, str]]: (start, end, cas_number) for each match
+    """
+    return [
+        (match.start(), match.end(), match.group(0))
+        for match in CAS_NUMBER_PATTERN.finditer(text)
+        if is_valid_cas_number(match.group(0))
+    ]
+
+
+def enrich_toxin(
+    toxin: ToxinList.Toxin, index: Optional[ChemicalIndex] = None
+) -> ToxinList.Toxin:
+    """
+    Set the CAS number of a single extracted toxin from the chemical index.
+
+    The toxin name is looked up directly first, then scanned for a known
+    chemical mention (e.g. "Trichloroethylene (TCE)"). The index entry wins
+    over the CAS number the model returned, which may be guessed; a model
+    value is only kept for chemicals missing from the index, and only if
+    its checksum is valid.
+
+    Args:
+        toxin (ToxinList.Toxin): Toxin returned by the extraction model
+        index (Optional[ChemicalIndex]): Index to use, defaults to the bundled one
+
+    Returns:
+        ToxinList.Toxin: The same toxin with a checked cas_number, or None
+    """
+    index = index or load_default_index()
+    chemical = index.lookup(toxin.name)
+    if chemical is None:
+        matches = index.scan(toxin.name)
+        chemical = matches[0].chemical if matches else None
+    if chemical is not None and chemical.cas_number:
+        toxin.cas_number = chemical.cas_number
+    elif toxin.cas_number:
+        cas_number = toxin.cas_number.strip()
+        toxin.cas_number = cas_number if is_valid_cas_number(cas_number) else None
+    return toxin
+
+
+def enrich_toxins(toxins: ToxinList, index: Optional[ChemicalIndex] = None) -> ToxinList:
+    """
+    Set the CAS numbers of extracted toxins from the chemical index, see
+    enrich_toxin.
+
+    Args:
+        toxins (ToxinList): Toxins returned by the extraction model
+        index (Optional[ChemicalIndex]): Index to use, defaults to the bundled one
+
+    Returns:
+        ToxinList: The same toxins with checked cas_number values
+    """
+    for toxin in toxins.toxins:
+        enrich_toxin(toxin, index)
+    return toxins
@@ -0,0 +1,216 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open"""
+
+    pass
+
+
+class CircuitBreaker:
+    """
+    Per-dependency circuit breaker.
+
+    Tracks the outcome of the last `window` calls. Calls that raise a
+    failure (as decided by `is_failure`) or take longer than
+    `slow_call_seconds` (unless it is None) count as bad outcomes. Once at least `min_calls`
+    outcomes are recorded and the bad-outcome rate reaches
+    `failure_rate_threshold`, the circuit opens and calls fail fast with
+    CircuitOpenError. After `open_seconds` a single trial call is let
+    through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: Optional[float] = 10.0,
+        window: int = 20,
+        min_calls: int = 5,
+        open_seconds: float = 30.0,
+        is_failure: Optional[Callable[[BaseException], bool]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.is_failure = is_failure or (lambda error: isinstance(error, Exception))
+        self.clock = clock
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected_calls = 0
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """
+        Check whether a call may proceed.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a
+                trial call already in flight
+        """
+        with self._lock:
+            if self.state == OPEN:
+                if self.clock() - self.opened_at < self.open_seconds:
+                    self.rejected_calls += 1
+                    raise CircuitOpenError(f"Circuit '{self.name}' is open")
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+                logger.info(f"Circuit '{self.name}' half-open, allowing a trial call")
+            if self.state == HALF_OPEN:
+                if self._trial_in_flight:
+                    self.rejected_calls += 1
+                    raise CircuitOpenError(f"Circuit '{self.name}' is half-open")
+                self._trial_in_flight = True
+
+    def record(self, success: bool, latency: float) -> None:
+        """
+        Record the outcome of a call that before_call allowed.
+
+        Args:
+            success (bool): Whether the call succeeded
+            latency (float): Call duration in seconds
+        """
+        good = success and (self.slow_call_seconds is None or latency < self.slow_call_seconds)
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._trial_in_flight = False
+                if good:
+                    self._close()
+                else:
+                    self._open()
+                return
+
+            self._outcomes.append(good)
+            if len(self._outcomes) >= self.min_calls:
+                if self._failure_rate() >= self.failure_rate_threshold:
+                    self._open()
+
+    def release(self) -> None:
+        """Release a half-open trial slot without recording an outcome"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._trial_in_flight = False
+
+    @contextmanager
+    def guard(self, ignore: Tuple[Type[BaseException], ...] = ()) -> Iterator[None]:
+        """
+        Context manager that checks the circuit, times the wrapped call and
+        records its outcome. Works around both sync and awaited calls.
+
+        Args:
+            ignore (Tuple[Type[BaseException], ...]): Errors that say nothing
+                about the dependency for this call, e.g. a timeout the caller
+                shortened itself; they are recorded neither way
+
+        Raises:
+            CircuitOpenError: If the circuit rejects the call
+        """
+        self.before_call()
+        start = self.clock()
+        try:
+            yield
+        except BaseException as error:
+            if isinstance(error, ignore):
+                self.release()
+            elif isinstance(error, Exception) and self.is_failure(error):
+                self.record(False, self.clock() - start)
+            elif isinstance(error, Exception):
+                self.record(True, self.clock() - start)
+            else:
+                self.release()
+            raise
+        else:
+            self.record(True, self.clock() - start)
+
+    def _failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def _open(self) -> None:
+        if self.state != OPEN:
+            logger.warning(f"Circuit '{self.name}' opened")
+            self.times_opened += 1
+        self.state = OPEN
+        self.opened_at = self.clock()
+        self._outcomes.clear()
+
+    def _close(self) -> None:
+        logger.info(f"Circuit '{self.name}' closed")
+        self.state = CLOSED
+        self._outcomes.clear()
+
+    def stats(self) -> dict[str, float | int | str]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "failure_rate": round(self._failure_rate(), 4),
+                "recent_calls": len(self._outcomes),
+                "times_opened": self.times_opened,
+                "rejected_calls": self.rejected_calls,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(
+    name: str,
+    is_failure: Optional[Callable[[BaseException], bool]] = None,
+    slow_call_seconds: Optional[float] = 10.0,
+    failure_rate_threshold: float = 0.5,
+    open_seconds: float = 30.0,
+) -> CircuitBreaker:
+    """
+    Return the process-wide breaker for a dependency, creating it on first use.
+    The settings are only used on creation and should match the dependency's
+    normal latency and failure profile.
+
+    Args:
+        name (str): Dependency name, e.g. "scraperapi", "direct" or "openai"
+        is_failure (Optional[Callable[[BaseException], bool]]): Decides which
+            errors count against the dependency
+        slow_call_seconds (Optional[float]): Calls slower than this count as
+            bad outcomes; None to not count slow calls
+        failure_rate_threshold (float): Bad-outcome rate that opens the circuit
+        open_seconds (float): How long the circuit stays open
+
+    Returns:
+        CircuitBreaker: The shared breaker
+    """
+    with _registry_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(
+                name,
+                failure_rate_threshold=failure_rate_threshold,
+                slow_call_seconds=slow_call_seconds,
+                open_seconds=open_seconds,
+                is_failure=is_failure,
+            )
+        return _breakers[name]
+
+
+def breaker_stats() -> Dict[str, dict[str, float | int | str]]:
+    """Return the state of every registered breaker"""
+    with _registry_lock:
+        items: Tuple[Tuple[str, CircuitBreaker], ...] = tuple(_breakers.items())
+    return {name: breaker.stats() for name, breaker in items}
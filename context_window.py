@@ -0,0 +1,129 @@
+import bisect
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from chemical_index import ChemicalIndex, find_cas_numbers, load_default_index
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n+")
+# A blank line, so paragraph splitting (paragraph_cache.split_blocks) keeps
+# separate windows apart
+WINDOW_SEPARATOR = "\n\n"
+
+
+@dataclass
+class CondensedContext:
+    """Text reduced to the sentences surrounding chemical mentions"""
+
+    text: str
+    original_chars: int
+    windows: List[Tuple[int, int]]
+
+    @property
+    def compression_ratio(self) -> float:
+        """Condensed size as a fraction of the original size"""
+        if not self.original_chars:
+            return 1.0
+        return len(self.text) / self.original_chars
+
+
+@dataclass
+class ContextStats:
+    """Running totals of how much context condensation saved"""
+
+    documents: int = 0
+    original_chars: int = 0
+    condensed_chars: int = 0
+
+    def record(self, context: CondensedContext) -> None:
+        self.documents += 1
+        self.original_chars += context.original_chars
+        self.condensed_chars += len(context.text)
+
+    def as_dict(self) -> dict[str, float | int]:
+        return {
+            "documents": self.documents,
+            "original_chars": self.original_chars,
+            "condensed_chars": self.condensed_chars,
+            "compression_ratio": (
+                round(self.condensed_chars / self.original_chars, 4)
+                if self.original_chars
+                else 1.0
+            ),
+        }
+
+
+def split_sentences(text: str) -> List[Tuple[int, int]]:
+    """
+    Split text into sentence spans.
+
+    Args:
+        text (str): Text to split
+
+    Returns:
+        List[Tuple[int, int]]: (start, end) offsets of each non-empty sentence
+    """
+    spans: List[Tuple[int, int]] = []
+    start = 0
+    for boundary in SENTENCE_BOUNDARY.finditer(text):
+        end = boundary.start()
+        if text[start:end].strip():
+            spans.append((start, end))
+        start = boundary.end()
+    if text[start:].strip():
+        spans.append((start, len(text)))
+    return spans
+
+
+def condense_context(
+    text: str,
+    window: int = 2,
+    min_chars: int = 2000,
+    index: Optional[ChemicalIndex] = None,
+) -> CondensedContext:
+    """
+    Keep only the sentences within `window` sentences of a chemical mention.
+
+    Chemical names come from the chemical index and CAS numbers are matched
+    by pattern. Overlapping or adjacent windows are merged. Short texts and
+    texts without any detected mention are returned unchanged so the model
+    still sees chemicals the index does not know about.
+
+    Args:
+        text (str): Page text, e.g. output of url_to_text
+        window (int): Number of sentences to keep on each side of a mention
+        min_chars (int): Texts shorter than this are not condensed
+        index (Optional[ChemicalIndex]): Index to use, defaults to the bundled one
+
+    Returns:
+        CondensedContext: Condensed text, original size and kept sentence ranges
+    """
+    unchanged = CondensedContext(text=text, original_chars=len(text), windows=[])
+    if len(text) < min_chars:
+        return unchanged
+
+    index = index or load_default_index()
+    mentions = [match.start for match in index.scan(text)]
+    mentions.extend(start for start, _, _ in find_cas_numbers(text))
+    if not mentions:
+        return unchanged
+
+    sentences = split_sentences(text)
+    sentence_starts = [start for start, _ in sentences]
+
+    windows: List[Tuple[int, int]] = []
+    for position in sorted(mentions):
+        sentence = max(bisect.bisect_right(sentence_starts, position) - 1, 0)
+        first = max(sentence - window, 0)
+        last = min(sentence + window, len(sentences) - 1)
+        if windows and first <= windows[-1][1] + 1:
+            windows[-1] = (windows[-1][0], max(windows[-1][1], last))
+        else:
+            windows.append((first, last))
+
+    pieces: List[str] = []
+    for first, last in windows:
+        start, end = sentences[first][0], sentences[last][1]
+        pieces.append(text[start:end].strip())
+    condensed = WINDOW_SEPARATOR.join(pieces)
+    return CondensedContext(text=condensed, original_chars=len(text), windows=windows)
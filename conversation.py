@@ -0,0 +1,155 @@
+import logging
+from typing import Any, List, Optional
+
+from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletionMessageParam
+
+from pydantic_models import ToxinList
+from text_2_entity import (
+    get_openai_text_response_async,
+    get_shared_async_client,
+    open_ai_sequence_response_async,
+)
+
+logger = logging.getLogger(__name__)
+
+FOLLOW_UP_PROMPT = """
+You answer follow-up questions about toxins extracted from documents. Base
+your answers on the extracted toxins given below and on the conversation;
+say so when they do not contain the answer.
+"""
+
+SUMMARY_PROMPT = """
+Summarize the conversation below between a user and an assistant discussing
+extracted toxins. Keep every fact, name, number and open question needed to
+continue the conversation; drop pleasantries. If a previous summary is
+given, merge it into the new one. Reply with the summary only.
+"""
+
+# Per-message overhead of the chat format, in tokens
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(message: Any) -> int:
+    """Rough token count (4 characters per token) of a chat message"""
+    return len(str(message["content"] or "")) // 4 + MESSAGE_OVERHEAD_TOKENS
+
+
+class ConversationHistory:
+    """
+    Multi-turn conversation kept within a token budget.
+
+    The system prompt and context (e.g. the extracted toxins) are pinned at
+    the start of every request. When the history outgrows max_tokens, the
+    oldest question/answer turns are dropped until it fits in
+    trim_to * max_tokens, and, with a summary_model, folded into a running
+    summary sent after the pinned messages. Trimming well below the budget
+    means it happens once every few turns, so the messages between trims
+    keep a stable prefix that OpenAI's prompt caching can reuse.
+    """
+
+    def __init__(
+        self,
+        system_prompt: str = FOLLOW_UP_PROMPT,
+        context: str = "",
+        model: str = "gpt-4o",
+        max_tokens: int = 8000,
+        trim_to: float = 0.6,
+        summary_model: Optional[str] = "gpt-4o-mini",
+        async_client: AsyncOpenAI | None = None,
+    ) -> None:
+        self.pinned: List[ChatCompletionMessageParam] = [
+            {"role": "system", "content": system_prompt}
+        ]
+        if context:
+            self.pinned.append({"role": "system", "content": context})
+        self.model = model
+        self.max_tokens = max_tokens
+        self.trim_to = trim_to
+        self.summary_model = summary_model
+        self.async_client = async_client or get_shared_async_client()
+        self.summary = ""
+        self.turns: List[ChatCompletionMessageParam] = []
+        self.dropped_turns = 0
+
+    @classmethod
+    def about_toxins(cls, toxins: ToxinList, **kwargs: Any) -> "ConversationHistory":
+        """Start a conversation about extraction results"""
+        return cls(context=f"Extracted toxins:\n{toxins.model_dump_json()}", **kwargs)
+
+    def messages(self) -> List[ChatCompletionMessageParam]:
+        """The messages sent for the next turn"""
+        summary: List[ChatCompletionMessageParam] = (
+            [{"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"}]
+            if self.summary
+            else []
+        )
+        return [*self.pinned, *summary, *self.turns]
+
+    def estimated_tokens(self) -> int:
+        return sum(estimate_tokens(message) for message in self.messages())
+
+    async def ask(self, question: str, timeout: float | None = None) -> str:
+        """
+        Ask the next question, trimming the history to the budget first.
+
+        Args:
+            question (str): The user's question
+            timeout (float | None): Request timeout in seconds
+
+        Returns:
+            str: The assistant's answer
+
+        Raises:
+            ValueError: If the model returns no answer, e.g. an empty or
+                refused reply. As for API errors, the question is then not
+                kept in the history, so it can be asked again.
+        """
+        self.turns.append({"role": "user", "content": question})
+        try:
+            await self.trim()
+            history = await open_ai_sequence_response_async(
+                self.messages(), self.model, self.async_client, timeout
+            )
+            answer = history[-1]
+            assert not isinstance(answer, dict)
+            if not answer.content:
+                raise ValueError("Failed to generate response.")
+        except BaseException:
+            # An unanswered question would be sent again with the next one
+            self.turns.pop()
+            raise
+        self.turns.append({"role": "assistant", "content": answer.content})
+        return answer.content
+
+    async def trim(self) -> None:
+        """Drop, and optionally summarize, the oldest turns once over budget"""
+        if self.estimated_tokens() <= self.max_tokens:
+            return
+        target = int(self.max_tokens * self.trim_to)
+        dropped: List[ChatCompletionMessageParam] = []
+        # Always keep the latest question
+        while len(self.turns) > 1 and self.estimated_tokens() > target:
+            dropped.append(self.turns.pop(0))
+            # Drop whole turns: an answer without its question is useless
+            if len(self.turns) > 1 and self.turns[0]["role"] == "assistant":
+                dropped.append(self.turns.pop(0))
+        if not dropped:
+            return
+        self.dropped_turns += sum(1 for message in dropped if message["role"] == "user")
+        logger.info(f"Trimmed {len(dropped)} messages from the conversation history")
+        if self.summary_model is not None:
+            self.summary = await self._summarize(dropped)
+
+    async def _summarize(self, dropped: List[ChatCompletionMessageParam]) -> str:
+        transcript = "\n\n".join(
+            f"{message['role']}: {message.get('content') or ''}" for message in dropped
+        )
+        if self.summary:
+            transcript = f"Previous summary:\n{self.summary}\n\nConversation:\n{transcript}"
+        return await get_openai_text_response_async(
+            SUMMARY_PROMPT,
+            transcript,
+            model=self.summary_model or "",
+            async_client=self.async_client,
+        )
@@ -0,0 +1,341 @@
+import asyncio
+import hashlib
+import heapq
+import logging
+import math
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from bs4 import BeautifulSoup  # type: ignore
+
+from bs4thingy import extract_text_from_soup, parse_html
+from deadline import Deadline, DeadlineExceeded
+from extractor_api import fetch_webpage
+from html_pool import html_to_text, parse_in_pool
+from pydantic_models import CrawledPage, ToxinList
+
+logger = logging.getLogger(__name__)
+
+# Extraction callback: (url, page text) -> extracted toxins
+ExtractFn = Callable[[str, str], Awaitable[ToxinList]]
+# Fetch callback: (url, deadline) -> HTML, run in a worker thread
+FetchFn = Callable[[str, Optional[Deadline]], str]
+
+# Links whose URL or anchor text mention these are crawled first
+PRIORITY_TERMS = re.compile(
+    r"risk[\s_-]evaluation|fact[\s_-]sheet|tsca|chemical|toxic|hazard|exposure"
+    r"|pesticide|carcinogen|solvent",
+    re.IGNORECASE,
+)
+
+# Links to files that are not HTML pages
+SKIPPED_EXTENSIONS = (
+    ".pdf",
+    ".zip",
+    ".xlsx",
+    ".xls",
+    ".docx",
+    ".doc",
+    ".pptx",
+    ".csv",
+    ".jpg",
+    ".jpeg",
+    ".png",
+    ".gif",
+    ".svg",
+    ".mp4",
+    ".mp3",
+)
+
+
+class BloomFilter:
+    """
+    Fixed-size set of seen URLs with a bounded false-positive rate. A false
+    positive only means a page is not crawled; memory stays constant no
+    matter how many links are discovered.
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001) -> None:
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # Double hashing: derive all k positions from two 64-bit hashes
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for de-duplication: lowercase scheme and host,
+    no fragment, no default port and a non-empty path.
+    """
+    parts = urlsplit(url.strip())
+    netloc = parts.netloc.lower()
+    if (parts.scheme == "http" and netloc.endswith(":80")) or (
+        parts.scheme == "https" and netloc.endswith(":443")
+    ):
+        netloc = netloc.rsplit(":", 1)[0]
+    return urlunsplit((parts.scheme.lower(), netloc, parts.path or "/", parts.query, ""))
+
+
+def extract_links(html_content: str, base_url: str) -> List[Tuple[str, str]]:
+    """
+    Find the crawlable links in a page.
+
+    Args:
+        html_content (str): Raw HTML of the page
+        base_url (str): URL the page was fetched from, for relative links
+
+    Returns:
+        List[Tuple[str, str]]: Normalized absolute http(s) URLs with their
+            anchor text, in document order
+    """
+    return _links_from_soup(parse_html(html_content), base_url)
+
+
+def extract_links_and_text(html_content: str, base_url: str) -> Tuple[List[Tuple[str, str]], str]:
+    """
+    Links and text of a page from a single parse.
+
+    Args:
+        html_content (str): Raw HTML of the page
+        base_url (str): URL the page was fetched from, for relative links
+
+    Returns:
+        Tuple[List[Tuple[str, str]], str]: The links, as returned by
+            extract_links, and the text, as returned by html_to_text
+    """
+    soup = parse_html(html_content)
+    # Links first: extracting the text strips parts of the tree
+    links = _links_from_soup(soup, base_url)
+    return links, extract_text_from_soup(soup)
+
+
+def _links_from_soup(soup: BeautifulSoup, base_url: str) -> List[Tuple[str, str]]:
+    links: List[Tuple[str, str]] = []
+    for anchor in soup.find_all("a", href=True):
+        url = normalize_url(urljoin(base_url, str(anchor["href"])))
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            continue
+        if parts.path.lower().endswith(SKIPPED_EXTENSIONS):
+            continue
+        links.append((url, anchor.get_text(" ", strip=True)))
+    return links
+
+
+def link_priority(url: str, anchor_text: str, depth: int) -> int:
+    """Frontier priority of a link; lower values are crawled first"""
+    return depth - len(PRIORITY_TERMS.findall(f"{url} {anchor_text}"))
+
+
+def domain_allowed(url: str, allowed_domains: Iterable[str]) -> bool:
+    """Whether the URL's host is one of the allowed domains or a subdomain"""
+    host = urlsplit(url).hostname or ""
+    return any(host == domain or host.endswith(f".{domain}") for domain in allowed_domains)
+
+
+@dataclass
+class CrawlConfig:
+    """
+    Budgets and restrictions of a crawl.
+
+    allowed_domains defaults to the domains of the seed URLs. domain_delay
+    is the minimum time between two requests to the same host.
+    """
+
+    max_depth: int = 2
+    max_pages: int = 50
+    max_pages_per_domain: int = 50
+    allowed_domains: List[str] = field(default_factory=list)
+    concurrency: int = 4
+    domain_delay: float = 1.0
+    proxy: bool = True
+
+
+class Crawler:
+    """
+    Follows in-page links from seed URLs and extracts toxins from every
+    page it visits.
+
+    Discovered links go into a priority frontier that favours pages about
+    risk evaluations, fact sheets and chemicals, then shallower pages.
+    Concurrent workers pop the frontier until the page budget is spent, the
+    frontier is empty or the deadline passes.
+    """
+
+    def __init__(
+        self,
+        extract: ExtractFn,
+        config: Optional[CrawlConfig] = None,
+        fetch: Optional[FetchFn] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> None:
+        self.extract = extract
+        self.config = config or CrawlConfig()
+        self.fetch = fetch or self._fetch_html
+        self.deadline = deadline
+        self.seen = BloomFilter(capacity=max(1000, self.config.max_pages * 200))
+        self.pages: List[CrawledPage] = []
+        self._frontier: List[Tuple[int, int, str, int]] = []
+        self._sequence = 0
+        self._started = 0
+        self._domain_pages: Dict[str, int] = {}
+        self._domain_locks: Dict[str, asyncio.Lock] = {}
+        self._domain_last_fetch: Dict[str, float] = {}
+
+    def _fetch_html(self, url: str, deadline: Optional[Deadline]) -> str:
+        return fetch_webpage(url, proxy=self.config.proxy, deadline=deadline)
+
+    def _enqueue(self, url: str, depth: int, anchor_text: str = "") -> None:
+        if url in self.seen:
+            return
+        self.seen.add(url)
+        self._sequence += 1
+        heapq.heappush(
+            self._frontier,
+            (link_priority(url, anchor_text, depth), self._sequence, url, depth),
+        )
+
+    async def crawl(self, seeds: List[str]) -> List[CrawledPage]:
+        """
+        Crawl outward from the seed URLs.
+
+        Args:
+            seeds (List[str]): Start URLs, crawled at depth 0
+
+        Returns:
+            List[CrawledPage]: Visited pages in completion order, with the
+                toxins extracted from each or the error that stopped it
+        """
+        seeds = [normalize_url(url) for url in seeds]
+        if not self.config.allowed_domains:
+            self.config.allowed_domains = sorted(
+                {urlsplit(url).hostname or "" for url in seeds}
+            )
+        for url in seeds:
+            self._enqueue(url, 0)
+
+        in_flight = 0
+        wakeup = asyncio.Event()
+
+        async def worker() -> None:
+            nonlocal in_flight
+            while True:
+                while not self._frontier:
+                    if in_flight == 0:
+                        return
+                    # Wait for a running page to add links or finish
+                    wakeup.clear()
+                    await wakeup.wait()
+                if self._budget_spent():
+                    return
+                _, _, url, depth = heapq.heappop(self._frontier)
+                if not self._claim_domain(url):
+                    continue
+                in_flight += 1
+                try:
+                    self.pages.append(await self._visit(url, depth))
+                finally:
+                    in_flight -= 1
+                    wakeup.set()
+
+        await asyncio.gather(*(worker() for _ in range(self.config.concurrency)))
+        logger.info(
+            f"Crawled {len(self.pages)} pages, {len(self._frontier)} links left in frontier"
+        )
+        return self.pages
+
+    def _budget_spent(self) -> bool:
+        if self.deadline is not None and self.deadline.expired:
+            return True
+        return self._started >= self.config.max_pages
+
+    def _claim_domain(self, url: str) -> bool:
+        host = urlsplit(url).hostname or ""
+        if self._domain_pages.get(host, 0) >= self.config.max_pages_per_domain:
+            return False
+        self._domain_pages[host] = self._domain_pages.get(host, 0) + 1
+        self._started += 1
+        return True
+
+    async def _wait_for_domain(self, url: str) -> None:
+        host = urlsplit(url).hostname or ""
+        lock = self._domain_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            wait = self._domain_last_fetch.get(host, 0.0) + self.config.domain_delay
+            delay = wait - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._domain_last_fetch[host] = time.monotonic()
+
+    async def _visit(self, url: str, depth: int) -> CrawledPage:
+        try:
+            await self._wait_for_domain(url)
+            html_content = await asyncio.to_thread(self.fetch, url, self.deadline)
+            if depth < self.config.max_depth:
+                # One parse, off the event loop, for both the links and the text
+                links, text = await asyncio.to_thread(
+                    parse_in_pool, extract_links_and_text, html_content, url
+                )
+                for link, anchor_text in links:
+                    if domain_allowed(link, self.config.allowed_domains):
+                        self._enqueue(link, depth + 1, anchor_text)
+            else:
+                text = await asyncio.to_thread(html_to_text, html_content)
+            if self.deadline is not None:
+                toxins = await asyncio.wait_for(
+                    self.extract(url, text), self.deadline.remaining()
+                )
+            else:
+                toxins = await self.extract(url, text)
+            return CrawledPage(url=url, depth=depth, toxins=toxins.toxins)
+        except (DeadlineExceeded, asyncio.TimeoutError):
+            return CrawledPage(url=url, depth=depth, error="Request deadline exceeded")
+        except Exception as e:
+            logger.error(f"Failed to crawl {url}: {e}")
+            return CrawledPage(url=url, depth=depth, error=str(e))
+
+
+# Example usage
+if __name__ == "__main__":
+    import argparse
+
+    from router import extract_page_toxins
+
+    parser = argparse.ArgumentParser(description="Crawl pages and extract toxins")
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--domain", action="append", default=[])
+    args = parser.parse_args()
+
+    crawler = Crawler(
+        extract_page_toxins,
+        CrawlConfig(
+            max_depth=args.depth,
+            max_pages=args.pages,
+            concurrency=args.concurrency,
+            allowed_domains=args.domain,
+        ),
+    )
+    for page in asyncio.run(crawler.crawl(args.urls)):
+        print(page.model_dump_json())
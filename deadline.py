@@ -0,0 +1,165 @@
+import asyncio
+import os
+import time
+from typing import (
+    TYPE_CHECKING,
+    AsyncGenerator,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Optional,
+    TypeVar,
+)
+
+if TYPE_CHECKING:
+    from starlette.requests import Request
+
+T = TypeVar("T")
+
+# API Gateway gives up after 30 s; leave headroom to send the error response
+REQUEST_DEADLINE_SECONDS = float(os.environ.get("REQUEST_DEADLINE_SECONDS", "28"))
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request's time budget has run out"""
+
+    pass
+
+
+class ClientDisconnected(Exception):
+    """Raised when the client went away before the response was ready"""
+
+    pass
+
+
+class Deadline:
+    """
+    An absolute point in time by which a request must finish. Passed down
+    the call chain so every network call can shrink its timeout to the
+    remaining budget.
+    """
+
+    def __init__(
+        self, seconds: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.clock = clock
+        self.expires_at = clock() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline, never negative"""
+        return max(self.expires_at - self.clock(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self) -> None:
+        """
+        Raises:
+            DeadlineExceeded: If the deadline has passed
+        """
+        if self.expired:
+            raise DeadlineExceeded("Request deadline exceeded")
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """
+        Timeout to use for the next call: the remaining budget, optionally
+        capped by the call's own default timeout.
+
+        Args:
+            cap (Optional[float]): The call's usual timeout in seconds
+
+        Returns:
+            float: Seconds the next call may take
+
+        Raises:
+            DeadlineExceeded: If no time is left
+        """
+        self.check()
+        remaining = self.remaining()
+        return remaining if cap is None else min(remaining, cap)
+
+
+def request_deadline(seconds: Optional[float] = None) -> Deadline:
+    """Start the deadline for an incoming API request"""
+    return Deadline(REQUEST_DEADLINE_SECONDS if seconds is None else seconds)
+
+
+async def run_with_deadline(
+    work: Awaitable[T],
+    deadline: Deadline,
+    request: Optional["Request"] = None,
+    poll_interval: float = 0.25,
+) -> T:
+    """
+    Await work, cancelling it when the deadline passes or the client
+    disconnects.
+
+    Args:
+        work (Awaitable[T]): The request's processing coroutine
+        deadline (Deadline): The request's deadline
+        request (Optional[Request]): Incoming request, polled for disconnects
+        poll_interval (float): How often to check for a disconnect, in seconds
+
+    Returns:
+        T: The result of the work
+
+    Raises:
+        DeadlineExceeded: If the deadline passed first
+        ClientDisconnected: If the client disconnected first
+    """
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait(
+                {task}, timeout=min(poll_interval, deadline.remaining())
+            )
+            if done:
+                return task.result()
+            deadline.check()
+            if request is not None and await request.is_disconnected():
+                raise ClientDisconnected("Client disconnected")
+    finally:
+        if not task.done():
+            task.cancel()
+            # Let the work unwind, e.g. an async generator it was advancing
+            await asyncio.wait({task})
+
+
+async def iterate_with_deadline(
+    items: AsyncIterator[T],
+    deadline: Deadline,
+    request: Optional["Request"] = None,
+    poll_interval: float = 0.25,
+) -> AsyncGenerator[T, None]:
+    """
+    Streaming counterpart of run_with_deadline: yield from an async iterator,
+    cancelling the wait for the next item when the deadline passes or the
+    client disconnects.
+
+    Args:
+        items (AsyncIterator[T]): The stream, e.g. toxins as they are generated
+        deadline (Deadline): The request's deadline
+        request (Optional[Request]): Incoming request, polled for disconnects
+        poll_interval (float): How often to check for a disconnect, in seconds
+
+    Yields:
+        T: The stream's items
+
+    Raises:
+        DeadlineExceeded: If the deadline passed before the stream ended
+        ClientDisconnected: If the client disconnected before the stream ended
+    """
+    try:
+        while True:
+            try:
+                item = await run_with_deadline(
+                    items.__anext__(), deadline, request, poll_interval
+                )
+            except StopAsyncIteration:
+                return
+            yield item
+    finally:
+        aclose = getattr(items, "aclose", None)
+        if aclose is not None:
+            await aclose()
@@ -1,5 +1,9 @@
-from typing import Optional, Dict
+import codecs
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Optional, Dict, Tuple
 import requests  # type: ignore
+import tempfile
 from requests.adapters import HTTPAdapter  # type: ignore
 from requests.packages.urllib3.util.retry import Retry  # type: ignore
 import logging
@@ -7,11 +11,36 @@ from urllib.parse import quote_plus
 import os
 import dotenv
 
+from bs4thingy import extract_text_from_html_chunks
+from charset import detect_encoding
+from circuit_breaker import CircuitOpenError, get_breaker
+from deadline import Deadline, DeadlineExceeded
+
 dotenv.load_dotenv()
 SCRAPER_API_KEY = os.environ.get("SCRAPER_API_KEY", "")
 if SCRAPER_API_KEY == "":
     raise ValueError("SCRAPER_API_KEY is not set")
 
+# Largest response body we download, after content decoding. Keeps a huge
+# link from exhausting the 256 MB Lambda.
+MAX_DOWNLOAD_BYTES = int(os.environ.get("MAX_DOWNLOAD_BYTES", str(20 * 1024 * 1024)))
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+# The fetch breakers time the body download too, so only fetches well beyond
+# a normal page download count as slow
+FETCH_SLOW_CALL_SECONDS = float(os.environ.get("FETCH_SLOW_CALL_SECONDS", "60"))
+
+# Body types that are spooled to a temporary file instead of decoded as text
+BINARY_CONTENT_TYPES = ("application/pdf",)
+# Non-text/* types accepted as pages; "" is a missing Content-Type header
+MARKUP_CONTENT_TYPES = ("", "application/xhtml+xml", "application/xml")
+# Non-text/* types accepted as documents. application/octet-stream is
+# accepted so its body can be sniffed for the PDF signature.
+DOCUMENT_CONTENT_TYPES = MARKUP_CONTENT_TYPES + BINARY_CONTENT_TYPES + (
+    "application/json",
+    "application/ld+json",
+    "application/octet-stream",
+)
+
 
 class ScrapingError(Exception):
     """Custom exception for scraping errors"""
@@ -19,6 +48,25 @@ class ScrapingError(Exception):
     pass
 
 
+class UnsupportedContentType(ScrapingError):
+    """The response is of a content type we cannot extract text from"""
+
+
+class DownloadTooLarge(ScrapingError):
+    """The response body exceeds the download size limit"""
+
+
+def is_fetch_failure(error: BaseException) -> bool:
+    """
+    Decide whether a fetch error counts against the fetching dependency.
+    Client errors such as a 404 from the target site do not.
+    """
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status >= 500 or status == 429
+    return isinstance(error, requests.exceptions.RequestException)
+
+
 def fetch_webpage(
     target_url: str,
     scraper_api_key: str | None = SCRAPER_API_KEY,
@@ -26,9 +74,13 @@ def fetch_webpage(
     proxy: bool = True,
     retry_attempts: int = 3,
     custom_headers: Optional[Dict[str, str]] = None,
+    deadline: Optional[Deadline] = None,
+    max_bytes: int = MAX_DOWNLOAD_BYTES,
 ) -> str:
     """
-    Fetch webpage content using ScraperAPI as a proxy service.
+    Fetch webpage content using ScraperAPI as a proxy service. The body is
+    streamed and decoded incrementally, and rejected early if it is not
+    HTML/text or exceeds max_bytes.
 
     Args:
         target_url (str): The URL to scrape
@@ -37,17 +89,352 @@ def fetch_webpage(
         proxy (bool): Whether to use ScraperAPI proxy (if False, makes direct request)
         retry_attempts (int): Number of retry attempts for failed requests
         custom_headers (Optional[Dict[str, str]]): Custom headers to send with the request
+        deadline (Optional[Deadline]): Request deadline; the timeout and the
+            number of retries are shrunk to fit the remaining budget
+        max_bytes (int): Largest body to download
 
     Returns:
         str: HTML content of the webpage
 
     Raises:
-        ScrapingError: If the scraping fails after all retries
+        ScrapingError: If the scraping fails after all retries, or the
+            circuit breaker for the proxy/direct path is open
+        UnsupportedContentType: If the response is not HTML or text
+        DownloadTooLarge: If the body is larger than max_bytes
+        DeadlineExceeded: If the deadline has already passed
+    """
+    with _open_response(
+        target_url,
+        scraper_api_key=scraper_api_key,
+        timeout=timeout,
+        proxy=proxy,
+        retry_attempts=retry_attempts,
+        custom_headers=custom_headers,
+        deadline=deadline,
+        stream=True,
+    ) as response:
+        _check_content_type(response, target_url, MARKUP_CONTENT_TYPES)
+        chunks = _iter_body(response, target_url, max_bytes, deadline)
+        return "".join(_iter_text(chunks, response.headers.get("Content-Type")))
+
+
+@dataclass
+class ConditionalFetchResult:
+    """Outcome of a conditional GET"""
+
+    not_modified: bool
+    html: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+def fetch_webpage_conditional(
+    target_url: str,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+    scraper_api_key: str | None = SCRAPER_API_KEY,
+    timeout: int = 30,
+    proxy: bool = True,
+    retry_attempts: int = 3,
+    deadline: Optional[Deadline] = None,
+    max_bytes: int = MAX_DOWNLOAD_BYTES,
+) -> ConditionalFetchResult:
+    """
+    Fetch a webpage only if it changed since the validators from a previous
+    fetch (ETag / Last-Modified), using If-None-Match / If-Modified-Since.
+
+    Args:
+        target_url (str): The URL to scrape
+        etag (Optional[str]): ETag returned by the previous fetch
+        last_modified (Optional[str]): Last-Modified returned by the previous fetch
+        scraper_api_key (str): Your ScraperAPI key
+        timeout (int): Request timeout in seconds
+        proxy (bool): Whether to use ScraperAPI proxy (if False, makes direct request)
+        retry_attempts (int): Number of retry attempts for failed requests
+        deadline (Optional[Deadline]): Request deadline
+        max_bytes (int): Largest body to download
+
+    Returns:
+        ConditionalFetchResult: not_modified is True on a 304, otherwise the
+            new HTML and validators
+
+    Raises:
+        ScrapingError: If the scraping fails after all retries, the body is
+            too large or not HTML/text
+    """
+    headers: Dict[str, str] = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    with _open_response(
+        target_url,
+        scraper_api_key=scraper_api_key,
+        timeout=timeout,
+        proxy=proxy,
+        retry_attempts=retry_attempts,
+        custom_headers=headers,
+        deadline=deadline,
+        keep_headers=bool(headers),
+        stream=True,
+    ) as response:
+        not_modified = response.status_code == 304
+        html = None
+        if not not_modified:
+            _check_content_type(response, target_url, MARKUP_CONTENT_TYPES)
+            chunks = _iter_body(response, target_url, max_bytes, deadline)
+            html = "".join(_iter_text(chunks, response.headers.get("Content-Type")))
+        return ConditionalFetchResult(
+            not_modified=not_modified,
+            html=html,
+            etag=response.headers.get("ETag", etag),
+            last_modified=response.headers.get("Last-Modified", last_modified),
+        )
+
+
+@dataclass
+class FetchedDocument:
+    """
+    A fetched document of any content type. Textual bodies are decoded into
+    text; binary bodies (PDFs) are written to a temporary file at path,
+    which close() removes. extracted is True when an HTML body was parsed
+    into clean text while downloading.
+    """
+
+    url: str
+    content_type: str
+    text: Optional[str] = None
+    path: Optional[str] = None
+    extracted: bool = False
+
+    @property
+    def is_pdf(self) -> bool:
+        return self.content_type == "application/pdf"
+
+    def close(self) -> None:
+        if self.path is not None and os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def __enter__(self) -> "FetchedDocument":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def media_type(content_type: Optional[str]) -> str:
+    """Media type of a Content-Type header without parameters, lowercased"""
+    return (content_type or "").split(";", 1)[0].strip().lower()
+
+
+def fetch_document(
+    target_url: str,
+    scraper_api_key: str | None = SCRAPER_API_KEY,
+    timeout: int = 30,
+    proxy: bool = True,
+    retry_attempts: int = 3,
+    custom_headers: Optional[Dict[str, str]] = None,
+    deadline: Optional[Deadline] = None,
+    max_bytes: int = MAX_DOWNLOAD_BYTES,
+    incremental_html: bool = False,
+) -> FetchedDocument:
+    """
+    Fetch a document and dispatch on its content type. Binary documents are
+    streamed to a temporary file chunk by chunk, so a large PDF is never
+    held in memory as a whole.
+
+    The content type comes from the Content-Type header and unsupported
+    types are rejected before the body is read. A body starting with the
+    PDF signature is treated as a PDF whatever the header says, since
+    servers often label PDFs application/octet-stream.
+
+    Args:
+        target_url (str): The URL to fetch
+        scraper_api_key (str): Your ScraperAPI key
+        timeout (int): Request timeout in seconds
+        proxy (bool): Whether to use ScraperAPI proxy (if False, makes direct request)
+        retry_attempts (int): Number of retry attempts for failed requests
+        custom_headers (Optional[Dict[str, str]]): Custom headers to send with the request
+        deadline (Optional[Deadline]): Request deadline
+        max_bytes (int): Largest body to download
+        incremental_html (bool): Feed HTML into an incremental parser as it
+            arrives and keep only the extracted text, never the whole page
+
+    Returns:
+        FetchedDocument: The document; use it as a context manager to
+            remove any temporary file
+
+    Raises:
+        ScrapingError: If the fetch fails
+        UnsupportedContentType: If the content type is not supported
+        DownloadTooLarge: If the body is larger than max_bytes
+    """
+    with _open_response(
+        target_url,
+        scraper_api_key=scraper_api_key,
+        timeout=timeout,
+        proxy=proxy,
+        retry_attempts=retry_attempts,
+        custom_headers=custom_headers,
+        deadline=deadline,
+        stream=True,
+    ) as response:
+        content_type = _check_content_type(response, target_url, DOCUMENT_CONTENT_TYPES)
+        chunks = _iter_body(response, target_url, max_bytes, deadline)
+        first_chunk = next(chunks, b"")
+        if first_chunk.lstrip().startswith(b"%PDF-"):
+            content_type = "application/pdf"
+        elif content_type == "application/octet-stream":
+            raise UnsupportedContentType(
+                f"Unsupported content type {content_type} for {target_url}"
+            )
+
+        if content_type in BINARY_CONTENT_TYPES:
+            return _spool_document(target_url, content_type, first_chunk, chunks)
+
+        text_chunks = _iter_text(
+            _prepend(first_chunk, chunks), response.headers.get("Content-Type")
+        )
+        if incremental_html and (
+            content_type == "text/html" or content_type in MARKUP_CONTENT_TYPES
+        ):
+            return FetchedDocument(
+                url=target_url,
+                content_type=content_type,
+                text=extract_text_from_html_chunks(text_chunks),
+                extracted=True,
+            )
+        return FetchedDocument(
+            url=target_url, content_type=content_type, text="".join(text_chunks)
+        )
+
+
+def _check_content_type(
+    response: requests.Response, target_url: str, accepted: Tuple[str, ...]
+) -> str:
+    """Reject the response from its headers alone, before reading the body"""
+    content_type = media_type(response.headers.get("Content-Type"))
+    if not (content_type.startswith("text/") or content_type in accepted):
+        raise UnsupportedContentType(
+            f"Unsupported content type {content_type} for {target_url}"
+        )
+    return content_type
+
+
+def _iter_body(
+    response: requests.Response,
+    target_url: str,
+    max_bytes: int,
+    deadline: Optional[Deadline] = None,
+) -> Iterator[bytes]:
+    """
+    Stream the response body in chunks, enforcing the size limit from the
+    Content-Length header up front and from the bytes received as they come.
+
+    The request timeout bounds each read, not the whole body, so a server
+    trickling bytes could otherwise keep the download (and its thread)
+    going long after the deadline; the deadline is checked per chunk.
+    Read errors propagate as requests exceptions, so the circuit breaker of
+    the surrounding _open_response sees them.
+    """
+    content_length = response.headers.get("Content-Length", "")
+    if content_length.isdigit() and int(content_length) > max_bytes:
+        raise DownloadTooLarge(
+            f"{target_url} is {content_length} bytes, limit is {max_bytes}"
+        )
+    received = 0
+    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+        if deadline is not None:
+            deadline.check()
+        received += len(chunk)
+        if received > max_bytes:
+            raise DownloadTooLarge(f"{target_url} exceeds the {max_bytes} byte limit")
+        yield chunk
+
+
+def _iter_text(chunks: Iterator[bytes], content_type: Optional[str]) -> Iterator[str]:
+    """
+    Decode a byte stream incrementally, so multi-byte characters may span
+    chunks. The encoding is resolved once from the Content-Type header and
+    the first chunk (see charset.detect_encoding).
+    """
+    first_chunk = next(chunks, b"")
+    decoder = codecs.getincrementaldecoder(detect_encoding(content_type, first_chunk))(
+        errors="replace"
+    )
+    for chunk in _prepend(first_chunk, chunks):
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def _prepend(first_chunk: bytes, chunks: Iterator[bytes]) -> Iterator[bytes]:
+    yield first_chunk
+    yield from chunks
+
+
+def _spool_document(
+    target_url: str, content_type: str, first_chunk: bytes, chunks: Iterator[bytes]
+) -> FetchedDocument:
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as spool:
+        try:
+            spool.write(first_chunk)
+            for chunk in chunks:
+                spool.write(chunk)
+        except BaseException:
+            spool.close()
+            os.unlink(spool.name)
+            raise
+    return FetchedDocument(url=target_url, content_type=content_type, path=spool.name)
+
+
+@contextmanager
+def _open_response(
+    target_url: str,
+    scraper_api_key: str | None,
+    timeout: int,
+    proxy: bool,
+    retry_attempts: int,
+    custom_headers: Optional[Dict[str, str]],
+    deadline: Optional[Deadline],
+    keep_headers: bool = False,
+    stream: bool = False,
+) -> Iterator[requests.Response]:
+    """
+    Send the GET request shared by the fetch functions, with retries, the
+    deadline-adjusted timeout and the circuit breaker applied. The body is
+    read inside the with block, so the breaker also records failures while
+    downloading it, and the response is closed when the block exits.
+
+    Args:
+        keep_headers (bool): Ask ScraperAPI to forward our headers to the
+            target site (needed for conditional requests)
+        stream (bool): Defer downloading the body until it is iterated
+
+    Yields:
+        requests.Response: The successful (2xx or 304) response
+
+    Raises:
+        ScrapingError: If the request or the body download fails, or the
+            circuit breaker is open
     """
     # Configure logging
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger(__name__)
 
+    # Fit the per-attempt timeout and the retries into the remaining budget
+    if deadline is not None:
+        timeout_seconds = deadline.timeout(timeout)
+        retry_attempts = max(
+            min(retry_attempts, int(deadline.remaining() // timeout_seconds) - 1), 0
+        )
+    else:
+        timeout_seconds = timeout
+
     # Setup retry strategy
     retry_strategy = Retry(
         total=retry_attempts,
@@ -70,28 +457,42 @@ def fetch_webpage(
     # Combine custom headers with default headers
     headers = {**default_headers, **(custom_headers or {})}
 
+    # Fail fast while the dependency's circuit is open
+    breaker = get_breaker(
+        "scraperapi" if proxy else "direct",
+        is_fetch_failure,
+        slow_call_seconds=FETCH_SLOW_CALL_SECONDS,
+    )
+
     try:
-        if proxy:
-            # Use ScraperAPI
-            encoded_url = quote_plus(target_url)
-            scraper_url = (
-                f"http://api.scraperapi.com?api_key={scraper_api_key}&url={encoded_url}"
-            )
-            logger.info(f"Making request through ScraperAPI to: {target_url}")
-            response = session.get(scraper_url, timeout=timeout, headers=headers)
-        else:
-            # Direct request without proxy
-            logger.info(f"Making direct request to: {target_url}")
-            response = session.get(target_url, timeout=timeout, headers=headers)
-
-        # Raise an exception for bad status codes
-        response.raise_for_status()
-        if isinstance(response.text, bytes):
-            return response.text.decode("utf-8")
-        if not isinstance(response.text, str):
-            raise ScrapingError(f"Unexpected response type: {type(response.text)}")
-        return response.text
+        # A deadline passing while downloading says nothing about the dependency
+        with breaker.guard(ignore=(DeadlineExceeded,)):
+            if proxy:
+                # Use ScraperAPI
+                encoded_url = quote_plus(target_url)
+                scraper_url = (
+                    f"http://api.scraperapi.com?api_key={scraper_api_key}&url={encoded_url}"
+                )
+                if keep_headers:
+                    scraper_url += "&keep_headers=true"
+                logger.info(f"Making request through ScraperAPI to: {target_url}")
+                response = session.get(
+                    scraper_url, timeout=timeout_seconds, headers=headers, stream=stream
+                )
+            else:
+                # Direct request without proxy
+                logger.info(f"Making direct request to: {target_url}")
+                response = session.get(
+                    target_url, timeout=timeout_seconds, headers=headers, stream=stream
+                )
+
+            with response:
+                # Raise an exception for bad status codes
+                response.raise_for_status()
+                yield response
 
+    except CircuitOpenError as e:
+        raise ScrapingError(f"Failed to fetch {target_url}: {str(e)}") from e
     except requests.exceptions.RequestException as e:
         error_msg = f"Failed to fetch {target_url}: {str(e)}"
         logger.error(error_msg)
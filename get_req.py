@@ -16,6 +16,10 @@ def get_needed_packages() -> Set[str]:
         "openai",
         "uvicorn",
         "python-dotenv",
+        "pypdf",
+        "gunicorn",
+        "brotli",
+        "orjson",
     }
 
 
@@ -0,0 +1,69 @@
+"""
+Production server profile: gunicorn managing uvicorn workers.
+
+    gunicorn router:app -c gunicorn_conf.py
+
+Every setting can be overridden through the environment, e.g. WEB_CONCURRENCY=2.
+"""
+
+import os
+from typing import Any
+
+
+def available_cpus() -> int:
+    """
+    CPUs this process may use, honouring the container's cgroup CPU quota
+    (ECS tasks see every host CPU in os.cpu_count()).
+    """
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota != "max":
+            cpus = min(cpus or 1, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return cpus or 1
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+# Requests spend most of their time awaiting OpenAI, so one async worker per
+# CPU keeps every core busy with the CPU-bound parts. At least two, so a
+# recycled worker never leaves the server without one.
+workers = int(os.environ.get("WEB_CONCURRENCY", str(max(2, available_cpus()))))
+
+# Import the app (chemical index, schema cache, OpenAI client) once in the
+# master; workers fork with those pages shared copy-on-write
+preload_app = True
+
+# Recycle workers periodically to bound memory growth, staggered by the jitter
+# so they do not all restart at once
+max_requests = int(os.environ.get("MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.environ.get("MAX_REQUESTS_JITTER", "200"))
+# Requests are bounded by REQUEST_DEADLINE_SECONDS (28 s); give them time to finish
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.environ.get("WORKER_TIMEOUT", "60"))
+
+# Keep idle connections open longer than the load balancer does (ALB default:
+# 60 s) so the balancer never reuses a connection the worker just closed
+keepalive = int(os.environ.get("KEEPALIVE", "75"))
+backlog = int(os.environ.get("BACKLOG", "2048"))
+
+accesslog = "-"
+errorlog = "-"
+
+
+def when_ready(server: Any) -> None:
+    # Compile the extraction schema before forking, like the rest of the app
+    from pydantic_models import ToxinList
+    from text_2_entity import compile_response_format
+
+    compile_response_format(ToxinList)
+
+
+def post_fork(server: Any, worker: Any) -> None:
+    # The preloaded result store connection must not be shared across processes
+    from result_store import get_result_store
+
+    get_result_store().reopen()
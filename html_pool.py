@@ -0,0 +1,108 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, TypeVar
+
+from bs4thingy import extract_text_from_html
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Pages smaller than this are parsed in the calling thread: below ~50 KB a
+# parse takes less than ~100 ms and shipping it to a process is not worth it
+HTML_PROCESS_MIN_CHARS = int(os.environ.get("HTML_PROCESS_MIN_CHARS", "50000"))
+HTML_PROCESS_WORKERS = int(os.environ.get("HTML_PROCESS_WORKERS", str(os.cpu_count() or 1)))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_unavailable = False
+_pool_lock = threading.Lock()
+# Bounds the pages queued for or being parsed by the pool
+_slots = threading.BoundedSemaphore(2 * HTML_PROCESS_WORKERS)
+
+
+def get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    The process pool shared by HTML and PDF parsing, created on first use.
+
+    Returns:
+        Optional[ProcessPoolExecutor]: The pool, or None where processes are unavailable
+    """
+    global _pool, _pool_unavailable
+    with _pool_lock:
+        if _pool is None and not _pool_unavailable:
+            try:
+                # Fork is unsafe from a threaded server process; forkserver
+                # children start from a clean single-threaded process
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context(
+                    "forkserver" if "forkserver" in methods else "spawn"
+                )
+                _pool = ProcessPoolExecutor(max_workers=HTML_PROCESS_WORKERS, mp_context=context)
+            except (OSError, NotImplementedError) as e:
+                # e.g. AWS Lambda, which has no /dev/shm for the pool's semaphores
+                logger.warning(f"Process pool unavailable ({e}), parsing in threads")
+                _pool_unavailable = True
+        return _pool
+
+
+def html_to_text(html_content: str) -> str:
+    """
+    Run extract_text_from_html off the calling thread's GIL for large pages.
+
+    Large pages are parsed in a bounded process pool, so parsing scales
+    across cores and does not stall the event loop of an async server while
+    the calling thread waits. Small pages, and every page where processes
+    are unavailable, are parsed in the calling thread, which is expected to
+    be a worker thread (e.g. via asyncio.to_thread).
+
+    Args:
+        html_content (str): Raw HTML content
+
+    Returns:
+        str: Cleaned text content, as returned by extract_text_from_html
+    """
+    return parse_in_pool(extract_text_from_html, html_content)
+
+
+def parse_in_pool(parse: Callable[..., T], html_content: str, *args: Any) -> T:
+    """
+    Call parse(html_content, *args) the way html_to_text parses pages.
+
+    Args:
+        parse (Callable[..., T]): Module-level function, so it can be pickled
+        html_content (str): Raw HTML content, whose size picks pool or thread
+        *args: Further arguments for parse
+
+    Returns:
+        T: The result of parse
+    """
+    if len(html_content) < HTML_PROCESS_MIN_CHARS or HTML_PROCESS_WORKERS < 1:
+        return parse(html_content, *args)
+    pool = get_process_pool()
+    if pool is None:
+        return parse(html_content, *args)
+
+    with _slots:
+        try:
+            return pool.submit(parse, html_content, *args).result()
+        except BrokenProcessPool as e:
+            logger.error(f"HTML process pool broke ({e}), parsing in thread")
+            reset_process_pool(pool)
+        except OSError as e:
+            logger.warning(f"Cannot start HTML worker processes ({e}), parsing in threads")
+            reset_process_pool(pool, unavailable=True)
+    return parse(html_content, *args)
+
+
+def reset_process_pool(broken: ProcessPoolExecutor, unavailable: bool = False) -> None:
+    """Drop a broken shared pool so the next caller starts a fresh one"""
+    global _pool, _pool_unavailable
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+        _pool_unavailable = _pool_unavailable or unavailable
+    broken.shutdown(wait=False)
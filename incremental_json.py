@@ -0,0 +1,93 @@
+import json
+from typing import Any, Dict, List, Optional
+
+
+class IncrementalArrayParser:
+    """
+    Incrementally parses a streamed JSON document of the form
+    {"<key>": [{...}, {...}]} and emits each array element as soon as its
+    closing brace arrives, without waiting for the rest of the document.
+
+    Only the text of the element currently being read is buffered.
+    """
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_chars: List[str] = []
+        self._last_key: Optional[str] = None
+        self._array_depth: Optional[int] = None
+        self._item_chars: List[str] = []
+        self._in_item = False
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Consume the next piece of streamed JSON.
+
+        Args:
+            chunk (str): Next fragment of the JSON text
+
+        Returns:
+            List[Dict[str, Any]]: Array elements completed by this fragment
+
+        Raises:
+            ValueError: If a completed element is not valid JSON
+        """
+        completed: List[Dict[str, Any]] = []
+        for char in chunk:
+            if self._in_item:
+                self._item_chars.append(char)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and not self._in_item:
+                        self._last_key = "".join(self._string_chars)
+                elif self._depth == 1:
+                    self._string_chars.append(char)
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_chars = []
+            elif char in "{[":
+                if (
+                    char == "["
+                    and self._depth == 1
+                    and self._array_depth is None
+                    and self._last_key == self.key
+                ):
+                    self._array_depth = self._depth + 1
+                elif (
+                    char == "{"
+                    and self._array_depth is not None
+                    and self._depth == self._array_depth
+                ):
+                    self._in_item = True
+                    self._item_chars = [char]
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._in_item and self._depth == self._array_depth:
+                    completed.append(self._decode_item())
+                elif char == "]" and self._depth + 1 == self._array_depth:
+                    self._array_depth = None
+        return completed
+
+    def _decode_item(self) -> Dict[str, Any]:
+        text = "".join(self._item_chars)
+        self._in_item = False
+        self._item_chars = []
+        try:
+            item = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON element in stream: {e}") from e
+        if not isinstance(item, dict):
+            raise ValueError(f"Expected a JSON object, got {type(item).__name__}")
+        return item
@@ -0,0 +1,463 @@
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional, Protocol
+
+from openai import AsyncOpenAI
+
+from deadline import Deadline
+from chemical_index import ChemicalIndex, find_cas_numbers, load_default_index
+from paragraph_cache import BlockCache, split_blocks
+from pydantic_models import ToxinList
+from text_2_entity import (
+    HedgePolicy,
+    PromptPrefix,
+    get_openai_text_response_async,
+    parse_input_async,
+    parse_input_hedged_async,
+    parse_input_stream_async,
+)
+from toxin_merge import merge_toxins
+from token_usage import MODEL_PRICES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXTRACTION_MODEL = "gpt-4o-2024-08-06"
+DEFAULT_PREFILTER_MODEL = "gpt-4o-mini"
+
+# Terms that suggest a chunk talks about chemicals or their hazards
+TOXIN_KEYWORDS = [
+    r"toxi\w*",
+    r"chemical\w*",
+    r"carcinogen\w*",
+    r"hazard\w*",
+    r"exposure\w*",
+    r"solvent\w*",
+    r"pesticide\w*",
+    r"contaminant\w*",
+    r"poison\w*",
+    r"tsca",
+    r"cas\s+(?:no|number|rn)",
+    r"risk evaluation",
+    r"\w*(?:chlor|brom|fluor|phthal|benz|methyl|ethyl|propyl|dioxan)\w*",
+]
+
+CAS_NUMBER_PATTERN = re.compile(r"\b\d{2,7}-\d{2}-\d\b")
+
+RELEVANCE_PROMPT = """
+You are a fast relevance filter for a toxin extraction pipeline.
+Answer "yes" if the text mentions any chemical substance, toxin, pollutant or
+regulated material, otherwise answer "no". Answer with a single word.
+"""
+
+
+class RelevanceClassifier(Protocol):
+    """Decides whether a chunk of text is worth sending to the extraction model"""
+
+    name: str
+
+    async def classify(self, chunk: str) -> bool: ...
+
+
+class KeywordClassifier:
+    """
+    Local classifier that flags chunks containing toxin-related terms
+    or CAS registry numbers. Costs no API calls.
+    """
+
+    name = "keyword"
+
+    def __init__(self, keywords: Optional[List[str]] = None, min_hits: int = 2) -> None:
+        self.pattern = re.compile(
+            r"\b(?:" + "|".join(keywords or TOXIN_KEYWORDS) + r")", re.IGNORECASE
+        )
+        self.min_hits = min_hits
+
+    def is_relevant(self, chunk: str) -> bool:
+        if CAS_NUMBER_PATTERN.search(chunk):
+            return True
+        hits = 0
+        for _ in self.pattern.finditer(chunk):
+            hits += 1
+            if hits >= self.min_hits:
+                return True
+        return False
+
+    async def classify(self, chunk: str) -> bool:
+        return self.is_relevant(chunk)
+
+
+class ChemicalIndexClassifier:
+    """
+    Local classifier backed by the chemical-name dictionary index. Chunks
+    with a known chemical or a valid CAS number are relevant; others can
+    optionally be passed on to a fallback classifier.
+    """
+
+    name = "chemical_index"
+
+    def __init__(
+        self,
+        index: Optional[ChemicalIndex] = None,
+        fallback: Optional["RelevanceClassifier"] = None,
+    ) -> None:
+        self.index = index or load_default_index()
+        self.fallback = fallback
+
+    async def classify(self, chunk: str) -> bool:
+        if self.index.scan(chunk) or find_cas_numbers(chunk):
+            return True
+        if self.fallback is not None:
+            return await self.fallback.classify(chunk)
+        return False
+
+
+class ModelClassifier:
+    """Classifier that asks a small, cheap model for a yes/no relevance answer"""
+
+    def __init__(
+        self,
+        model: str = DEFAULT_PREFILTER_MODEL,
+        async_client: AsyncOpenAI | None = None,
+    ) -> None:
+        self.model = model
+        self.name = f"model:{model}"
+        self.async_client = async_client
+
+    async def classify(self, chunk: str) -> bool:
+        answer = await get_openai_text_response_async(
+            system_prompt=RELEVANCE_PROMPT,
+            user_prompt=chunk,
+            model=self.model,
+            async_client=self.async_client,
+        )
+        return answer.strip().lower().startswith("yes")
+
+
+class PassthroughClassifier:
+    """Classifier that escalates everything, i.e. routing without a prefilter"""
+
+    name = "off"
+
+    async def classify(self, chunk: str) -> bool:
+        return True
+
+
+@dataclass
+class RouteStats:
+    """Latency and cost counters for a single route"""
+
+    model: Optional[str] = None
+    calls: int = 0
+    chunks: int = 0
+    input_chars: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+    def record(self, latency: float, chunks: int, input_chars: int) -> None:
+        self.calls += 1
+        self.chunks += chunks
+        self.input_chars += input_chars
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    def as_dict(self) -> dict[str, float | int | str | None]:
+        estimated_tokens = self.input_chars // 4
+        price = MODEL_PRICES[self.model].input if self.model in MODEL_PRICES else 0.0
+        return {
+            "model": self.model,
+            "calls": self.calls,
+            "chunks": self.chunks,
+            "input_chars": self.input_chars,
+            "avg_latency_ms": (
+                round(1000 * self.total_latency / self.calls, 2) if self.calls else 0.0
+            ),
+            "max_latency_ms": round(1000 * self.max_latency, 2),
+            "estimated_input_tokens": estimated_tokens,
+            "estimated_input_cost_usd": round(estimated_tokens * price / 1_000_000, 6),
+        }
+
+
+def split_into_chunks(text: str, max_chars: int = 6000) -> List[str]:
+    """
+    Split text into chunks of at most max_chars, preferring paragraph boundaries.
+
+    Args:
+        text (str): Text to split
+        max_chars (int): Maximum chunk size in characters
+
+    Returns:
+        List[str]: Non-empty chunks in document order
+    """
+    chunks: List[str] = []
+    current = ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        while len(paragraph) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars:]
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class ModelRouter:
+    """
+    Routes toxin extraction requests through a cheap relevance prefilter
+    and only escalates relevant chunks to the large extraction model.
+
+    With a block cache, text is split into content-defined paragraph blocks
+    that are extracted and cached individually, so a re-crawl of a lightly
+    edited page only sends the changed blocks to the model.
+
+    Texts shorter than prefilter_min_chars skip the prefilter: a sentence or
+    two is too little for a local classifier to judge (e.g. "PFAS found in
+    drinking water" names no indexed chemical and one keyword at most), and
+    sending it to the model costs little.
+    """
+
+    def __init__(
+        self,
+        system_prompt: str | PromptPrefix,
+        classifier: Optional[RelevanceClassifier] = None,
+        model: str = DEFAULT_EXTRACTION_MODEL,
+        chunk_chars: int = 6000,
+        async_client: AsyncOpenAI | None = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        block_cache: Optional[BlockCache] = None,
+        block_concurrency: int = 4,
+        prefilter_min_chars: int = 500,
+    ) -> None:
+        self.system_prompt = system_prompt
+        self.hedge_policy = hedge_policy
+        self.block_cache = block_cache
+        self.block_concurrency = block_concurrency
+        self.classifier: RelevanceClassifier = classifier or KeywordClassifier()
+        self.model = model
+        self.chunk_chars = chunk_chars
+        self.prefilter_min_chars = prefilter_min_chars
+        self.async_client = async_client
+        self.stats: dict[str, RouteStats] = {}
+
+    def result_key(self) -> str:
+        """
+        Identifies everything besides the text and model that a whole-text
+        result depends on: the prompt and examples, the prefilter and the
+        chunk sizes. Used to key cached results in the result store.
+        """
+        prefix = (
+            self.system_prompt
+            if isinstance(self.system_prompt, PromptPrefix)
+            else PromptPrefix(self.system_prompt)
+        )
+        parts = [prefix.key(), self.classifier.name, self.chunk_chars, self.prefilter_min_chars]
+        return hashlib.sha256("\0".join(map(str, parts)).encode("utf-8")).hexdigest()
+
+    def _route_stats(self, route: str, model: Optional[str] = None) -> RouteStats:
+        if route not in self.stats:
+            self.stats[route] = RouteStats(model=model)
+        return self.stats[route]
+
+    async def select_relevant_chunks(self, text: str) -> List[str]:
+        """
+        Run the prefilter over the text and return only the relevant chunks.
+
+        Args:
+            text (str): Input text to classify
+
+        Returns:
+            List[str]: Chunks the classifier flagged as relevant
+        """
+        return await self._filter_relevant(split_into_chunks(text, self.chunk_chars))
+
+    async def _filter_relevant(self, chunks: List[str]) -> List[str]:
+        if not chunks:
+            return []
+        if sum(len(chunk) for chunk in chunks) < self.prefilter_min_chars:
+            return chunks
+
+        start = time.perf_counter()
+        verdicts = await asyncio.gather(
+            *(self.classifier.classify(chunk) for chunk in chunks)
+        )
+        classifier_model = getattr(self.classifier, "model", None)
+        self._route_stats(f"prefilter:{self.classifier.name}", classifier_model).record(
+            time.perf_counter() - start, len(chunks), sum(len(chunk) for chunk in chunks)
+        )
+        return [chunk for chunk, relevant in zip(chunks, verdicts) if relevant]
+
+    async def extract(self, text: str, deadline: Optional[Deadline] = None) -> ToxinList:
+        """
+        Extract toxins from text, skipping the large model when nothing is relevant.
+
+        Args:
+            text (str): Input text to process
+            deadline (Optional[Deadline]): Request deadline bounding the model call
+
+        Returns:
+            ToxinList: Extracted toxin information
+        """
+        if self.block_cache is not None:
+            return await self._extract_blocks(text, self.block_cache, deadline)
+
+        relevant = await self.select_relevant_chunks(text)
+        if not relevant:
+            logger.info("Prefilter found no relevant chunks, skipping extraction")
+            self._route_stats("skipped").record(0.0, 0, len(text))
+            return ToxinList(toxins=[])
+
+        content = "\n\n".join(relevant)
+        start = time.perf_counter()
+        result = await self._call_model(content, deadline)
+        self._route_stats(f"escalated:{self.model}", self.model).record(
+            time.perf_counter() - start, len(relevant), len(content)
+        )
+        return result
+
+    async def _extract_blocks(
+        self, text: str, cache: BlockCache, deadline: Optional[Deadline]
+    ) -> ToxinList:
+        relevant = await self._filter_relevant(split_blocks(text, max_chars=self.chunk_chars))
+        if not relevant:
+            logger.info("Prefilter found no relevant blocks, skipping extraction")
+            self._route_stats("skipped").record(0.0, 0, len(text))
+            return ToxinList(toxins=[])
+
+        results = await asyncio.to_thread(cache.get_many, relevant)
+        if results:
+            self._route_stats("cached_blocks").record(
+                0.0, len(results), sum(len(block) for block in results)
+            )
+        missing = list(dict.fromkeys(block for block in relevant if block not in results))
+        semaphore = asyncio.Semaphore(self.block_concurrency)
+
+        async def extract_block(block: str) -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                result = await self._call_model(block, deadline)
+                self._route_stats(f"escalated:{self.model}", self.model).record(
+                    time.perf_counter() - start, 1, len(block)
+                )
+            await asyncio.to_thread(cache.put, block, result)
+            results[block] = result
+
+        await asyncio.gather(*(extract_block(block) for block in missing))
+        logger.info(
+            f"Extracted {len(missing)} of {len(relevant)} relevant blocks, "
+            f"{len(relevant) - len(missing)} served from cache"
+        )
+        return ToxinList(
+            toxins=merge_toxins(
+                toxin for block in relevant for toxin in results[block].toxins
+            )
+        )
+
+    async def _call_model(self, content: str, deadline: Optional[Deadline]) -> ToxinList:
+        if self.hedge_policy is not None:
+            return await parse_input_hedged_async(
+                system_content=self.system_prompt,
+                user_content=content,
+                response_format=ToxinList,
+                policy=self.hedge_policy,
+                model=self.model,
+                async_client=self.async_client,
+                timeout=deadline.timeout() if deadline else None,
+            )
+        return await parse_input_async(
+            system_content=self.system_prompt,
+            user_content=content,
+            response_format=ToxinList,
+            model=self.model,
+            async_client=self.async_client,
+            timeout=deadline.timeout() if deadline else None,
+        )
+
+    async def extract_stream(
+        self, text: str, deadline: Optional[Deadline] = None
+    ) -> AsyncIterator[ToxinList.Toxin]:
+        """
+        Streaming variant of extract that yields each toxin as soon as the
+        model has finished generating it.
+
+        Args:
+            text (str): Input text to process
+            deadline (Optional[Deadline]): Request deadline bounding the model call
+
+        Yields:
+            ToxinList.Toxin: Extracted toxins in generation order
+        """
+        relevant = await self.select_relevant_chunks(text)
+        if not relevant:
+            logger.info("Prefilter found no relevant chunks, skipping extraction")
+            self._route_stats("skipped").record(0.0, 0, len(text))
+            return
+
+        content = "\n\n".join(relevant)
+        start = time.perf_counter()
+        # Closing this generator early, e.g. on a client disconnect, must close
+        # the model stream too rather than leave it to garbage collection
+        async with aclosing(
+            parse_input_stream_async(
+                system_content=self.system_prompt,
+                user_content=content,
+                response_format=ToxinList,
+                array_key="toxins",
+                item_format=ToxinList.Toxin,
+                model=self.model,
+                async_client=self.async_client,
+                timeout=deadline.timeout() if deadline else None,
+            )
+        ) as toxins:
+            async for toxin in toxins:
+                yield toxin
+        self._route_stats(f"streamed:{self.model}", self.model).record(
+            time.perf_counter() - start, len(relevant), len(content)
+        )
+
+    def stats_snapshot(self) -> dict[str, dict[str, float | int | str | None]]:
+        """Return per-route latency and cost statistics"""
+        return {route: stats.as_dict() for route, stats in self.stats.items()}
+
+
+def classifier_from_name(
+    name: str, async_client: AsyncOpenAI | None = None
+) -> RelevanceClassifier:
+    """
+    Build a relevance classifier from a configuration name.
+
+    Args:
+        name (str): "chemical_index", "keyword", "off",
+            or "model" / "model:<model-name>"
+        async_client (AsyncOpenAI | None): Client for model-based classifiers
+
+    Returns:
+        RelevanceClassifier: The configured classifier
+
+    Raises:
+        ValueError: If the name is not recognised
+    """
+    if name == "chemical_index":
+        # A single keyword is enough here: the index already misses
+        # everything outside its dictionary
+        return ChemicalIndexClassifier(fallback=KeywordClassifier(min_hits=1))
+    if name == "keyword":
+        return KeywordClassifier()
+    if name == "off":
+        return PassthroughClassifier()
+    if name == "model" or name.startswith("model:"):
+        model = name.split(":", 1)[1] if ":" in name else DEFAULT_PREFILTER_MODEL
+        return ModelClassifier(model=model, async_client=async_client)
+    raise ValueError(f"Unknown prefilter: {name}")
@@ -0,0 +1,118 @@
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from pydantic_models import ToxinList
+from result_store import ResultStore
+
+PARAGRAPH_BOUNDARY = re.compile(r"\n\s*\n")
+
+
+def _hash(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def split_blocks(
+    text: str, min_chars: int = 1000, max_chars: int = 6000, boundary_modulus: int = 4
+) -> List[str]:
+    """
+    Split text into paragraph blocks whose boundaries are stable under edits.
+
+    Boundaries are content-defined: a block ends after a paragraph whose hash
+    falls on the boundary modulus once the block holds at least min_chars, or
+    when adding the next paragraph would exceed max_chars. An edit to one
+    paragraph therefore only changes the block containing it, instead of
+    shifting every later block as fixed-size packing would.
+
+    Args:
+        text (str): Text to split
+        min_chars (int): Minimum block size before a content boundary is taken
+        max_chars (int): Maximum block size (a single longer paragraph is
+            split at max_chars)
+        boundary_modulus (int): On average one paragraph in this many is a
+            boundary candidate
+
+    Returns:
+        List[str]: Blocks in document order
+    """
+    blocks: List[str] = []
+    current: List[str] = []
+    current_len = 0
+
+    def flush() -> None:
+        nonlocal current, current_len
+        if current:
+            blocks.append("\n\n".join(current))
+        current, current_len = [], 0
+
+    for paragraph in PARAGRAPH_BOUNDARY.split(text):
+        paragraph = re.sub(r"[ \t]+", " ", paragraph).strip()
+        if not paragraph:
+            continue
+        while len(paragraph) > max_chars:
+            flush()
+            blocks.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars:]
+        if current and current_len + len(paragraph) > max_chars:
+            flush()
+        current.append(paragraph)
+        current_len += len(paragraph) + 2
+        if current_len >= min_chars and int(_hash(paragraph)[:8], 16) % boundary_modulus == 0:
+            flush()
+    flush()
+    return blocks
+
+
+@dataclass
+class BlockCacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    def as_dict(self) -> dict[str, float | int]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class BlockCache:
+    """
+    Per-block cache of extraction results in the result store. Keys cover
+    the block text, the model and the system prompt (or any string that
+    identifies the prompt, such as PromptPrefix.key()), so changing either
+    invalidates the cached results.
+    """
+
+    def __init__(self, store: ResultStore, model: str, system_prompt: str) -> None:
+        self.store = store
+        self.namespace = _hash(f"{model}\0{system_prompt}")
+        self.stats = BlockCacheStats()
+
+    def key(self, block: str) -> str:
+        return _hash(f"{self.namespace}\0{block}")
+
+    def get_many(self, blocks: List[str]) -> Dict[str, ToxinList]:
+        """
+        Look up cached results for blocks.
+
+        Args:
+            blocks (List[str]): Blocks to look up
+
+        Returns:
+            Dict[str, ToxinList]: Cached results keyed by block text
+        """
+        keys = {self.key(block): block for block in blocks}
+        found = self.store.get_block_results(list(keys))
+        results = {keys[key]: toxins for key, toxins in found.items()}
+        self.stats.hits += len(results)
+        self.stats.misses += len(set(blocks) - set(results))
+        return results
+
+    def put(self, block: str, toxins: ToxinList) -> None:
+        self.store.save_block_result(self.key(block), toxins)
+
+    def get(self, block: str) -> Optional[ToxinList]:
+        return self.get_many([block]).get(block)
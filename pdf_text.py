@@ -0,0 +1,107 @@
+import logging
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator, List, Optional
+
+from pypdf import PdfReader
+
+from html_pool import HTML_PROCESS_WORKERS, get_process_pool, reset_process_pool
+
+logger = logging.getLogger(__name__)
+
+# Below this many pages the process pool costs more than it saves
+MIN_PAGES_PER_WORKER = 8
+
+
+def count_pdf_pages(path: str) -> int:
+    """Number of pages in the PDF at path"""
+    with open(path, "rb") as pdf_file:
+        return len(PdfReader(pdf_file).pages)
+
+
+def iter_pdf_pages(path: str, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+    """
+    Yield the text of each page of a PDF file, one page at a time.
+
+    The file is read lazily: only the cross-reference table and the page
+    being extracted are parsed, so memory does not grow with the PDF size.
+
+    Args:
+        path (str): Path of the PDF file
+        start (int): Index of the first page
+        end (Optional[int]): Index after the last page, defaults to the last page
+
+    Yields:
+        str: Text of each page, stripped
+    """
+    with open(path, "rb") as pdf_file:
+        reader = PdfReader(pdf_file)
+        for index in range(start, min(end or len(reader.pages), len(reader.pages))):
+            try:
+                yield reader.pages[index].extract_text().strip()
+            except Exception as e:
+                # A single malformed page should not lose the rest of the document
+                logger.warning(f"Failed to extract text from page {index} of {path}: {e}")
+                yield ""
+
+
+def _extract_page_range(path: str, start: int, end: int) -> List[str]:
+    return list(iter_pdf_pages(path, start, end))
+
+
+def extract_text_from_pdf(
+    path: str, max_pages: Optional[int] = None, max_workers: Optional[int] = None
+) -> str:
+    """
+    Extract the text of a PDF file, in parallel across pages for large files.
+
+    Page ranges are handed to the process pool shared with HTML parsing
+    (see html_pool.get_process_pool), each worker opening the file itself.
+    Where processes are unavailable (e.g. AWS Lambda, which has no /dev/shm)
+    the pages are extracted sequentially instead.
+
+    Args:
+        path (str): Path of the PDF file
+        max_pages (Optional[int]): Only extract the first max_pages pages
+        max_workers (Optional[int]): Page ranges to split the file into, at
+            most the shared pool's HTML_PROCESS_WORKERS
+
+    Returns:
+        str: Page texts separated by blank lines
+    """
+    page_count = count_pdf_pages(path)
+    if max_pages is not None:
+        page_count = min(page_count, max_pages)
+    workers = min(
+        max_workers or HTML_PROCESS_WORKERS,
+        HTML_PROCESS_WORKERS,
+        page_count // MIN_PAGES_PER_WORKER,
+    )
+    pool = get_process_pool() if workers > 1 else None
+
+    pages: List[str] = []
+    if pool is not None:
+        step = -(-page_count // workers)
+        ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+        try:
+            for page_texts in pool.map(
+                _extract_page_range,
+                [path] * len(ranges),
+                [start for start, _ in ranges],
+                [end for _, end in ranges],
+            ):
+                pages.extend(page_texts)
+        except BrokenProcessPool as e:
+            logger.error(f"PDF process pool broke ({e}), extracting pages sequentially")
+            reset_process_pool(pool)
+            pages = []
+        except OSError as e:
+            logger.warning(f"Cannot start PDF worker processes ({e}), extracting sequentially")
+            reset_process_pool(pool, unavailable=True)
+            pages = []
+    else:
+        workers = 1
+    if not pages:
+        pages = list(iter_pdf_pages(path, 0, page_count))
+
+    logger.info(f"Extracted text from {page_count} PDF pages using {workers} workers")
+    return "\n\n".join(page for page in pages if page)
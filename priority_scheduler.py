@@ -0,0 +1,86 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Tuple
+
+# Lower runs first
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {"interactive": INTERACTIVE, "batch": BATCH}
+
+
+class PriorityScheduler:
+    """
+    Limits how many extractions run at once and hands free slots to the
+    highest-priority waiter first, FIFO within a priority. Interactive
+    requests therefore only wait for running work, never for queued batch
+    or crawl work. Batch work waits as long as interactive work is queued.
+
+    Must be used from one event loop at a time.
+    """
+
+    def __init__(self, max_concurrent: int) -> None:
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        self.max_concurrent = max_concurrent
+        self.active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future[None]]] = []
+        self._order = itertools.count()
+        self._waited: Dict[int, Tuple[int, float]] = {}
+
+    @asynccontextmanager
+    async def slot(self, priority: int = INTERACTIVE) -> AsyncIterator[None]:
+        """
+        Hold one of the scheduler's slots for the duration of the block.
+
+        Args:
+            priority (int): INTERACTIVE or BATCH
+        """
+        start = time.monotonic()
+        await self._acquire(priority)
+        count, total = self._waited.get(priority, (0, 0.0))
+        self._waited[priority] = (count + 1, total + time.monotonic() - start)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: int) -> None:
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            return
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._order), waiter)
+        heapq.heappush(self._waiters, entry)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot just as we were cancelled; pass it on
+                self._release()
+            else:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+    def _release(self) -> None:
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                # The slot passes straight to the waiter, active is unchanged
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict[str, float | int]:
+        stats: dict[str, float | int] = {
+            "max_concurrent": self.max_concurrent,
+            "active": self.active,
+        }
+        for name, priority in PRIORITY_NAMES.items():
+            count, total = self._waited.get(priority, (0, 0.0))
+            stats[f"{name}_queued"] = sum(1 for entry in self._waiters if entry[0] == priority)
+            stats[f"{name}_avg_wait_s"] = round(total / count, 4) if count else 0.0
+        return stats
@@ -1,2 +1,95 @@
-prompt_to_extract_toxins = """ You are an intelligent assistant that identifies potential toxins based on the line of products, raw materials, and manufacturing requirements provided by the user. Analyze the inputs to determine possible toxins, and their potential sources, and explain why those toxins might be present. Present your response in a clean, structured, and professional table format.
+prompt_to_extract_toxins = """ You are an intelligent assistant that identifies potential toxins based on the line of products, raw materials, and manufacturing requirements provided by the user. Analyze the inputs to determine possible toxins, and their potential sources, and explain why those toxins might be present. Report each toxin once, in the JSON structure the response format requests.
 """
+
+# Appended to the extraction prompt when PROMPT_EXAMPLES=true. Together with
+# the examples below this keeps the fixed part of every extraction request
+# above the 1024 tokens OpenAI needs before it caches a prompt prefix (see
+# text_2_entity.PromptPrefix), at the price of ~1250 prompt tokens per call.
+# Off by default until benchmarks/bench_prompt_cache.py shows it pays off.
+extraction_guidelines = """
+Report every chemical substance, toxin, pollutant or regulated material the
+text names, and nothing the text does not support. For each toxin:
+
+- name: the substance as named in the text, preferring the full chemical name
+  over an abbreviation when both appear ("Trichloroethylene", not "TCE").
+  Mixtures and product classes ("PFAS", "VOCs") are reported under that name.
+- sources: products, raw materials, processes or industries the text links to
+  the substance, e.g. "vapor degreasing", "spot cleaners", "coal combustion".
+  Leave the list empty when the text names none.
+- health_effects: effects on people or animals stated in the text, e.g.
+  "liver toxicity", "developmental effects". Do not add effects from general
+  knowledge.
+- related_diseases: named diseases or cancers the text associates with the
+  substance, e.g. "kidney cancer", "non-Hodgkin lymphoma".
+- reference_context: one or two sentences quoted verbatim from the text that
+  mention the substance, so a reader can find the passage. Never paraphrase.
+- relevant_regulations: statutes, rules, sections or agency actions the text
+  ties to the substance, e.g. "TSCA section 6", "Clean Air Act section 112",
+  "EU REACH Annex XVII". Keep the wording used in the text.
+- cas_number: the CAS registry number only when it appears in the text,
+  otherwise null. Never guess a CAS number.
+
+Report each substance once, merging everything the text says about it. Text
+from navigation menus, cookie banners, footers and unrelated articles on the
+same page is noise: ignore it. If the text names no substance, return an
+empty toxins list.
+"""
+
+# Few-shot examples sent after the system prompt as (user, assistant) turns.
+# Part of the cached prompt prefix: changing them invalidates the provider's
+# cache and the paragraph block cache.
+extraction_examples = [
+    (
+        "EPA finalized a rule under TSCA section 6 prohibiting most uses of "
+        "trichloroethylene (TCE), CAS 79-01-6. TCE is used in vapor degreasing and "
+        "in aerosol spot cleaners; exposure is linked to kidney cancer, liver "
+        "toxicity and developmental effects. Sign up for our newsletter.",
+        '{"toxins": [{"name": "Trichloroethylene", "sources": ["vapor degreasing", '
+        '"aerosol spot cleaners"], "health_effects": ["liver toxicity", '
+        '"developmental effects"], "related_diseases": ["kidney cancer"], '
+        '"reference_context": "EPA finalized a rule under TSCA section 6 prohibiting '
+        'most uses of trichloroethylene (TCE), CAS 79-01-6.", '
+        '"relevant_regulations": ["TSCA section 6"], "cas_number": "79-01-6"}]}',
+    ),
+    (
+        "Residents near the smelter asked the state to test soil for lead and "
+        "arsenic. Lead exposure in children causes lowered IQ and behavioral "
+        "problems. Arsenic in drinking water is regulated under the Safe Drinking "
+        "Water Act, with a maximum contaminant level of 10 ppb, and long-term "
+        "exposure is associated with bladder and skin cancer.",
+        '{"toxins": [{"name": "Lead", "sources": ["smelter"], "health_effects": '
+        '["lowered IQ", "behavioral problems"], "related_diseases": [], '
+        '"reference_context": "Lead exposure in children causes lowered IQ and '
+        'behavioral problems.", "relevant_regulations": [], "cas_number": null}, '
+        '{"name": "Arsenic", "sources": ["smelter", "drinking water"], '
+        '"health_effects": [], "related_diseases": ["bladder cancer", "skin cancer"], '
+        '"reference_context": "Arsenic in drinking water is regulated under the Safe '
+        'Drinking Water Act, with a maximum contaminant level of 10 ppb, and long-term '
+        'exposure is associated with bladder and skin cancer.", '
+        '"relevant_regulations": ["Safe Drinking Water Act"], "cas_number": null}]}',
+    ),
+    (
+        "The utility detected PFOA and PFOS, two PFAS chemicals, in three wells "
+        "downstream of the airport, where firefighting foam was used in training "
+        "exercises. EPA's 2024 National Primary Drinking Water Regulation sets a "
+        "limit of 4 parts per trillion for each. Studies link PFOA to testicular and "
+        "kidney cancer and to reduced vaccine response in children.",
+        '{"toxins": [{"name": "Perfluorooctanoic acid (PFOA)", "sources": '
+        '["firefighting foam"], "health_effects": ["reduced vaccine response in '
+        'children"], "related_diseases": ["testicular cancer", "kidney cancer"], '
+        '"reference_context": "Studies link PFOA to testicular and kidney cancer and to '
+        'reduced vaccine response in children.", "relevant_regulations": ["National '
+        'Primary Drinking Water Regulation"], "cas_number": null}, {"name": '
+        '"Perfluorooctanesulfonic acid (PFOS)", "sources": ["firefighting foam"], '
+        '"health_effects": [], "related_diseases": [], "reference_context": "The '
+        'utility detected PFOA and PFOS, two PFAS chemicals, in three wells downstream '
+        'of the airport, where firefighting foam was used in training exercises.", '
+        '"relevant_regulations": ["National Primary Drinking Water Regulation"], '
+        '"cas_number": null}]}',
+    ),
+    (
+        "Our store hours are changing for the holidays. Visit the garden center for "
+        "seasonal plants and the new line of ceramic planters.",
+        '{"toxins": []}',
+    ),
+]
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 
@@ -13,6 +15,7 @@ class ToxinList(BaseModel):
         related_diseases: list[str]
         reference_context: str
         relevant_regulations: list[str]
+        cas_number: Optional[str] = None
 
     toxins: list[Toxin]
 
@@ -20,3 +23,50 @@ class ToxinList(BaseModel):
 class ToxinListResponse(BaseModel):
     toxins: list[ToxinList.Toxin]
     urls: list[str]
+
+
+class StoredToxin(ToxinList.Toxin):
+    """A toxin served from the result store, with its provenance"""
+
+    id: int
+    source_url: Optional[str]
+    model: str
+    extracted_at: float
+
+
+class ToxinSearchResponse(BaseModel):
+    toxins: list[StoredToxin]
+    # Pass as after= to fetch the next page; None on the last page
+    next_cursor: Optional[str] = None
+
+
+class WatchedPage(BaseModel):
+    """A monitored URL and what was extracted from it last time it changed"""
+
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fingerprint: Optional[str]
+    toxins: list[ToxinList.Toxin]
+    added_at: float
+    last_checked: Optional[float]
+    last_changed: Optional[float]
+
+
+class WatchCheckResult(BaseModel):
+    """Outcome of re-checking a watched page"""
+
+    url: str
+    status: str
+    added_toxins: list[str] = []
+    removed_toxins: list[str] = []
+    error: Optional[str] = None
+
+
+class CrawledPage(BaseModel):
+    """A page visited by the crawler"""
+
+    url: str
+    depth: int
+    toxins: list[ToxinList.Toxin] = []
+    error: Optional[str] = None
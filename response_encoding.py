@@ -0,0 +1,230 @@
+import zlib
+from typing import Any, Callable, Optional, Set, Tuple
+
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from pydantic_models import ToxinList
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+TOXIN_FIELDS = tuple(ToxinList.Toxin.model_fields)
+
+# Responses that must reach the client chunk by chunk are never compressed,
+# nor are Parquet and Arrow exports, which are already zstd-compressed
+UNCOMPRESSED_MEDIA_TYPES = (
+    "application/x-ndjson",
+    "text/event-stream",
+    "application/vnd.apache.parquet",
+    "application/vnd.apache.arrow.stream",
+)
+
+
+def parse_fields(
+    fields: Optional[str], allowed: Tuple[str, ...] = TOXIN_FIELDS
+) -> Optional[Set[str]]:
+    """
+    Parse a fields= query parameter: a comma-separated list of toxin fields
+    to include in the response. The toxin name is always included.
+
+    Args:
+        fields (Optional[str]): The raw parameter, e.g. "name,cas_number"
+        allowed (Tuple[str, ...]): Field names that may be selected
+
+    Returns:
+        Optional[Set[str]]: The selected fields, None to include all of them
+
+    Raises:
+        HTTPException: 400 if a field name is unknown
+    """
+    if not fields:
+        return None
+    selected = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = selected - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields {sorted(unknown)}, choose from {list(allowed)}",
+        )
+    return selected | {"name"}
+
+
+class ToxinJSONResponse(ORJSONResponse):
+    """
+    orjson-backed response for pydantic models. Returning it from an
+    endpoint skips FastAPI's jsonable_encoder pass over the response model.
+    """
+
+    def __init__(
+        self, content: Any, include: Optional[Any] = None, **kwargs: Any
+    ) -> None:
+        if isinstance(content, BaseModel):
+            content = content.model_dump(include=include)
+        super().__init__(content, **kwargs)
+
+
+def toxin_response(model: BaseModel, fields: Optional[Set[str]] = None) -> ToxinJSONResponse:
+    """
+    Serialize a model holding a toxins list, keeping only the given toxin
+    fields when a projection is requested.
+
+    Args:
+        model (BaseModel): e.g. ToxinList, ToxinListResponse or ToxinSearchResponse
+        fields (Optional[Set[str]]): Toxin fields to keep, see parse_fields
+
+    Returns:
+        ToxinJSONResponse: The encoded response
+    """
+    include: Optional[dict[str, Any]] = None
+    if fields is not None:
+        include = {name: True for name in type(model).model_fields}
+        include["toxins"] = {"__all__": fields}
+    return ToxinJSONResponse(model, include=include)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the response encoding from an Accept-Encoding header.
+
+    The accepted coding with the highest q-value wins; between equal
+    q-values brotli is preferred when the brotli module is installed, as at
+    CompressionMiddleware's brotli_quality it compresses toxin lists smaller
+    than gzip (see benchmarks/bench_serialization.py).
+
+    Args:
+        accept_encoding (str): The raw header, e.g. "gzip;q=1.0, br;q=0.5"
+
+    Returns:
+        Optional[str]: "br", "gzip" or None to send the body uncompressed
+    """
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    wildcard = accepted.get("*", 0.0)
+    # In order of preference between equal q-values
+    supported = (["br"] if brotli is not None else []) + ["gzip"]
+    encoding = max(supported, key=lambda coding: accepted.get(coding, wildcard))
+    return encoding if accepted.get(encoding, wildcard) > 0 else None
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with brotli or gzip, negotiated per request via
+    Accept-Encoding. Bodies under minimum_size are sent as is, and streamed
+    NDJSON/SSE responses are never compressed so every line is delivered
+    as soon as it is produced.
+
+    brotli_quality defaults to 8: on the 500-toxin benchmark response
+    (441 KB) quality 5 gave 63 KB against gzip's 55 KB, while quality 8
+    gives 52 KB in about 26 ms. Quality 11 is smaller still but takes over
+    a second.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 8,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(send, encoding, self)
+        await self.app(scope, receive, responder)
+
+    def compressor(self, encoding: str) -> Callable[[bytes, bool], bytes]:
+        """Return compress(chunk, final) for the encoding"""
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+
+            def compress_br(chunk: bytes, final: bool) -> bytes:
+                data: bytes = compressor.process(chunk)
+                tail: bytes = compressor.finish() if final else compressor.flush()
+                return data + tail
+
+            return compress_br
+
+        gzip = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+
+        def compress_gzip(chunk: bytes, final: bool) -> bytes:
+            data = gzip.compress(chunk)
+            return data + gzip.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+        return compress_gzip
+
+
+class _CompressingResponder:
+    def __init__(self, send: Send, encoding: str, middleware: CompressionMiddleware) -> None:
+        self.send = send
+        self.encoding = encoding
+        self.middleware = middleware
+        self.start: Optional[Message] = None
+        self.passthrough = False
+        self.compress: Optional[Callable[[bytes, bool], bytes]] = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            media_type = headers.get("content-type", "").split(";", 1)[0].strip()
+            self.passthrough = (
+                "content-encoding" in headers or media_type in UNCOMPRESSED_MEDIA_TYPES
+            )
+            if self.passthrough:
+                await self.send(message)
+            else:
+                # Held back until the first body chunk shows whether to compress
+                self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+        if self.start is not None:
+            start, self.start = self.start, None
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            self.compress = self.middleware.compressor(self.encoding)
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            body = self.compress(body, not more_body)
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(body))
+            await self.send(start)
+            await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        assert self.compress is not None
+        chunk = self.compress(body, not more_body)
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
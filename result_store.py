@@ -0,0 +1,472 @@
+import base64
+import binascii
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional
+
+from chemical_index import normalize_toxin_name
+from pydantic_models import StoredToxin, ToxinList, WatchedPage
+from toxin_record import StoredToxinRecord
+
+DEFAULT_STORE_PATH = os.path.join("/tmp", "toxin_results.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS extractions (
+    id INTEGER PRIMARY KEY,
+    source_url TEXT,
+    text_hash TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt_key TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    result_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_extractions_hash ON extractions (text_hash, model);
+CREATE INDEX IF NOT EXISTS idx_extractions_source ON extractions (source_url);
+
+CREATE TABLE IF NOT EXISTS toxins (
+    id INTEGER PRIMARY KEY,
+    extraction_id INTEGER NOT NULL REFERENCES extractions (id),
+    name TEXT NOT NULL,
+    normalized_name TEXT NOT NULL,
+    cas_number TEXT,
+    toxin_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_toxins_name ON toxins (normalized_name);
+CREATE INDEX IF NOT EXISTS idx_toxins_cas ON toxins (cas_number);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS toxins_fts USING fts5 (
+    name, regulations, diseases, health_effects, sources,
+    content='', tokenize='porter unicode61'
+);
+
+CREATE TABLE IF NOT EXISTS watched_pages (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    fingerprint TEXT,
+    toxins_json TEXT,
+    added_at REAL NOT NULL,
+    last_checked REAL,
+    last_changed REAL
+);
+
+CREATE TABLE IF NOT EXISTS block_results (
+    block_key TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    result_json TEXT NOT NULL
+);
+"""
+
+
+def text_hash(text: str) -> str:
+    """Stable hash of the text an extraction was run on"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def encode_cursor(toxin_id: int) -> str:
+    """Opaque pagination cursor pointing after the given stored toxin"""
+    return base64.urlsafe_b64encode(f"t{toxin_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Decode a cursor returned by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        decoded = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor {cursor!r}") from e
+    if not decoded.startswith("t") or not decoded[1:].isdigit():
+        raise ValueError(f"Invalid cursor {cursor!r}")
+    return int(decoded[1:])
+
+
+def _fts_phrase(value: str) -> str:
+    # Quote user input as an FTS5 phrase so operators in it are not interpreted
+    return '"' + value.replace('"', '""') + '"'
+
+
+class ResultStore:
+    """
+    SQLite-backed store of extraction results with an FTS5 index over
+    toxin names, regulations, diseases, health effects and sources.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._connect()
+
+    def _connect(self) -> None:
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(extractions)")}
+            if "prompt_key" not in columns:
+                # Stores created before results were keyed by prompt
+                self._conn.execute(
+                    "ALTER TABLE extractions ADD COLUMN prompt_key TEXT NOT NULL DEFAULT ''"
+                )
+
+    def reopen(self) -> None:
+        """
+        Open a fresh connection in a forked worker process. A SQLite
+        connection must not be used on both sides of a fork, so the
+        inherited one is dropped without being closed.
+        """
+        self._lock = threading.Lock()
+        self._connect()
+
+    def save_extraction(
+        self,
+        text: str,
+        toxins: ToxinList,
+        model: str,
+        source_url: Optional[str] = None,
+        prompt_key: str = "",
+    ) -> int:
+        """
+        Record an extraction result and index its toxins.
+
+        Args:
+            text (str): Text the extraction was run on
+            toxins (ToxinList): Extracted toxins
+            model (str): Model that produced the result
+            source_url (Optional[str]): URL the text came from, if any
+            prompt_key (str): Identifies the prompt and pipeline settings the
+                result depends on, see ModelRouter.result_key()
+
+        Returns:
+            int: Id of the stored extraction
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO extractions (source_url, text_hash, model, prompt_key, "
+                "created_at, result_json) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    source_url,
+                    text_hash(text),
+                    model,
+                    prompt_key,
+                    time.time(),
+                    toxins.model_dump_json(),
+                ),
+            )
+            extraction_id = cursor.lastrowid
+            assert extraction_id is not None
+            for toxin in toxins.toxins:
+                toxin_id = self._conn.execute(
+                    "INSERT INTO toxins (extraction_id, name, normalized_name, "
+                    "cas_number, toxin_json) VALUES (?, ?, ?, ?, ?)",
+                    (
+                        extraction_id,
+                        toxin.name,
+                        normalize_toxin_name(toxin.name),
+                        toxin.cas_number,
+                        toxin.model_dump_json(),
+                    ),
+                ).lastrowid
+                self._conn.execute(
+                    "INSERT INTO toxins_fts (rowid, name, regulations, diseases, "
+                    "health_effects, sources) VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        toxin_id,
+                        toxin.name,
+                        "\n".join(toxin.relevant_regulations),
+                        "\n".join(toxin.related_diseases),
+                        "\n".join(toxin.health_effects),
+                        "\n".join(toxin.sources),
+                    ),
+                )
+            return extraction_id
+
+    def get_cached(self, text: str, model: str, prompt_key: str = "") -> Optional[ToxinList]:
+        """
+        Return the most recent result for the same text, model and prompt,
+        if any.
+
+        Args:
+            text (str): Text to be extracted
+            model (str): Extraction model
+            prompt_key (str): prompt_key the result was saved with
+
+        Returns:
+            Optional[ToxinList]: The stored result, or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result_json FROM extractions WHERE text_hash = ? AND model = ? "
+                "AND prompt_key = ? ORDER BY id DESC LIMIT 1",
+                (text_hash(text), model, prompt_key),
+            ).fetchone()
+        return ToxinList.model_validate_json(row["result_json"]) if row else None
+
+    def get_block_results(self, keys: List[str]) -> Dict[str, ToxinList]:
+        """
+        Return cached per-block results for the given block keys.
+
+        Args:
+            keys (List[str]): Block cache keys
+
+        Returns:
+            Dict[str, ToxinList]: Results for the keys that are cached
+        """
+        if not keys:
+            return {}
+        results: Dict[str, ToxinList] = {}
+        with self._lock:
+            # Stay under SQLite's default host parameter limit
+            for start in range(0, len(keys), 500):
+                end = start + 500
+                batch = keys[start:end]
+                rows = self._conn.execute(
+                    "SELECT block_key, result_json FROM block_results "
+                    f"WHERE block_key IN ({', '.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                for row in rows:
+                    results[row["block_key"]] = ToxinList.model_validate_json(
+                        row["result_json"]
+                    )
+        return results
+
+    def save_block_result(self, key: str, toxins: ToxinList) -> None:
+        """Cache the extraction result for one text block"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO block_results (block_key, created_at, "
+                "result_json) VALUES (?, ?, ?)",
+                (key, time.time(), toxins.model_dump_json()),
+            )
+
+    def search_toxins(
+        self,
+        name: Optional[str] = None,
+        regulation: Optional[str] = None,
+        disease: Optional[str] = None,
+        query: Optional[str] = None,
+        source_url: Optional[str] = None,
+        limit: int = 50,
+        before_id: Optional[int] = None,
+    ) -> List[StoredToxin]:
+        """
+        Query stored toxins from the index.
+
+        Results are ordered by id, newest first, so a page continues from the
+        last id of the previous one with before_id and stays stable while new
+        extractions are saved.
+
+        Args:
+            name (Optional[str]): Toxin name, synonym or CAS number (exact match
+                after normalization)
+            regulation (Optional[str]): Phrase to match in relevant_regulations
+            disease (Optional[str]): Phrase to match in related_diseases
+            query (Optional[str]): Full-text phrase matched against all fields
+            source_url (Optional[str]): Only toxins extracted from this URL
+            limit (int): Maximum number of results
+            before_id (Optional[int]): Only toxins with a lower id (keyset pagination)
+
+        Returns:
+            List[StoredToxin]: Matching toxins, newest first
+        """
+        conditions: List[str] = []
+        params: List[str | int] = []
+        if before_id is not None:
+            conditions.append("t.id < ?")
+            params.append(before_id)
+        if source_url:
+            conditions.append("e.source_url = ?")
+            params.append(source_url)
+        if name:
+            conditions.append("(t.normalized_name = ? OR t.cas_number = ?)")
+            params.extend([normalize_toxin_name(name), name.strip()])
+
+        fts_terms: List[str] = []
+        if regulation:
+            fts_terms.append(f"regulations : {_fts_phrase(regulation)}")
+        if disease:
+            fts_terms.append(f"diseases : {_fts_phrase(disease)}")
+        if query:
+            fts_terms.append(_fts_phrase(query))
+        if fts_terms:
+            conditions.append(
+                "t.id IN (SELECT rowid FROM toxins_fts WHERE toxins_fts MATCH ?)"
+            )
+            params.append(" AND ".join(fts_terms))
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT t.id, t.toxin_json, e.source_url, e.model, e.created_at "
+                "FROM toxins t JOIN extractions e ON e.id = t.extraction_id "
+                f"{where} ORDER BY t.id DESC LIMIT ?",
+                params,
+            ).fetchall()
+        return [self._to_stored_toxin(row) for row in rows]
+
+    def iter_toxin_records(
+        self, batch_size: int = 10000, source_url: Optional[str] = None
+    ) -> Iterator[List[StoredToxinRecord]]:
+        """
+        Yield every stored toxin as compact records in id order, one batch at
+        a time, so exports read the whole store in bounded memory. The lock
+        is held only while each batch is fetched.
+
+        Args:
+            batch_size (int): Toxins per batch
+            source_url (Optional[str]): Only toxins extracted from this URL
+
+        Yields:
+            List[StoredToxinRecord]: The next batch of toxins
+        """
+        last_id = 0
+        source_filter = "AND e.source_url = ? " if source_url else ""
+        while True:
+            params: List[str | int] = [last_id]
+            if source_url:
+                params.append(source_url)
+            params.append(batch_size)
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT t.id, t.toxin_json, e.source_url, e.model, e.created_at "
+                    "FROM toxins t JOIN extractions e ON e.id = t.extraction_id "
+                    f"WHERE t.id > ? {source_filter}ORDER BY t.id LIMIT ?",
+                    params,
+                ).fetchall()
+            if not rows:
+                return
+            yield [
+                StoredToxinRecord(
+                    **json.loads(row["toxin_json"]),
+                    id=row["id"],
+                    source_url=row["source_url"],
+                    model=row["model"],
+                    extracted_at=row["created_at"],
+                )
+                for row in rows
+            ]
+            last_id = rows[-1]["id"]
+
+    @staticmethod
+    def _to_stored_toxin(row: sqlite3.Row) -> StoredToxin:
+        return StoredToxin(
+            **json.loads(row["toxin_json"]),
+            id=row["id"],
+            source_url=row["source_url"],
+            model=row["model"],
+            extracted_at=row["created_at"],
+        )
+
+    def add_watch(self, url: str) -> WatchedPage:
+        """
+        Add a URL to the watch list. Adding an already watched URL is a no-op.
+
+        Args:
+            url (str): URL to monitor
+
+        Returns:
+            WatchedPage: The watched page record
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO watched_pages (url, added_at) VALUES (?, ?)",
+                (url, time.time()),
+            )
+        watch = self.get_watch(url)
+        assert watch is not None
+        return watch
+
+    def remove_watch(self, url: str) -> bool:
+        """Stop watching a URL. Returns False if it was not watched."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM watched_pages WHERE url = ?", (url,))
+        return cursor.rowcount > 0
+
+    def get_watch(self, url: str) -> Optional[WatchedPage]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM watched_pages WHERE url = ?", (url,)
+            ).fetchone()
+        return self._to_watched_page(row) if row else None
+
+    def list_watches(self) -> List[WatchedPage]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM watched_pages ORDER BY added_at"
+            ).fetchall()
+        return [self._to_watched_page(row) for row in rows]
+
+    def update_watch(
+        self,
+        url: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        fingerprint: Optional[str] = None,
+        toxins: Optional[ToxinList] = None,
+    ) -> None:
+        """
+        Record the result of checking a watched page. The fingerprint and
+        toxins are only replaced when given, i.e. when the content changed.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            if fingerprint is None:
+                self._conn.execute(
+                    "UPDATE watched_pages SET etag = ?, last_modified = ?, "
+                    "last_checked = ? WHERE url = ?",
+                    (etag, last_modified, now, url),
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE watched_pages SET etag = ?, last_modified = ?, "
+                    "fingerprint = ?, toxins_json = ?, last_checked = ?, "
+                    "last_changed = ? WHERE url = ?",
+                    (
+                        etag,
+                        last_modified,
+                        fingerprint,
+                        toxins.model_dump_json() if toxins else None,
+                        now,
+                        now,
+                        url,
+                    ),
+                )
+
+    @staticmethod
+    def _to_watched_page(row: sqlite3.Row) -> WatchedPage:
+        return WatchedPage(
+            url=row["url"],
+            etag=row["etag"],
+            last_modified=row["last_modified"],
+            fingerprint=row["fingerprint"],
+            toxins=(
+                ToxinList.model_validate_json(row["toxins_json"]).toxins
+                if row["toxins_json"]
+                else []
+            ),
+            added_at=row["added_at"],
+            last_checked=row["last_checked"],
+            last_changed=row["last_changed"],
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+@lru_cache(maxsize=None)
+def get_result_store() -> ResultStore:
+    """Return the process-wide result store at RESULT_STORE_PATH"""
+    return ResultStore(os.environ.get("RESULT_STORE_PATH", DEFAULT_STORE_PATH))
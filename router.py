@@ -1,9 +1,14 @@
+import asyncio
+import json
+import logging
 import os
 import sys
+from contextlib import aclosing
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, HttpUrl
-from typing import List
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field, HttpUrl
+from typing import Any, AsyncIterator, Awaitable, List, TypeVar
 
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -15,16 +20,138 @@ sys.path.append(current_dir)
 from url_2_text import url_to_text  # noqa: E402
 
 # import prompts
-from prompts import prompt_to_extract_toxins  # noqa: E402
-from text_2_entity import parse_input  # noqa: E402
-from pydantic_models import ToxinList, ToxinListResponse  # noqa: E402
+from prompts import (  # noqa: E402
+    extraction_examples,
+    extraction_guidelines,
+    prompt_to_extract_toxins,
+)
+from text_2_entity import HedgePolicy, PromptPrefix, get_shared_async_client  # noqa: E402
+from pydantic_models import (  # noqa: E402
+    CrawledPage,
+    StoredToxin,
+    ToxinList,
+    ToxinListResponse,
+    ToxinSearchResponse,
+    WatchCheckResult,
+    WatchedPage,
+)
+from result_store import decode_cursor, encode_cursor, get_result_store  # noqa: E402
+from toxin_export import EXPORT_FORMATS, iter_export, require_pyarrow  # noqa: E402
+from paragraph_cache import BlockCache  # noqa: E402
+from watchlist import WatchList  # noqa: E402
+from crawler import CrawlConfig, Crawler  # noqa: E402
+from response_encoding import (  # noqa: E402
+    CompressionMiddleware,
+    parse_fields,
+    toxin_response,
+)
 from extract_urls import extract_urls  # noqa: E402
+from chemical_index import enrich_toxin, enrich_toxins  # noqa: E402
+from context_window import ContextStats, condense_context  # noqa: E402
+from circuit_breaker import breaker_stats  # noqa: E402
+from token_usage import UsageMiddleware, usage_stats  # noqa: E402
+from priority_scheduler import BATCH, INTERACTIVE, PriorityScheduler  # noqa: E402
+from tenants import TenantMiddleware, TenantRegistry, current_tenant  # noqa: E402
+from deadline import (  # noqa: E402
+    ClientDisconnected,
+    Deadline,
+    DeadlineExceeded,
+    iterate_with_deadline,
+    request_deadline,
+    run_with_deadline,
+)
+from model_router import (  # noqa: E402
+    DEFAULT_EXTRACTION_MODEL,
+    ModelRouter,
+    classifier_from_name,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
 
 app = FastAPI(
     title="Toxin Parser API",
     description="API for extracting toxin information from URLs and text content",
     version="1.0.0",
 )
+# br/gzip as negotiated by Accept-Encoding; streamed NDJSON is left as is
+app.add_middleware(
+    CompressionMiddleware, minimum_size=int(os.environ.get("COMPRESS_MIN_BYTES", "1024"))
+)
+# Token usage per endpoint, model and tenant, reported in /metrics and, unless
+# TOKEN_USAGE_HEADERS=false, in X-Token-Usage-* response headers
+app.add_middleware(
+    UsageMiddleware,
+    add_headers=os.environ.get("TOKEN_USAGE_HEADERS", "true").lower() == "true",
+)
+# API-key tenants with concurrency and token quotas are opt-in: set
+# TENANTS_FILE to a JSON list of tenants (see TenantRegistry.from_file)
+tenant_registry = (
+    TenantRegistry.from_file(
+        os.environ["TENANTS_FILE"],
+        quota_window_seconds=float(os.environ.get("QUOTA_WINDOW_SECONDS", "86400")),
+    )
+    if os.environ.get("TENANTS_FILE")
+    else None
+)
+# Without TENANTS_FILE, X-Tenant-ID names the tenant only if it is listed in
+# TENANT_IDS (comma-separated); any other value is counted as "default".
+# Added last so it runs first and UsageMiddleware sees the tenant
+app.add_middleware(
+    TenantMiddleware,
+    registry=tenant_registry,
+    allowed_tenants=[
+        name.strip() for name in os.environ.get("TENANT_IDS", "").split(",") if name.strip()
+    ],
+)
+
+# Hedged requests are opt-in: set HEDGE_PERCENTILE (e.g. 95) to enable them
+hedge_policy = (
+    HedgePolicy(
+        percentile=float(os.environ["HEDGE_PERCENTILE"]),
+        fallback_model=os.environ.get("HEDGE_FALLBACK_MODEL") or None,
+    )
+    if os.environ.get("HEDGE_PERCENTILE")
+    else None
+)
+
+extraction_model = os.environ.get("EXTRACTION_MODEL", DEFAULT_EXTRACTION_MODEL)
+# The system prompt is sent as a fixed prefix ahead of the page text. Set
+# PROMPT_EXAMPLES=true to add the guidelines and few-shot examples, which make
+# the prefix long enough for OpenAI to cache but cost ~1250 tokens per call
+extraction_prefix = (
+    PromptPrefix(
+        prompt_to_extract_toxins + extraction_guidelines,
+        tuple(extraction_examples),
+    )
+    if os.environ.get("PROMPT_EXAMPLES", "false").lower() == "true"
+    else PromptPrefix(prompt_to_extract_toxins)
+)
+# Cache extraction results per paragraph block so edited pages only re-extract
+# the blocks that changed
+block_cache = (
+    BlockCache(get_result_store(), extraction_model, extraction_prefix.key())
+    if os.environ.get("PARAGRAPH_CACHE", "true").lower() == "true"
+    else None
+)
+toxin_router = ModelRouter(
+    system_prompt=extraction_prefix,
+    classifier=classifier_from_name(
+        os.environ.get("PREFILTER", "chemical_index"), async_client=get_shared_async_client()
+    ),
+    model=extraction_model,
+    async_client=get_shared_async_client(),
+    hedge_policy=hedge_policy,
+    block_cache=block_cache,
+)
+# Extractions running at once; interactive requests get free slots before
+# crawl, watch and batch-tenant work
+extraction_scheduler = PriorityScheduler(int(os.environ.get("EXTRACTION_CONCURRENCY", "8")))
+context_stats = ContextStats()
+CONTEXT_WINDOW_SENTENCES = int(os.environ.get("CONTEXT_WINDOW_SENTENCES", "2"))
+# Serve repeated extractions of identical text from the result store
+USE_RESULT_CACHE = os.environ.get("USE_RESULT_CACHE", "true").lower() == "true"
 
 
 class TextInput(BaseModel):
@@ -39,6 +166,15 @@ class UrlInput(BaseModel):
     url: HttpUrl
 
 
+class CrawlInput(BaseModel):
+    """Request model for a bounded crawl"""
+
+    url: HttpUrl
+    max_depth: int = Field(default=1, ge=0, le=3)
+    max_pages: int = Field(default=10, ge=1, le=100)
+    allowed_domains: List[str] = []
+
+
 class TextUrlResponse(BaseModel):
     """Response model for text and URLs"""
 
@@ -51,34 +187,114 @@ async def root() -> dict[str, str]:
     return {"message": "Hello World"}
 
 
+@app.get("/metrics")
+async def metrics() -> dict[str, Any]:
+    """
+    Report per-route latency and cost statistics of the extraction pipeline.
+
+    With API-key tenants, token usage and tenant limits are only reported
+    for the caller's own tenant, unless it is an admin tenant.
+    """
+    token_usage = usage_stats()
+    tenants = tenant_registry.stats() if tenant_registry else None
+    caller = current_tenant()
+    if tenants is not None and not caller.admin:
+        token_usage = [row for row in token_usage if row["tenant"] == caller.name]
+        tenants = {name: stats for name, stats in tenants.items() if name == caller.name}
+    return {
+        "routes": toxin_router.stats_snapshot(),
+        "context": context_stats.as_dict(),
+        "hedging": hedge_policy.stats() if hedge_policy else None,
+        "circuit_breakers": breaker_stats(),
+        "block_cache": block_cache.stats.as_dict() if block_cache else None,
+        "token_usage": token_usage,
+        "prompt_prefix": extraction_prefix.stats(),
+        "scheduler": extraction_scheduler.stats(),
+        "tenants": tenants,
+    }
+
+
 @app.post("/extract/urls", response_model=ToxinListResponse)
-async def combined_url_and_text(input_data: TextInput) -> ToxinListResponse:
+async def combined_url_and_text(
+    input_data: TextInput, request: Request, fields: str | None = None
+) -> Response:
     """
     Extract URLs from a given text.
+
+    Args:
+        input_data (TextInput): Input text that may contain URLs
+        fields (str | None): Comma-separated toxin fields to return, e.g.
+            "name,cas_number" to omit reference_context; all by default
     """
-    urls = extract_urls(input_data.text)
-    original_text = input_data.text
+    selected = parse_fields(fields)
+    deadline = request_deadline()
+    result = await within_deadline(
+        extract_from_text_and_urls(input_data.text, deadline), deadline, request
+    )
+    return toxin_response(result, selected)
+
+
+async def extract_from_text_and_urls(text: str, deadline: Deadline) -> ToxinListResponse:
+    """
+    Extract toxins from every URL found in the text and from the remaining text.
+
+    Args:
+        text (str): Input text that may contain URLs
+        deadline (Deadline): Request deadline
+
+    Returns:
+        ToxinListResponse: Extracted toxin information and the URLs found
+    """
+    urls = extract_urls(text)
+    original_text = text
     all_toxins: list[ToxinList.Toxin] = []
     for url in urls:
         original_text = original_text.replace(url, "")
-        text = url_to_text(url)
-        toxins = extract_toxins(text)
+        page_text = await fetch_page_text(url, deadline)
+        toxins = await extract_toxins(
+            condense_page_text(page_text, url), deadline, source_url=url
+        )
         all_toxins.extend(toxins.toxins)
 
     if original_text:
-        toxins_from_original_text = extract_toxins(original_text)
+        toxins_from_original_text = await extract_toxins(original_text, deadline)
         all_toxins.extend(toxins_from_original_text.toxins)
 
     return ToxinListResponse(toxins=all_toxins, urls=urls)
 
 
 @app.post("/parse/url", response_model=ToxinListResponse)
-async def parse_from_url(input_data: UrlInput) -> ToxinListResponse:
+async def parse_from_url(
+    input_data: UrlInput, request: Request, fields: str | None = None
+) -> Response:
     """
     Parse toxin information from a given URL.
 
     Args:
         input_data (UrlInput): Input containing the URL to process
+        fields (str | None): Comma-separated toxin fields to return; all by default
+
+    Returns:
+        Response: Extracted toxin information and source URL, as a ToxinListResponse
+
+    Raises:
+        HTTPException: If URL processing or parsing fails
+    """
+    selected = parse_fields(fields)
+    deadline = request_deadline()
+    result = await within_deadline(
+        extract_from_url(str(input_data.url), deadline), deadline, request
+    )
+    return toxin_response(result, selected)
+
+
+async def extract_from_url(url: str, deadline: Deadline) -> ToxinListResponse:
+    """
+    Fetch a single URL and extract toxins from it.
+
+    Args:
+        url (str): URL to process
+        deadline (Deadline): Request deadline
 
     Returns:
         ToxinListResponse: Extracted toxin information and source URL
@@ -88,58 +304,386 @@ async def parse_from_url(input_data: UrlInput) -> ToxinListResponse:
     """
     try:
         # Convert URL to text
-        text = url_to_text(str(input_data.url))
-
-        # Extract toxins from text
-        toxins_result = extract_toxins(text)
+        text = await fetch_page_text(url, deadline)
 
-        return ToxinListResponse(
-            toxins=toxins_result.toxins, urls=[str(input_data.url)]
+        # Extract toxins from the text around chemical mentions
+        toxins_result = await extract_toxins(
+            condense_page_text(text, url), deadline, source_url=url
         )
+
+        return ToxinListResponse(toxins=toxins_result.toxins, urls=[url])
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing URL: {str(e)}")
 
 
 @app.post("/parse/text", response_model=ToxinList)
-async def parse_from_text(input_data: TextInput) -> ToxinList:
+async def parse_from_text(
+    input_data: TextInput, request: Request, stream: bool = False, fields: str | None = None
+) -> Response:
     """
     Parse toxin information from provided text.
 
     Args:
         input_data (TextInput): Input containing the text to process
+        stream (bool): If true, respond with newline-delimited JSON, one
+            toxin per line, sent as soon as each toxin is generated
+        fields (str | None): Comma-separated toxin fields to return; all by default
 
     Returns:
-        ToxinList: Extracted toxin information
+        Response: Extracted toxin information, as a ToxinList or NDJSON stream
+
+    Raises:
+        HTTPException: If text parsing fails
+    """
+    selected = parse_fields(fields)
+    deadline = request_deadline()
+    if stream:
+        return StreamingResponse(
+            stream_toxins(input_data.text, deadline, selected, request),
+            media_type="application/x-ndjson",
+        )
+    result = await within_deadline(
+        extract_from_text(input_data.text, deadline), deadline, request
+    )
+    return toxin_response(result, selected)
+
+
+async def extract_from_text(text: str, deadline: Deadline) -> ToxinList:
+    """
+    Extract toxins from text, mapping failures to a 500 response.
 
     Raises:
         HTTPException: If text parsing fails
     """
     try:
-        return extract_toxins(input_data.text)
+        return await extract_toxins(text, deadline)
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing text: {str(e)}")
 
 
-def extract_toxins(text: str) -> ToxinList:
+async def within_deadline(work: Awaitable[T], deadline: Deadline, request: Request) -> T:
+    """
+    Run an endpoint's work under its deadline, cancelling it when the
+    deadline passes or the client disconnects.
+
+    Raises:
+        HTTPException: 504 if the deadline passed, 499 if the client went away
+    """
+    try:
+        return await run_with_deadline(work, deadline, request)
+    except DeadlineExceeded:
+        raise HTTPException(status_code=504, detail="Request deadline exceeded")
+    except ClientDisconnected:
+        raise HTTPException(status_code=499, detail="Client disconnected")
+
+
+async def fetch_page_text(url: str, deadline: Deadline) -> str:
+    """
+    Fetch a URL and convert it to text without blocking the event loop.
+
+    Args:
+        url (str): URL to fetch
+        deadline (Deadline): Request deadline bounding the fetch
+
+    Returns:
+        str: Cleaned page text
+    """
+    return await asyncio.to_thread(url_to_text, url, deadline=deadline)
+
+
+def condense_page_text(text: str, url: str) -> str:
+    """
+    Reduce fetched page text to the windows around chemical mentions.
+
+    Args:
+        text (str): Page text returned by url_to_text
+        url (str): Source URL, used for logging
+
+    Returns:
+        str: Condensed context to send to the extraction model
+    """
+    context = condense_context(text, window=CONTEXT_WINDOW_SENTENCES)
+    context_stats.record(context)
+    logger.info(
+        f"Condensed {url} from {context.original_chars} to {len(context.text)} chars "
+        f"(ratio {context.compression_ratio:.2f})"
+    )
+    return context.text
+
+
+async def extract_toxins(
+    text: str,
+    deadline: Deadline | None = None,
+    source_url: str | None = None,
+    priority: int = INTERACTIVE,
+) -> ToxinList:
     """
     Extract toxin information from text using the parsing model.
 
+    Text is routed through a relevance prefilter first so chunks without
+    chemical content never reach the large model. Results are enriched with
+    CAS numbers from the local chemical index and recorded in the result
+    store, which also answers repeated requests for identical text, model
+    and prompt (ModelRouter.result_key). Model calls wait for a slot of the
+    extraction scheduler, at the lower of the given priority and the
+    tenant's.
+
     Args:
         text (str): Input text to process
+        deadline (Deadline | None): Request deadline bounding the model call
+        source_url (str | None): URL the text was fetched from, if any
+        priority (int): INTERACTIVE, or BATCH for crawl and watch work
 
     Returns:
         ToxinList: Extracted toxin information
     """
-    return parse_input(
-        system_content=prompt_to_extract_toxins,
-        user_content=text,
-        response_format=ToxinList,
-        model="gpt-4o",
+    store = get_result_store()
+    result_key = toxin_router.result_key()
+    # SQLite calls block, so they run in a worker thread
+    if USE_RESULT_CACHE:
+        cached = await asyncio.to_thread(store.get_cached, text, toxin_router.model, result_key)
+        if cached is not None:
+            return cached
+
+    async with extraction_scheduler.slot(max(priority, current_tenant().priority)):
+        toxins = enrich_toxins(await toxin_router.extract(text, deadline))
+    await asyncio.to_thread(
+        store.save_extraction, text, toxins, toxin_router.model, source_url, result_key
     )
+    return toxins
+
+
+@app.get("/toxins", response_model=ToxinSearchResponse)
+async def search_toxins(
+    name: str | None = None,
+    regulation: str | None = None,
+    disease: str | None = None,
+    q: str | None = None,
+    source_url: str | None = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    after: str | None = None,
+    fields: str | None = None,
+) -> Response:
+    """
+    Query previously extracted toxins from the result store index, one page
+    at a time. Large result sets, e.g. every toxin from a crawl or batch, are
+    read by passing each response's next_cursor as after= until it is null.
+
+    Args:
+        name (str | None): Toxin name, synonym or CAS number
+        regulation (str | None): Phrase to match in relevant regulations
+        disease (str | None): Phrase to match in related diseases
+        q (str | None): Full-text phrase matched against all indexed fields
+        source_url (str | None): Only toxins extracted from this URL
+        limit (int): Maximum number of toxins per page
+        after (str | None): next_cursor of the previous page
+        fields (str | None): Comma-separated fields to return; all by default
+
+    Returns:
+        Response: Matching toxins with their source and model, as a ToxinSearchResponse
+
+    Raises:
+        HTTPException: 400 if the cursor or a field name is invalid
+    """
+    selected = parse_fields(fields, allowed=tuple(StoredToxin.model_fields))
+    try:
+        before_id = decode_cursor(after) if after else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # One extra row tells whether another page follows
+    toxins = await asyncio.to_thread(
+        get_result_store().search_toxins,
+        name=name,
+        regulation=regulation,
+        disease=disease,
+        query=q,
+        source_url=source_url,
+        limit=limit + 1,
+        before_id=before_id,
+    )
+    next_cursor = encode_cursor(toxins[limit - 1].id) if len(toxins) > limit else None
+    return toxin_response(
+        ToxinSearchResponse(toxins=toxins[:limit], next_cursor=next_cursor), selected
+    )
+
+
+@app.get("/toxins/export")
+async def export_toxins(
+    format: str = Query(default="parquet", pattern=f"^({'|'.join(EXPORT_FORMATS)})$"),
+    source_url: str | None = None,
+) -> StreamingResponse:
+    """
+    Export every stored toxin as Parquet or an Arrow IPC stream, streamed one
+    row group at a time.
+
+    Args:
+        format (str): "parquet" or "arrow"
+        source_url (str | None): Only toxins extracted from this URL
+
+    Returns:
+        StreamingResponse: The exported file
+
+    Raises:
+        HTTPException: 501 if pyarrow is not installed
+    """
+    try:
+        require_pyarrow()
+    except ImportError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        iter_export(get_result_store(), format, source_url=source_url),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="toxins.{extension}"'},
+    )
+
+
+async def extract_page_toxins(url: str, text: str) -> ToxinList:
+    """
+    Extract toxins from already-fetched page text, as used by the watch list.
+
+    Args:
+        url (str): Source URL of the page
+        text (str): Extracted page text
+
+    Returns:
+        ToxinList: Extracted toxin information
+    """
+    return await extract_toxins(condense_page_text(text, url), source_url=url, priority=BATCH)
+
+
+@app.post("/watch", response_model=WatchedPage)
+async def add_watch(input_data: UrlInput) -> WatchedPage:
+    """
+    Add a URL to the watch list of regularly re-checked pages.
+    """
+    return await asyncio.to_thread(get_result_store().add_watch, str(input_data.url))
+
+
+@app.get("/watch", response_model=List[WatchedPage])
+async def list_watches() -> List[WatchedPage]:
+    """
+    List watched URLs with the toxins extracted when each last changed.
+    """
+    return await asyncio.to_thread(get_result_store().list_watches)
+
+
+@app.delete("/watch")
+async def remove_watch(url: str) -> dict[str, bool]:
+    """
+    Remove a URL from the watch list.
+    """
+    return {"removed": await asyncio.to_thread(get_result_store().remove_watch, url)}
+
+
+@app.post("/watch/check", response_model=List[WatchCheckResult])
+async def check_watches() -> List[WatchCheckResult]:
+    """
+    Re-check every watched URL and re-extract only the pages that changed.
+
+    Returns:
+        List[WatchCheckResult]: Per-URL status with toxins added and removed
+    """
+    watch_list = WatchList(get_result_store(), extract_page_toxins)
+    return await watch_list.check_all()
+
+
+@app.post("/crawl", response_model=List[CrawledPage])
+async def crawl(input_data: CrawlInput) -> List[CrawledPage]:
+    """
+    Crawl outward from a URL, following in-page links within the same
+    domains, and extract toxins from every visited page.
+
+    The crawl stops taking new pages when the request deadline passes, so
+    a large budget returns the pages finished so far instead of failing.
+
+    Returns:
+        List[CrawledPage]: Visited pages with their toxins or errors
+    """
+    crawler = Crawler(
+        extract_page_toxins,
+        CrawlConfig(
+            max_depth=input_data.max_depth,
+            max_pages=input_data.max_pages,
+            allowed_domains=input_data.allowed_domains,
+        ),
+        deadline=request_deadline(),
+    )
+    return await crawler.crawl([str(input_data.url)])
+
+
+async def stream_toxins(
+    text: str,
+    deadline: Deadline,
+    fields: set[str] | None = None,
+    request: Request | None = None,
+) -> AsyncIterator[str]:
+    """
+    Stream extracted toxins as newline-delimited JSON.
+
+    Errors after the response has started are reported as a final
+    {"error": ...} line since the status code has already been sent. Like
+    within_deadline, generation is cancelled when the deadline passes or
+    the client disconnects.
+
+    Args:
+        text (str): Input text to process
+        deadline (Deadline): Request deadline bounding the model call
+        fields (set[str] | None): Toxin fields to include; all by default
+        request (Request | None): Incoming request, polled for disconnects
+
+    Yields:
+        str: One JSON-encoded toxin per line
+    """
+    toxins: list[ToxinList.Toxin] = []
+    try:
+        async with extraction_scheduler.slot(current_tenant().priority):
+            # aclosing passes an early close of this generator, e.g. when the
+            # response stops reading, down to the model stream
+            async with aclosing(
+                iterate_with_deadline(
+                    toxin_router.extract_stream(text, deadline), deadline, request
+                )
+            ) as stream:
+                async for toxin in stream:
+                    toxins.append(enrich_toxin(toxin))
+                    yield toxins[-1].model_dump_json(include=fields) + "\n"
+        await asyncio.to_thread(
+            get_result_store().save_extraction,
+            text,
+            ToxinList(toxins=toxins),
+            toxin_router.model,
+            None,
+            toxin_router.result_key(),
+        )
+    except DeadlineExceeded:
+        yield json.dumps({"error": "Request deadline exceeded"}) + "\n"
+    except ClientDisconnected:
+        logger.info("Client disconnected from toxin stream")
+    except Exception as e:
+        logger.error(f"Streaming extraction failed: {e}")
+        yield json.dumps({"error": f"Error processing text: {str(e)}"}) + "\n"
 
 
 if __name__ == "__main__":
+    import argparse
+
     import uvicorn
 
+    parser = argparse.ArgumentParser(description="Run the toxin parser API")
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        help="serve with gunicorn and one uvicorn worker per CPU (gunicorn_conf.py)",
+    )
+    args = parser.parse_args()
+
+    if args.production:
+        os.chdir(current_dir)
+        os.execvp("gunicorn", ["gunicorn", "router:app", "-c", "gunicorn_conf.py"])
+    # Development server with auto-reload
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True, workers=1)
-    print("Server is running on port 8000")
@@ -0,0 +1,232 @@
+import json
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from priority_scheduler import INTERACTIVE, PRIORITY_NAMES
+from token_usage import tenant_tokens
+
+
+@dataclass(frozen=True)
+class Tenant:
+    """An API client and its limits"""
+
+    name: str
+    # Scheduling priority of its extractions, INTERACTIVE or BATCH
+    priority: int = INTERACTIVE
+    # Requests in flight at once; None for no limit
+    max_concurrency: Optional[int] = None
+    # Prompt plus completion tokens per quota window; None for no limit
+    token_quota: Optional[int] = None
+    # May read every tenant's usage in /metrics, not only its own
+    admin: bool = False
+
+
+DEFAULT_TENANT = Tenant("default")
+_current_tenant: ContextVar[Tenant] = ContextVar("tenant", default=DEFAULT_TENANT)
+
+
+def current_tenant() -> Tenant:
+    """The tenant the current request is made for"""
+    return _current_tenant.get()
+
+
+class TenantRegistry:
+    """
+    Maps API keys to tenants and enforces their concurrency and token
+    quotas. Token use is read from the token_usage totals; the quota
+    window is fixed, so every tenant's count restarts together. Limits are
+    per process: with several workers, divide them by the worker count.
+    """
+
+    def __init__(
+        self,
+        tenants: Dict[str, Tenant],
+        quota_window_seconds: float = 86400.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            tenants (Dict[str, Tenant]): Tenant of each API key
+            quota_window_seconds (float): Length of a token quota window
+            clock (Callable[[], float]): Time source, for tests
+        """
+        self.tenants = tenants
+        self.quota_window_seconds = quota_window_seconds
+        self.clock = clock
+        self._window_start = clock()
+        self._baseline: Dict[str, int] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str, quota_window_seconds: float = 86400.0) -> "TenantRegistry":
+        """
+        Load tenants from a JSON file of the form
+        [{"name": "acme", "api_keys": ["..."], "priority": "batch",
+          "max_concurrency": 4, "token_quota": 2000000, "admin": false}, ...]
+
+        Raises:
+            ValueError: If an entry is malformed or a key is used twice
+        """
+        with open(path) as f:
+            entries = json.load(f)
+        return cls(_parse_tenants(entries), quota_window_seconds)
+
+    def authenticate(self, api_key: Optional[str]) -> Optional[Tenant]:
+        """The tenant of an API key, or None if the key is unknown"""
+        if not api_key:
+            return None
+        return self.tenants.get(api_key)
+
+    def tokens_used(self, tenant: Tenant) -> int:
+        """Tokens the tenant has used in the current quota window"""
+        with self._lock:
+            if self.clock() - self._window_start >= self.quota_window_seconds:
+                self._window_start = self.clock()
+                self._baseline = {
+                    name: tenant_tokens(name) for name in {t.name for t in self.tenants.values()}
+                }
+            baseline = self._baseline.get(tenant.name, 0)
+        return tenant_tokens(tenant.name) - baseline
+
+    def window_remaining(self) -> float:
+        return max(self.quota_window_seconds - (self.clock() - self._window_start), 0.0)
+
+    def try_start(self, tenant: Tenant) -> bool:
+        """Count a request in flight, unless the tenant is at its concurrency limit"""
+        with self._lock:
+            in_flight = self._in_flight.get(tenant.name, 0)
+            if tenant.max_concurrency is not None and in_flight >= tenant.max_concurrency:
+                return False
+            self._in_flight[tenant.name] = in_flight + 1
+            return True
+
+    def finish(self, tenant: Tenant) -> None:
+        with self._lock:
+            self._in_flight[tenant.name] -= 1
+
+    def stats(self) -> Dict[str, dict[str, int | None]]:
+        tenants = {tenant.name: tenant for tenant in self.tenants.values()}
+        return {
+            name: {
+                "in_flight": self._in_flight.get(name, 0),
+                "max_concurrency": tenant.max_concurrency,
+                "tokens_used": self.tokens_used(tenant),
+                "token_quota": tenant.token_quota,
+            }
+            for name, tenant in sorted(tenants.items())
+        }
+
+
+def _parse_tenants(entries: Iterable[dict]) -> Dict[str, Tenant]:
+    tenants: Dict[str, Tenant] = {}
+    for entry in entries:
+        try:
+            tenant = Tenant(
+                name=entry["name"],
+                priority=PRIORITY_NAMES[entry.get("priority", "interactive")],
+                max_concurrency=entry.get("max_concurrency"),
+                token_quota=entry.get("token_quota"),
+                admin=bool(entry.get("admin", False)),
+            )
+            keys = entry["api_keys"]
+        except KeyError as e:
+            raise ValueError(f"Invalid tenant entry {entry.get('name')!r}: {e}")
+        for key in keys:
+            if key in tenants:
+                raise ValueError(f"API key of tenant {tenant.name!r} is already in use")
+            tenants[key] = tenant
+    return tenants
+
+
+def api_key_from_headers(headers: Headers) -> Optional[str]:
+    """The API key from an `Authorization: Bearer` or `X-API-Key` header"""
+    authorization = headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        return authorization[7:].strip()
+    return headers.get("x-api-key")
+
+
+class TenantMiddleware:
+    """
+    Authenticates every HTTP request by API key and enforces its tenant's
+    limits: 401 for an unknown key, 429 when the tenant is at its
+    concurrency limit or has used up its token quota. The tenant is stored
+    in scope["state"] for UsageMiddleware and in a context variable for the
+    extraction scheduler (see current_tenant).
+
+    Without a registry every request is let through, as the tenant named by
+    its X-Tenant-ID header if that is one of allowed_tenants, else as the
+    default tenant. Every tenant name ends up as a key of the process-wide
+    usage totals, so unknown names are never taken from the client.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        registry: Optional[TenantRegistry] = None,
+        allowed_tenants: Iterable[str] = (),
+        public_paths: Iterable[str] = ("/", "/docs", "/openapi.json"),
+    ) -> None:
+        self.app = app
+        self.registry = registry
+        self.allowed_tenants = frozenset(allowed_tenants)
+        self.public_paths = frozenset(public_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if self.registry is None:
+            name = headers.get("x-tenant-id", DEFAULT_TENANT.name)
+            tenant = Tenant(name) if name in self.allowed_tenants else DEFAULT_TENANT
+        elif scope["path"] in self.public_paths:
+            tenant = DEFAULT_TENANT
+        else:
+            found = self.registry.authenticate(api_key_from_headers(headers))
+            if found is None:
+                await _reject(401, "Invalid or missing API key", scope, receive, send)
+                return
+            tenant = found
+            if (
+                tenant.token_quota is not None
+                and self.registry.tokens_used(tenant) >= tenant.token_quota
+            ):
+                retry_after = int(self.registry.window_remaining()) + 1
+                await _reject(
+                    429, "Token quota exceeded", scope, receive, send, retry_after
+                )
+                return
+            if not self.registry.try_start(tenant):
+                await _reject(429, "Too many concurrent requests", scope, receive, send, 1)
+                return
+
+        scope.setdefault("state", {})["tenant"] = tenant.name
+        token = _current_tenant.set(tenant)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_tenant.reset(token)
+            if self.registry is not None and scope["path"] not in self.public_paths:
+                self.registry.finish(tenant)
+
+
+async def _reject(
+    status_code: int,
+    detail: str,
+    scope: Scope,
+    receive: Receive,
+    send: Send,
+    retry_after: Optional[int] = None,
+) -> None:
+    headers = {"Retry-After": str(retry_after)} if retry_after is not None else None
+    response = JSONResponse({"detail": detail}, status_code=status_code, headers=headers)
+    await response(scope, receive, send)
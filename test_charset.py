@@ -0,0 +1,44 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from charset import detect_encoding  # noqa: E402
+
+
+def test_header_charset_wins_over_meta() -> None:
+    body = b'<meta charset="shift_jis"><p>x</p>'
+
+    assert detect_encoding("text/html; charset=UTF-8", body) == "utf-8"
+    assert detect_encoding("text/html", body) == "shift_jis"
+
+
+def test_bom_and_meta_sniffing() -> None:
+    assert detect_encoding("text/html; charset=latin-1", b"\xef\xbb\xbf<p>") == "utf-8-sig"
+    assert detect_encoding(None, "<p>x</p>".encode("utf-16")) == "utf-16"
+    assert (
+        detect_encoding(
+            "text/html",
+            b'<meta http-equiv="Content-Type" content="text/html; charset=iso-8859-1">',
+        )
+        == "cp1252"
+    )
+    assert detect_encoding(None, b'<?xml version="1.0" encoding="euc-jp"?><a/>') == "euc_jp"
+
+
+def test_fallback_without_declaration() -> None:
+    utf8 = "<p>Crème brûlée</p>".encode("utf-8")
+
+    assert detect_encoding("text/html", utf8) == "utf-8"
+    # A multi-byte character cut off at the end of the sniffed bytes is fine
+    assert detect_encoding("text/html", utf8[:6]) == "utf-8"
+    assert detect_encoding("text/html", "<p>“Crème”</p>".encode("cp1252")) == "cp1252"
+    assert detect_encoding("text/html; charset=bogus", b"<p>x</p>") == "utf-8"
+
+
+if __name__ == "__main__":
+    test_header_charset_wins_over_meta()
+    test_bom_and_meta_sniffing()
+    test_fallback_without_declaration()
+
+    print("All tests completed successfully!")
@@ -0,0 +1,111 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from chemical_index import (  # noqa: E402
+    Chemical,
+    ChemicalIndex,
+    enrich_toxins,
+    find_cas_numbers,
+    is_valid_cas_number,
+    load_default_index,
+)
+from pydantic_models import ToxinList  # noqa: E402
+
+
+def make_toxin(name: str) -> ToxinList.Toxin:
+    return ToxinList.Toxin(
+        name=name,
+        sources=[],
+        health_effects=[],
+        related_diseases=[],
+        reference_context="",
+        relevant_regulations=[],
+    )
+
+
+def test_cas_checksum() -> None:
+    assert is_valid_cas_number("79-01-6")
+    assert is_valid_cas_number("123-91-1")
+    assert not is_valid_cas_number("79-01-7")
+    assert not is_valid_cas_number("not-a-cas")
+
+
+def test_bundled_index_has_valid_cas_numbers() -> None:
+    index = load_default_index()
+    assert index.chemicals
+    for chemical in index.chemicals:
+        if chemical.cas_number:
+            assert is_valid_cas_number(chemical.cas_number), chemical
+
+
+def test_scan_offsets_and_word_boundaries() -> None:
+    index = load_default_index()
+    text = "EPA evaluated 1,4-Dioxane and TCE, but not benzenes or tce."
+
+    matches = index.scan(text)
+
+    assert [m.chemical.name for m in matches] == ["1,4-Dioxane", "Trichloroethylene"]
+    for match in matches:
+        start, end = match.start, match.end
+        assert text[start:end] == match.text
+
+
+def test_scan_prefers_longest_match() -> None:
+    index = ChemicalIndex(
+        [
+            Chemical(name="Vinyl chloride", cas_number="75-01-4"),
+            Chemical(name="Vinyl", cas_number=None),
+        ]
+    )
+
+    matches = index.scan("Exposure to vinyl chloride monomer")
+
+    assert len(matches) == 1
+    assert matches[0].chemical.name == "Vinyl chloride"
+
+
+def test_find_cas_numbers_ignores_bad_checksums() -> None:
+    text = "CAS 75-09-2 and 75-09-3"
+
+    assert [cas for _, _, cas in find_cas_numbers(text)] == ["75-09-2"]
+
+
+def test_enrich_toxins_fills_cas_number() -> None:
+    toxins = ToxinList(
+        toxins=[make_toxin("Methylene Chloride"), make_toxin("Unknownium")]
+    )
+
+    enriched = enrich_toxins(toxins)
+
+    assert enriched.toxins[0].cas_number == "75-09-2"
+    assert enriched.toxins[1].cas_number is None
+
+
+def test_enrich_toxins_checks_model_cas_numbers() -> None:
+    guessed = make_toxin("Trichloroethylene")
+    guessed.cas_number = "75-09-2"
+    invalid = make_toxin("Unknownium")
+    invalid.cas_number = "12-34-5"
+    valid = make_toxin("Unknownium")
+    valid.cas_number = " 7440-43-9 "
+
+    enriched = enrich_toxins(ToxinList(toxins=[guessed, invalid, valid]))
+
+    # The index entry wins over the model's guess
+    assert enriched.toxins[0].cas_number == "79-01-6"
+    assert enriched.toxins[1].cas_number is None
+    assert enriched.toxins[2].cas_number == "7440-43-9"
+
+
+if __name__ == "__main__":
+    test_cas_checksum()
+    test_bundled_index_has_valid_cas_numbers()
+    test_scan_offsets_and_word_boundaries()
+    test_scan_prefers_longest_match()
+    test_find_cas_numbers_ignores_bad_checksums()
+    test_enrich_toxins_fills_cas_number()
+    test_enrich_toxins_checks_model_cas_numbers()
+
+    print("All tests completed successfully!")
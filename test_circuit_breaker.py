@@ -0,0 +1,151 @@
+import os
+import sys
+
+import httpx
+import openai
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from circuit_breaker import (  # noqa: E402
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    get_breaker,
+)
+from text_2_entity import openai_breaker, openai_guard  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def failing_call(breaker: CircuitBreaker) -> None:
+    try:
+        with breaker.guard():
+            raise ConnectionError("down")
+    except ConnectionError:
+        pass
+
+
+def test_opens_after_failure_rate_threshold() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker("test", min_calls=4, failure_rate_threshold=0.5, clock=clock)
+
+    with breaker.guard():
+        pass
+    failing_call(breaker)
+    with breaker.guard():
+        pass
+    assert breaker.state == CLOSED
+
+    failing_call(breaker)
+
+    assert breaker.state == OPEN
+
+
+def test_open_circuit_fails_fast_then_half_opens() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker("test", min_calls=1, open_seconds=30, clock=clock)
+    failing_call(breaker)
+
+    try:
+        with breaker.guard():
+            raise AssertionError("call should have been rejected")
+    except CircuitOpenError:
+        pass
+    assert breaker.stats()["rejected_calls"] == 1
+
+    clock.now = 31
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    try:
+        breaker.before_call()
+        raise AssertionError("second trial call should be rejected")
+    except CircuitOpenError:
+        pass
+
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+
+
+def test_slow_calls_count_as_failures() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker("test", min_calls=2, slow_call_seconds=5, clock=clock)
+
+    for _ in range(2):
+        with breaker.guard():
+            clock.now += 6
+
+    assert breaker.state == OPEN
+
+
+def test_ignored_errors_do_not_trip() -> None:
+    breaker = CircuitBreaker(
+        "test", min_calls=1, is_failure=lambda error: not isinstance(error, KeyError)
+    )
+
+    try:
+        with breaker.guard():
+            raise KeyError("client error")
+    except KeyError:
+        pass
+
+    assert breaker.state == CLOSED
+
+
+def test_slow_calls_can_be_disabled() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker("test", min_calls=2, slow_call_seconds=None, clock=clock)
+
+    for _ in range(2):
+        with breaker.guard():
+            clock.now += 60
+
+    assert breaker.state == CLOSED
+
+
+def test_get_breaker_applies_thresholds_on_creation() -> None:
+    breaker = get_breaker("test-thresholds", slow_call_seconds=None, open_seconds=5)
+
+    assert breaker.slow_call_seconds is None
+    assert breaker.open_seconds == 5
+    assert get_breaker("test-thresholds", slow_call_seconds=1) is breaker
+
+
+def test_shortened_openai_timeouts_are_not_outages() -> None:
+    timeout = openai.APITimeoutError(request=httpx.Request("POST", "https://api.openai.com"))
+    recent_calls = int(openai_breaker.stats()["recent_calls"])
+
+    try:
+        with openai_guard(timeout=2.0):
+            raise timeout
+    except openai.APITimeoutError:
+        pass
+    assert openai_breaker.stats()["recent_calls"] == recent_calls
+
+    try:
+        with openai_guard():
+            raise timeout
+    except openai.APITimeoutError:
+        pass
+    assert openai_breaker.stats()["recent_calls"] == recent_calls + 1
+    openai_breaker._outcomes.clear()
+
+
+if __name__ == "__main__":
+    test_opens_after_failure_rate_threshold()
+    test_open_circuit_fails_fast_then_half_opens()
+    test_slow_calls_count_as_failures()
+    test_ignored_errors_do_not_trip()
+    test_slow_calls_can_be_disabled()
+    test_get_breaker_applies_thresholds_on_creation()
+    test_shortened_openai_timeouts_are_not_outages()
+
+    print("All tests completed successfully!")
@@ -0,0 +1,66 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from context_window import condense_context, split_sentences  # noqa: E402
+from paragraph_cache import split_blocks  # noqa: E402
+
+
+def test_split_sentences() -> None:
+    text = "First one. Second one!\nThird one"
+
+    spans = split_sentences(text)
+
+    assert [text[start:end] for start, end in spans] == ["First one.", "Second one!", "Third one"]
+
+
+def test_condense_context_merges_overlapping_windows() -> None:
+    filler = "The agency met with stakeholders. " * 50
+    text = (
+        filler
+        + "Workers inhale trichloroethylene. Benzene is also present. "
+        + filler
+    )
+
+    context = condense_context(text, window=1)
+
+    assert len(context.windows) == 1
+    assert "trichloroethylene" in context.text
+    assert "Benzene" in context.text
+    assert context.compression_ratio < 0.1
+
+
+def test_condense_context_keeps_text_without_mentions() -> None:
+    text = "Nothing relevant here. " * 200
+
+    context = condense_context(text)
+
+    assert context.text == text
+    assert context.compression_ratio == 1.0
+
+
+def test_separate_windows_stay_separate_paragraph_blocks() -> None:
+    filler = "The agency met with stakeholders. " * 50
+    text = (
+        filler
+        + "Workers inhale trichloroethylene. "
+        + filler
+        + "Benzene is also present. "
+        + filler
+    )
+
+    context = condense_context(text, window=0)
+    blocks = split_blocks(context.text, min_chars=1, boundary_modulus=1)
+
+    assert len(context.windows) == 2
+    assert blocks == ["Workers inhale trichloroethylene.", "Benzene is also present."]
+
+
+if __name__ == "__main__":
+    test_split_sentences()
+    test_condense_context_merges_overlapping_windows()
+    test_condense_context_keeps_text_without_mentions()
+    test_separate_windows_stay_separate_paragraph_blocks()
+
+    print("All tests completed successfully!")
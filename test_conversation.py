@@ -0,0 +1,126 @@
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+from typing import Any, List, Optional
+
+import pytest
+
+from openai.types.chat import ChatCompletion
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from conversation import ConversationHistory  # noqa: E402
+from pydantic_models import ToxinList  # noqa: E402
+
+
+class FakeCompletions:
+    def __init__(self) -> None:
+        self.requests: List[dict[str, Any]] = []
+        self.answer: Optional[str] = "x" * 400
+        self.error: Optional[Exception] = None
+
+    async def create(self, **kwargs: Any) -> ChatCompletion:
+        self.requests.append(kwargs)
+        if self.error is not None:
+            raise self.error
+        content = "summary" if kwargs["model"] == "gpt-4o-mini" else self.answer
+        return ChatCompletion.model_validate(
+            {
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": kwargs["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": content},
+                    }
+                ],
+            }
+        )
+
+
+def make_history(**kwargs: Any) -> tuple[ConversationHistory, FakeCompletions]:
+    completions = FakeCompletions()
+    client: Any = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    lead = ToxinList.Toxin(
+        name="Lead",
+        sources=["paint"],
+        health_effects=[],
+        related_diseases=[],
+        reference_context="lead",
+        relevant_regulations=[],
+    )
+    toxins = ToxinList(toxins=[lead])
+    return ConversationHistory.about_toxins(toxins, async_client=client, **kwargs), completions
+
+
+def test_history_is_kept_within_budget() -> None:
+    history, completions = make_history(max_tokens=500, summary_model=None)
+
+    async def ask_all() -> None:
+        for i in range(10):
+            await history.ask(f"question {i}")
+
+    asyncio.run(ask_all())
+
+    # Every request stays within the budget and keeps the pinned context
+    for request in completions.requests:
+        assert sum(len(m["content"]) // 4 + 4 for m in request["messages"]) <= 500
+        assert "Lead" in request["messages"][1]["content"]
+    assert completions.requests[-1]["messages"][-1]["content"] == "question 9"
+    assert history.dropped_turns > 0
+    # Turns are dropped whole
+    assert history.turns[0]["role"] == "user"
+
+
+def test_dropped_turns_are_summarized() -> None:
+    history, completions = make_history(max_tokens=500)
+
+    async def ask_all() -> None:
+        for i in range(6):
+            await history.ask(f"question {i}")
+
+    asyncio.run(ask_all())
+
+    assert history.summary == "summary"
+    summaries = [r for r in completions.requests if r["model"] == "gpt-4o-mini"]
+    assert summaries and "question 0" in summaries[0]["messages"][1]["content"]
+    last = completions.requests[-1]["messages"]
+    assert last[2]["content"].endswith("summary")
+
+
+def test_failed_question_is_not_kept() -> None:
+    history, completions = make_history()
+    asyncio.run(history.ask("question 0"))
+    turns = list(history.turns)
+
+    completions.error = RuntimeError("API down")
+    with pytest.raises(RuntimeError):
+        asyncio.run(history.ask("question 1"))
+    assert history.turns == turns
+
+    completions.error = None
+    completions.answer = None
+    with pytest.raises(ValueError):
+        asyncio.run(history.ask("question 1"))
+    assert history.turns == turns
+
+    completions.answer = "answer"
+    assert asyncio.run(history.ask("question 1")) == "answer"
+    assert [m["content"] for m in completions.requests[-1]["messages"][-3:]] == [
+        "question 0",
+        "x" * 400,
+        "question 1",
+    ]
+
+
+if __name__ == "__main__":
+    test_history_is_kept_within_budget()
+    test_dropped_turns_are_summarized()
+    test_failed_question_is_not_kept()
+
+    print("All tests completed successfully!")
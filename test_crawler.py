@@ -0,0 +1,100 @@
+import asyncio
+import os
+import sys
+from typing import Optional
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("SCRAPER_API_KEY", "test")
+
+from crawler import (  # noqa: E402
+    BloomFilter,
+    CrawlConfig,
+    Crawler,
+    extract_links,
+    extract_links_and_text,
+)
+from html_pool import html_to_text  # noqa: E402
+from deadline import Deadline  # noqa: E402
+from pydantic_models import ToxinList  # noqa: E402
+
+SITE = {
+    "https://www.epa.gov/tsca": (
+        '<a href="/tsca/risk-evaluation">Risk evaluation</a>'
+        '<a href="/about">About us</a>'
+        '<a href="https://other.org/chemicals">Elsewhere</a>'
+        '<a href="/tsca/report.pdf">Report</a>'
+    ),
+    "https://www.epa.gov/tsca/risk-evaluation": (
+        '<a href="/tsca/fact-sheet#top">Fact sheet</a><a href="/tsca">Back</a>'
+    ),
+    "https://www.epa.gov/about": '<a href="/about/staff">Staff</a>',
+    "https://www.epa.gov/tsca/fact-sheet": "<p>Trichloroethylene</p>",
+    "https://www.epa.gov/about/staff": "<p>Nobody</p>",
+}
+
+
+def fetch(url: str, deadline: Optional[Deadline]) -> str:
+    return SITE[url]
+
+
+async def extract(url: str, text: str) -> ToxinList:
+    return ToxinList(toxins=[])
+
+
+def crawl(config: CrawlConfig) -> list[str]:
+    crawler = Crawler(extract, config, fetch=fetch)
+    pages = asyncio.run(crawler.crawl(["https://www.epa.gov/tsca"]))
+    assert all(page.error is None for page in pages)
+    return [page.url for page in pages]
+
+
+def test_bloom_filter_remembers_added_items() -> None:
+    seen = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        seen.add(f"https://example.com/{i}")
+
+    assert all(f"https://example.com/{i}" in seen for i in range(1000))
+    false_positives = sum(f"https://example.org/{i}" in seen for i in range(1000))
+    assert false_positives < 50
+
+
+def test_extract_links_resolves_and_filters() -> None:
+    links = extract_links(SITE["https://www.epa.gov/tsca"], "https://www.epa.gov/tsca")
+
+    assert [url for url, _ in links] == [
+        "https://www.epa.gov/tsca/risk-evaluation",
+        "https://www.epa.gov/about",
+        "https://other.org/chemicals",
+    ]
+
+
+def test_links_and_text_come_from_one_parse() -> None:
+    html = SITE["https://www.epa.gov/tsca"]
+
+    links, text = extract_links_and_text(html, "https://www.epa.gov/tsca")
+
+    assert links == extract_links(html, "https://www.epa.gov/tsca")
+    assert text == html_to_text(html)
+
+
+def test_crawl_respects_depth_domains_and_priority() -> None:
+    urls = crawl(CrawlConfig(max_depth=2, concurrency=1, domain_delay=0))
+
+    assert urls == [
+        "https://www.epa.gov/tsca",
+        "https://www.epa.gov/tsca/risk-evaluation",
+        "https://www.epa.gov/tsca/fact-sheet",
+        "https://www.epa.gov/about",
+        "https://www.epa.gov/about/staff",
+    ]
+    assert len(crawl(CrawlConfig(max_depth=1, domain_delay=0))) == 3
+    assert len(crawl(CrawlConfig(max_pages=2, concurrency=4, domain_delay=0))) == 2
+
+
+if __name__ == "__main__":
+    test_bloom_filter_remembers_added_items()
+    test_extract_links_resolves_and_filters()
+    test_links_and_text_come_from_one_parse()
+    test_crawl_respects_depth_domains_and_priority()
+
+    print("All tests completed successfully!")
@@ -0,0 +1,301 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, AsyncIterator, List, Optional, Tuple
+
+import pytest
+from fastapi import HTTPException
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("SCRAPER_API_KEY", "test")
+os.environ.setdefault(
+    "RESULT_STORE_PATH", os.path.join(tempfile.mkdtemp(), "test_deadline.sqlite3")
+)
+
+import extractor_api  # noqa: E402
+import router  # noqa: E402
+from deadline import (  # noqa: E402
+    ClientDisconnected,
+    Deadline,
+    DeadlineExceeded,
+    run_with_deadline,
+)
+from model_router import ModelRouter, PassthroughClassifier  # noqa: E402
+from test_openai_stream import FakeStream, fake_stream_client, toxin_chunks  # noqa: E402
+
+
+class FakeRequest:
+    """Request whose client disconnects after `connected_polls` checks"""
+
+    def __init__(self, connected_polls: int = 1_000_000) -> None:
+        self.connected_polls = connected_polls
+
+    async def is_disconnected(self) -> bool:
+        self.connected_polls -= 1
+        return self.connected_polls < 0
+
+
+def fake_request(connected_polls: int = 1_000_000) -> Any:
+    return FakeRequest(connected_polls)
+
+
+class SlowWork:
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self.cancelled = False
+
+    async def __call__(self) -> str:
+        try:
+            await asyncio.sleep(self.seconds)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return "done"
+
+
+def test_work_finishing_in_time_returns_its_result() -> None:
+    result = asyncio.run(run_with_deadline(SlowWork(0.01)(), Deadline(5), fake_request()))
+
+    assert result == "done"
+
+
+def test_expired_deadline_cancels_work() -> None:
+    work = SlowWork(5)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(run_with_deadline(work(), Deadline(0.05), fake_request()))
+    assert work.cancelled
+
+
+def test_disconnect_cancels_work() -> None:
+    work = SlowWork(5)
+
+    with pytest.raises(ClientDisconnected):
+        asyncio.run(
+            run_with_deadline(work(), Deadline(5), fake_request(1), poll_interval=0.01)
+        )
+    assert work.cancelled
+
+
+def test_within_deadline_maps_to_504_and_499() -> None:
+    with pytest.raises(HTTPException) as expired:
+        asyncio.run(router.within_deadline(SlowWork(5)(), Deadline(0.01), fake_request()))
+    assert expired.value.status_code == 504
+    with pytest.raises(HTTPException) as disconnected:
+        asyncio.run(router.within_deadline(SlowWork(5)(), Deadline(5), fake_request(0)))
+    assert disconnected.value.status_code == 499
+
+
+class SlowStreamRouter:
+    """Stands in for the ModelRouter: one toxin, then a stalled stream"""
+
+    model = "fake"
+
+    def __init__(self) -> None:
+        self.closed = False
+
+    async def extract_stream(self, text: str, deadline: Any) -> AsyncIterator[Any]:
+        try:
+            yield router.ToxinList.Toxin(
+                name="Lead",
+                sources=[],
+                health_effects=[],
+                related_diseases=[],
+                reference_context="",
+                relevant_regulations=[],
+            )
+            await asyncio.sleep(5)
+        finally:
+            self.closed = True
+
+
+def collect_stream(request: Any, deadline: Deadline) -> List[str]:
+    async def collect() -> List[str]:
+        return [line async for line in router.stream_toxins("text", deadline, None, request)]
+
+    return asyncio.run(collect())
+
+
+def test_stream_stops_at_the_deadline(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake = SlowStreamRouter()
+    monkeypatch.setattr(router, "toxin_router", fake)
+
+    lines = collect_stream(fake_request(), Deadline(0.1))
+
+    assert json.loads(lines[0])["name"] == "Lead"
+    assert json.loads(lines[-1]) == {"error": "Request deadline exceeded"}
+    assert fake.closed
+    assert router.extraction_scheduler.active == 0
+
+
+def test_stream_stops_when_the_client_disconnects(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake = SlowStreamRouter()
+    monkeypatch.setattr(router, "toxin_router", fake)
+
+    lines = collect_stream(fake_request(2), Deadline(5))
+
+    assert len(lines) == 1
+    assert fake.closed
+
+
+def model_stream_router(monkeypatch: pytest.MonkeyPatch) -> FakeStream:
+    """Route extractions through a real ModelRouter to a stalled model stream"""
+    # The first toxin, then the stream stalls mid-way through the second
+    stream = FakeStream(toxin_chunks()[:-2])
+    monkeypatch.setattr(
+        router,
+        "toxin_router",
+        ModelRouter("system", PassthroughClassifier(), async_client=fake_stream_client(stream)),
+    )
+    return stream
+
+
+def collect_model_stream(
+    stream: FakeStream, request: Any, deadline: Deadline
+) -> Tuple[List[str], bool]:
+    async def collect() -> Tuple[List[str], bool]:
+        lines = [line async for line in router.stream_toxins("text", deadline, None, request)]
+        # Checked before asyncio.run finalizes any generator left open
+        return lines, stream.closed
+
+    return asyncio.run(collect())
+
+
+def test_model_stream_is_closed_at_the_deadline(monkeypatch: pytest.MonkeyPatch) -> None:
+    stream = model_stream_router(monkeypatch)
+
+    lines, closed = collect_model_stream(stream, fake_request(), Deadline(0.2))
+
+    assert json.loads(lines[-1]) == {"error": "Request deadline exceeded"}
+    assert closed
+
+
+def test_model_stream_is_closed_when_the_client_disconnects(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    stream = model_stream_router(monkeypatch)
+
+    lines, closed = collect_model_stream(stream, fake_request(2), Deadline(5))
+
+    assert len(lines) == 1
+    assert closed
+
+
+def test_model_stream_is_closed_when_the_response_stops_reading(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    stream = model_stream_router(monkeypatch)
+
+    async def first_line() -> Tuple[str, bool]:
+        lines: Any = router.stream_toxins("text", Deadline(5), None, fake_request())
+        line: str = await lines.__anext__()
+        await lines.aclose()
+        return line, stream.closed
+
+    line, closed = asyncio.run(first_line())
+
+    assert json.loads(line)["name"] == "Lead"
+    assert closed
+    assert router.extraction_scheduler.active == 0
+
+
+class TrickleBody:
+    """Response body that sends a few bytes per read, optionally then failing"""
+
+    def __init__(self, delay: float, error: Optional[Exception] = None) -> None:
+        self.delay = delay
+        self.error = error
+        self.reads = 0
+
+    def read(self, size: int) -> bytes:
+        self.reads += 1
+        if self.error is not None and self.reads > 2:
+            raise self.error
+        time.sleep(self.delay)
+        return b"<p>" if self.reads < 1000 else b""
+
+    def close(self) -> None:
+        pass
+
+
+class FakeSession:
+    """Records the timeout and retry budget _open_response sends with"""
+
+    calls: List[dict[str, Any]] = []
+    body: Optional[TrickleBody] = None
+
+    def mount(self, prefix: str, adapter: Any) -> None:
+        self.retries = adapter.max_retries.total
+
+    def get(self, url: str, timeout: float, **kwargs: Any) -> Any:
+        FakeSession.calls.append({"timeout": timeout, "retries": self.retries})
+        response = extractor_api.requests.Response()
+        response.status_code = 200
+        response.headers["Content-Type"] = "text/html"
+        response.raw = FakeSession.body or TrickleBody(0)
+        return response
+
+
+@pytest.fixture
+def fake_session(monkeypatch: pytest.MonkeyPatch) -> type[FakeSession]:
+    monkeypatch.setattr(extractor_api.requests, "Session", FakeSession)
+    FakeSession.calls.clear()
+    FakeSession.body = None
+    return FakeSession
+
+
+def test_fetch_timeout_and_retries_fit_the_deadline(fake_session: type[FakeSession]) -> None:
+    def fetch(deadline: Deadline | None) -> None:
+        with extractor_api._open_response(
+            "http://example.com", None, 10, False, 3, None, deadline
+        ):
+            pass
+
+    fetch(None)
+    fetch(Deadline(25))
+    fetch(Deadline(4))
+
+    assert fake_session.calls[0] == {"timeout": 10, "retries": 3}
+    # 25 s left: three 10 s attempts would not fit, so only one retry
+    assert fake_session.calls[1]["timeout"] == 10 and fake_session.calls[1]["retries"] == 1
+    assert fake_session.calls[2]["timeout"] <= 4 and fake_session.calls[2]["retries"] == 0
+    with pytest.raises(DeadlineExceeded):
+        fetch(Deadline(0))
+
+
+def test_trickling_body_stops_at_the_deadline(fake_session: type[FakeSession]) -> None:
+    # Each read is well within the request timeout, the whole body is not
+    fake_session.body = TrickleBody(0.01)
+    breaker = extractor_api.get_breaker("direct")
+    calls = len(breaker._outcomes)
+
+    with pytest.raises(DeadlineExceeded):
+        extractor_api.fetch_webpage("http://example.com", proxy=False, deadline=Deadline(0.1))
+    assert fake_session.body.reads < 1000
+    # The deadline passing is not held against the site
+    assert len(breaker._outcomes) == calls
+
+
+def test_body_read_errors_reach_the_breaker(fake_session: type[FakeSession]) -> None:
+    error = extractor_api.requests.exceptions.ChunkedEncodingError("connection reset")
+    fake_session.body = TrickleBody(0, error=error)
+    breaker = extractor_api.get_breaker("direct")
+    failures = breaker._outcomes.count(False)
+
+    with pytest.raises(extractor_api.ScrapingError, match="connection reset"):
+        extractor_api.fetch_webpage("http://example.com", proxy=False)
+    assert breaker._outcomes.count(False) == failures + 1
+    breaker._outcomes.clear()
+
+
+if __name__ == "__main__":
+    test_work_finishing_in_time_returns_its_result()
+    test_expired_deadline_cancels_work()
+    test_disconnect_cancels_work()
+    test_within_deadline_maps_to_504_and_499()
+
+    print("All tests completed successfully!")
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from openai.types.chat import ChatCompletion
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from pydantic_models import ToxinList  # noqa: E402
+from text_2_entity import HedgePolicy, parse_input_hedged_async  # noqa: E402
+
+
+class DelayedCompletions:
+    """Replies after a fixed delay per model and records cancelled calls"""
+
+    def __init__(self, delays: Dict[str, float]) -> None:
+        self.delays = delays
+        self.cancelled: List[str] = []
+
+    async def create(self, **kwargs: Any) -> ChatCompletion:
+        model = kwargs["model"]
+        try:
+            await asyncio.sleep(self.delays[model])
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        toxins = [] if model == "primary" else [{"name": model}]
+        return ChatCompletion.model_validate(
+            {
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {
+                            "role": "assistant",
+                            "content": json.dumps(
+                                {
+                                    "toxins": [
+                                        {
+                                            "sources": [],
+                                            "health_effects": [],
+                                            "related_diseases": [],
+                                            "reference_context": "",
+                                            "relevant_regulations": [],
+                                            "cas_number": None,
+                                            **toxin,
+                                        }
+                                        for toxin in toxins
+                                    ]
+                                }
+                            ),
+                        },
+                    }
+                ],
+            }
+        )
+
+
+def hedged(delays: Dict[str, float], policy: HedgePolicy) -> tuple[ToxinList, List[str]]:
+    completions = DelayedCompletions(delays)
+    client: Any = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    async def run() -> ToxinList:
+        result = await parse_input_hedged_async(
+            "system", "text", ToxinList, policy, model="primary", async_client=client
+        )
+        # Let the cancelled call observe its cancellation
+        await asyncio.sleep(0)
+        return result
+
+    return asyncio.run(run()), completions.cancelled
+
+
+def test_fast_primary_is_not_hedged() -> None:
+    policy = HedgePolicy(initial_delay=0.2, fallback_model="fallback")
+
+    result, cancelled = hedged({"primary": 0.01, "fallback": 0.01}, policy)
+
+    assert result.toxins == []
+    assert policy.hedges == 0 and cancelled == []
+    assert len(policy.latencies) == 1
+
+
+def test_hedge_wins_against_slow_primary_and_cancels_it() -> None:
+    policy = HedgePolicy(initial_delay=0.02, fallback_model="fallback")
+
+    result, cancelled = hedged({"primary": 1.0, "fallback": 0.01}, policy)
+
+    assert [toxin.name for toxin in result.toxins] == ["fallback"]
+    assert policy.hedges == 1 and policy.hedge_wins == 1
+    assert cancelled == ["primary"]
+    assert policy.cancelled_calls == 1
+    # A hedge win says nothing about the primary's latency
+    assert len(policy.latencies) == 0
+
+
+def test_primary_finishing_first_cancels_the_hedge() -> None:
+    policy = HedgePolicy(initial_delay=0.02, fallback_model="fallback")
+
+    result, cancelled = hedged({"primary": 0.05, "fallback": 1.0}, policy)
+
+    assert result.toxins == []
+    assert policy.hedges == 1 and policy.hedge_wins == 0
+    assert cancelled == ["fallback"]
+    assert len(policy.latencies) == 1
+
+
+def test_delay_follows_the_latency_percentile() -> None:
+    policy = HedgePolicy(percentile=90, min_samples=10, min_delay=0.0)
+    for latency in range(1, 11):
+        policy.record_latency(latency / 10)
+
+    assert policy.delay() == 1.0
+    policy.percentile = 50
+    assert policy.delay() == 0.6
+
+
+if __name__ == "__main__":
+    test_fast_primary_is_not_hedged()
+    test_hedge_wins_against_slow_primary_and_cancels_it()
+    test_primary_finishing_first_cancels_the_hedge()
+    test_delay_follows_the_latency_percentile()
+
+    print("All tests completed successfully!")
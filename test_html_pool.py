@@ -0,0 +1,29 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import html_pool  # noqa: E402
+from bs4thingy import extract_text_from_html  # noqa: E402
+
+PARAGRAPH = "<div><p>Risk evaluation for <b>trichloroethylene</b>.</p><li>TSCA</li></div>\n"
+
+
+def test_large_page_is_parsed_in_process_pool() -> None:
+    html = "<html><body>" + PARAGRAPH * (html_pool.HTML_PROCESS_MIN_CHARS // len(PARAGRAPH) + 1)
+
+    assert html_pool.html_to_text(html) == extract_text_from_html(html)
+    assert html_pool._pool is not None or html_pool._pool_unavailable
+
+
+def test_small_page_is_parsed_inline() -> None:
+    html = "<html><body>" + PARAGRAPH
+
+    assert html_pool.html_to_text(html) == "Risk evaluation for trichloroethylene . \n TSCA"
+
+
+if __name__ == "__main__":
+    test_large_page_is_parsed_in_process_pool()
+    test_small_page_is_parsed_inline()
+
+    print("All tests completed successfully!")
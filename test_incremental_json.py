@@ -0,0 +1,52 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from incremental_json import IncrementalArrayParser  # noqa: E402
+
+
+def feed_in_pieces(parser: IncrementalArrayParser, text: str, size: int) -> list:
+    items = []
+    for start in range(0, len(text), size):
+        items.extend(parser.feed(text[start : start + size]))  # noqa: E203
+    return items
+
+
+def test_yields_each_object_when_it_closes() -> None:
+    parser = IncrementalArrayParser("toxins")
+
+    assert parser.feed('{"toxins": [{"name": "Benz') == []
+    assert parser.feed('ene"}, {"na') == [{"name": "Benzene"}]
+    assert parser.feed('me": "Toluene"}]}') == [{"name": "Toluene"}]
+
+
+def test_handles_braces_and_quotes_inside_strings() -> None:
+    document = {
+        "toxins": [
+            {"name": 'odd "{name}" [1]', "sources": ["a}", "{b"]},
+            {"name": "back\\slash", "nested": [{"x": "]"}]},
+        ]
+    }
+    text = json.dumps(document)
+
+    for size in (1, 3, 7, len(text)):
+        parser = IncrementalArrayParser("toxins")
+        assert feed_in_pieces(parser, text, size) == document["toxins"]
+
+
+def test_ignores_arrays_under_other_keys() -> None:
+    text = json.dumps({"other": [{"a": 1}], "toxins": [{"b": 2}], "after": [{"c": 3}]})
+
+    parser = IncrementalArrayParser("toxins")
+
+    assert feed_in_pieces(parser, text, 5) == [{"b": 2}]
+
+
+if __name__ == "__main__":
+    test_yields_each_object_when_it_closes()
+    test_handles_braces_and_quotes_inside_strings()
+    test_ignores_arrays_under_other_keys()
+
+    print("All tests completed successfully!")
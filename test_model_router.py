@@ -0,0 +1,196 @@
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+from typing import Any, List
+
+from openai.types.chat import ChatCompletion
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from model_router import (  # noqa: E402
+    ChemicalIndexClassifier,
+    KeywordClassifier,
+    ModelClassifier,
+    ModelRouter,
+    PassthroughClassifier,
+    classifier_from_name,
+)
+
+RELEVANT = "Workers were exposed to trichloroethylene, a known carcinogen."
+IRRELEVANT = "The meeting was moved to Tuesday afternoon."
+
+
+def completion(model: str, content: str) -> ChatCompletion:
+    return ChatCompletion.model_validate(
+        {
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": 0,
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": content},
+                }
+            ],
+        }
+    )
+
+
+class FakeCompletions:
+    """Answers relevance questions with `answer` and extractions with no toxins"""
+
+    def __init__(self, answer: str = "yes") -> None:
+        self.answer = answer
+        self.user_contents: List[str] = []
+
+    async def create(self, **kwargs: Any) -> ChatCompletion:
+        self.user_contents.append(kwargs["messages"][-1]["content"])
+        if "response_format" in kwargs:
+            return completion(kwargs["model"], json.dumps({"toxins": []}))
+        return completion(kwargs["model"], self.answer)
+
+
+def fake_client(completions: FakeCompletions) -> Any:
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+class NeverRelevant:
+    name = "never"
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def classify(self, chunk: str) -> bool:
+        self.calls += 1
+        return False
+
+
+def test_keyword_classifier() -> None:
+    classifier = KeywordClassifier()
+
+    assert classifier.is_relevant(RELEVANT)
+    assert classifier.is_relevant("CAS No. 79-01-6")
+    assert not classifier.is_relevant(IRRELEVANT)
+
+
+def test_chemical_index_classifier_falls_back_only_without_a_match() -> None:
+    fallback = NeverRelevant()
+    classifier = ChemicalIndexClassifier(fallback=fallback)
+
+    assert asyncio.run(classifier.classify(RELEVANT))
+    assert fallback.calls == 0
+    assert not asyncio.run(classifier.classify(IRRELEVANT))
+    assert fallback.calls == 1
+    # A fallback that escalates everything keeps unmatched chunks
+    passthrough = ChemicalIndexClassifier(fallback=PassthroughClassifier())
+    assert asyncio.run(passthrough.classify(IRRELEVANT))
+
+
+def test_model_classifier_reads_yes_or_no() -> None:
+    completions = FakeCompletions(answer="Yes.")
+    assert asyncio.run(ModelClassifier(async_client=fake_client(completions)).classify("x"))
+    completions.answer = "no"
+    assert not asyncio.run(ModelClassifier(async_client=fake_client(completions)).classify("x"))
+
+
+def test_classifier_from_name() -> None:
+    assert isinstance(classifier_from_name("chemical_index"), ChemicalIndexClassifier)
+    assert isinstance(classifier_from_name("keyword"), KeywordClassifier)
+    assert isinstance(classifier_from_name("off"), PassthroughClassifier)
+    model = classifier_from_name("model:gpt-4o-mini")
+    assert isinstance(model, ModelClassifier) and model.model == "gpt-4o-mini"
+    try:
+        classifier_from_name("bogus")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_router_escalates_only_relevant_chunks() -> None:
+    completions = FakeCompletions()
+    router = ModelRouter(
+        "system",
+        KeywordClassifier(),
+        chunk_chars=80,
+        async_client=fake_client(completions),
+        prefilter_min_chars=0,
+    )
+
+    asyncio.run(router.extract(f"{IRRELEVANT}\n\n{RELEVANT}\n\n{IRRELEVANT}"))
+
+    assert completions.user_contents == [RELEVANT]
+    assert router.stats_snapshot()["prefilter:keyword"]["chunks"] == 3
+    assert router.stats_snapshot()[f"escalated:{router.model}"]["calls"] == 1
+
+
+def test_router_skips_the_model_when_nothing_is_relevant() -> None:
+    completions = FakeCompletions()
+    router = ModelRouter(
+        "system", NeverRelevant(), async_client=fake_client(completions), prefilter_min_chars=0
+    )
+
+    result = asyncio.run(router.extract(RELEVANT))
+
+    assert result.toxins == []
+    assert completions.user_contents == []
+    assert router.stats_snapshot()["skipped"]["calls"] == 1
+
+
+def test_short_text_naming_an_unindexed_toxin_reaches_the_model() -> None:
+    completions = FakeCompletions()
+    router = ModelRouter(
+        "system", classifier_from_name("chemical_index"), async_client=fake_client(completions)
+    )
+
+    asyncio.run(router.extract("PFAS found in drinking water"))
+
+    assert completions.user_contents == ["PFAS found in drinking water"]
+
+
+def test_default_prefilter_needs_one_keyword_outside_the_index() -> None:
+    classifier = classifier_from_name("chemical_index")
+    text = "Residents near the airfield asked about contaminant levels in their wells."
+
+    assert asyncio.run(classifier.classify(text))
+    assert not asyncio.run(classifier.classify(IRRELEVANT))
+
+
+def test_passthrough_router_escalates_everything() -> None:
+    completions = FakeCompletions()
+    router = ModelRouter(
+        "system", PassthroughClassifier(), async_client=fake_client(completions)
+    )
+
+    asyncio.run(router.extract(IRRELEVANT))
+
+    assert completions.user_contents == [IRRELEVANT]
+
+
+def test_result_key_changes_with_prompt_and_prefilter() -> None:
+    key = ModelRouter("system", KeywordClassifier()).result_key()
+
+    assert ModelRouter("system", KeywordClassifier()).result_key() == key
+    assert ModelRouter("other", KeywordClassifier()).result_key() != key
+    assert ModelRouter("system", PassthroughClassifier()).result_key() != key
+    assert ModelRouter("system", KeywordClassifier(), prefilter_min_chars=0).result_key() != key
+
+
+if __name__ == "__main__":
+    test_keyword_classifier()
+    test_chemical_index_classifier_falls_back_only_without_a_match()
+    test_model_classifier_reads_yes_or_no()
+    test_classifier_from_name()
+    test_router_escalates_only_relevant_chunks()
+    test_router_skips_the_model_when_nothing_is_relevant()
+    test_short_text_naming_an_unindexed_toxin_reaches_the_model()
+    test_default_prefilter_needs_one_keyword_outside_the_index()
+    test_passthrough_router_escalates_everything()
+    test_result_key_changes_with_prompt_and_prefilter()
+
+    print("All tests completed successfully!")
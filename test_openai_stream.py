@@ -0,0 +1,161 @@
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, List, Optional
+
+import httpx
+import openai
+import pytest
+from openai.types.chat import ChatCompletionChunk
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from pydantic_models import ToxinList  # noqa: E402
+from text_2_entity import openai_breaker, parse_input_stream_async  # noqa: E402
+
+TOXINS = json.dumps(
+    {
+        "toxins": [
+            {
+                "name": name,
+                "sources": [],
+                "health_effects": [],
+                "related_diseases": [],
+                "reference_context": "",
+                "relevant_regulations": [],
+                "cas_number": None,
+            }
+            for name in ("Lead", "Arsenic")
+        ]
+    }
+)
+
+
+def chunk(
+    content: Optional[str] = None,
+    refusal: Optional[str] = None,
+    finish_reason: Optional[str] = None,
+) -> ChatCompletionChunk:
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "chatcmpl-test",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": [
+                {
+                    "index": 0,
+                    "delta": {"content": content, "refusal": refusal},
+                    "finish_reason": finish_reason,
+                }
+            ],
+        }
+    )
+
+
+class FakeStream:
+    """Stands in for openai.AsyncStream: yields chunks, then an optional error"""
+
+    def __init__(
+        self, chunks: List[ChatCompletionChunk], error: Optional[Exception] = None
+    ) -> None:
+        self.chunks = chunks
+        self.error = error
+        self.closed = False
+
+    async def __aenter__(self) -> "FakeStream":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        self.closed = True
+
+    async def __aiter__(self) -> AsyncIterator[ChatCompletionChunk]:
+        for item in self.chunks:
+            yield item
+            # Give the consumer a chance to stop between chunks
+            await asyncio.sleep(0)
+        if self.error is not None:
+            raise self.error
+        # Hang like a connection that is still generating
+        await asyncio.sleep(5)
+
+
+class FakeStreamCompletions:
+    def __init__(self, stream: FakeStream) -> None:
+        self.stream = stream
+
+    async def create(self, **kwargs: Any) -> FakeStream:
+        assert kwargs["stream"] is True
+        return self.stream
+
+
+def fake_stream_client(stream: FakeStream) -> Any:
+    return SimpleNamespace(chat=SimpleNamespace(completions=FakeStreamCompletions(stream)))
+
+
+def toxin_chunks(text: str = TOXINS, size: int = 40) -> List[ChatCompletionChunk]:
+    return [chunk(text[start : start + size]) for start in range(0, len(text), size)]  # noqa: E203
+
+
+def stream_toxins(stream: FakeStream) -> AsyncIterator[ToxinList.Toxin]:
+    return parse_input_stream_async(
+        "system",
+        "text",
+        ToxinList,
+        "toxins",
+        ToxinList.Toxin,
+        async_client=fake_stream_client(stream),
+    )
+
+
+def test_stream_is_closed_when_the_consumer_stops_early() -> None:
+    stream = FakeStream(toxin_chunks())
+
+    async def first() -> str:
+        toxins: Any = stream_toxins(stream)
+        toxin: ToxinList.Toxin = await toxins.__anext__()
+        await toxins.aclose()
+        return toxin.name
+
+    assert asyncio.run(first()) == "Lead"
+    assert stream.closed
+
+
+def test_stream_is_closed_on_refusal() -> None:
+    stream = FakeStream([chunk(refusal="I can't help with that")])
+
+    async def collect() -> List[ToxinList.Toxin]:
+        return [toxin async for toxin in stream_toxins(stream)]
+
+    with pytest.raises(ValueError, match="refused"):
+        asyncio.run(collect())
+    assert stream.closed
+
+
+def test_errors_mid_stream_reach_the_breaker() -> None:
+    error = openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com"))
+    stream = FakeStream(toxin_chunks(size=len(TOXINS) // 2), error=error)
+    failures = openai_breaker._outcomes.count(False)
+
+    async def collect() -> List[str]:
+        return [toxin.name async for toxin in stream_toxins(stream)]
+
+    with pytest.raises(openai.APIConnectionError):
+        asyncio.run(collect())
+    assert stream.closed
+    assert openai_breaker._outcomes.count(False) == failures + 1
+    openai_breaker._outcomes.clear()
+
+
+if __name__ == "__main__":
+    test_stream_is_closed_when_the_consumer_stops_early()
+    test_stream_is_closed_on_refusal()
+    test_errors_mid_stream_reach_the_breaker()
+
+    print("All tests completed successfully!")
@@ -0,0 +1,69 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from paragraph_cache import BlockCache, split_blocks  # noqa: E402
+from pydantic_models import ToxinList  # noqa: E402
+from result_store import ResultStore  # noqa: E402
+from toxin_merge import merge_toxins  # noqa: E402
+
+
+def make_toxin(name: str, sources: list[str]) -> ToxinList.Toxin:
+    return ToxinList.Toxin(
+        name=name,
+        sources=sources,
+        health_effects=[],
+        related_diseases=[],
+        reference_context="",
+        relevant_regulations=[],
+    )
+
+
+def make_document(paragraphs: int) -> list[str]:
+    return [f"Paragraph {i} about solvent number {i}. " * 8 for i in range(paragraphs)]
+
+
+def test_edit_only_changes_its_own_block() -> None:
+    paragraphs = make_document(40)
+    original = split_blocks("\n\n".join(paragraphs), min_chars=600, max_chars=2000)
+    paragraphs[20] = "An edited paragraph mentioning benzene instead."
+    edited = split_blocks("\n\n".join(paragraphs), min_chars=600, max_chars=2000)
+
+    changed = set(edited) - set(original)
+
+    assert len(original) > 4
+    assert len(changed) <= 2
+    assert all(len(block) <= 2000 for block in edited)
+
+
+def test_block_cache_is_keyed_by_model_and_prompt() -> None:
+    store = ResultStore(":memory:")
+    cache = BlockCache(store, "gpt-4o", "prompt")
+    cache.put("block", ToxinList(toxins=[make_toxin("TCE", [])]))
+
+    assert cache.get("block") is not None
+    assert cache.get("other block") is None
+    assert BlockCache(store, "gpt-4o", "new prompt").get("block") is None
+    assert cache.stats.as_dict()["hits"] == 1
+
+
+def test_merge_unions_duplicate_toxins() -> None:
+    merged = merge_toxins(
+        [
+            make_toxin("Trichloroethylene", ["degreasers"]),
+            make_toxin("Benzene", ["gasoline"]),
+            make_toxin("TCE", ["dry cleaning", "degreasers"]),
+        ]
+    )
+
+    assert [toxin.name for toxin in merged] == ["Trichloroethylene", "Benzene"]
+    assert merged[0].sources == ["degreasers", "dry cleaning"]
+
+
+if __name__ == "__main__":
+    test_edit_only_changes_its_own_block()
+    test_block_cache_is_keyed_by_model_and_prompt()
+    test_merge_unions_duplicate_toxins()
+
+    print("All tests completed successfully!")
@@ -0,0 +1,80 @@
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("SCRAPER_API_KEY", "test")
+
+from extractor_api import FetchedDocument  # noqa: E402
+from pdf_text import extract_text_from_pdf  # noqa: E402
+from url_2_text import document_to_text  # noqa: E402
+
+
+def make_pdf(pages: list[str]) -> bytes:
+    """Build a minimal PDF with one line of Helvetica text per page"""
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids ["
+        + b" ".join(b"%d 0 R" % i for i in page_ids)
+        + b"] /Count %d >>" % len(pages),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for page_id, text in zip(page_ids, pages):
+        stream = b"BT /F1 12 Tf 72 720 Td (%s) Tj ET" % text.encode("latin-1")
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (page_id + 1)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+
+    body = b"%PDF-1.4\n"
+    offsets = []
+    for number, content in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += b"%d 0 obj\n%s\nendobj\n" % (number, content)
+    xref = len(body)
+    body += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    body += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    body += b"trailer\n<< /Size %d /Root 1 0 R >>\n" % (len(objects) + 1)
+    return body + b"startxref\n%d\n%%%%EOF\n" % xref
+
+
+def write_pdf(pages: list[str]) -> str:
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as pdf_file:
+        pdf_file.write(make_pdf(pages))
+    return pdf_file.name
+
+
+def test_pdf_pages_are_extracted_in_order() -> None:
+    pages = [f"Page {i} mentions benzene" for i in range(20)]
+    path = write_pdf(pages)
+    try:
+        sequential = extract_text_from_pdf(path, max_workers=1)
+        parallel = extract_text_from_pdf(path, max_workers=2)
+        first_pages = extract_text_from_pdf(path, max_pages=3)
+    finally:
+        os.unlink(path)
+
+    assert sequential.split("\n\n") == pages
+    assert parallel == sequential
+    assert first_pages.split("\n\n") == pages[:3]
+
+
+def test_document_dispatch_by_content_type() -> None:
+    path = write_pdf(["Trichloroethylene"])
+    with FetchedDocument(url="u", content_type="application/pdf", path=path) as pdf:
+        assert document_to_text(pdf) == "Trichloroethylene"
+    assert not os.path.exists(path)
+
+    json_document = FetchedDocument(url="u", content_type="application/json", text='{"a": 1}')
+    html_document = FetchedDocument(url="u", content_type="text/html", text="<p>Benzene</p>")
+    assert document_to_text(json_document) == '{"a": 1}'
+    assert document_to_text(html_document) == "Benzene"
+
+
+if __name__ == "__main__":
+    test_pdf_pages_are_extracted_in_order()
+    test_document_dispatch_by_content_type()
+
+    print("All tests completed successfully!")
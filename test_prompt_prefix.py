@@ -0,0 +1,44 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from prompts import (  # noqa: E402
+    extraction_examples,
+    extraction_guidelines,
+    prompt_to_extract_toxins,
+)
+from pydantic_models import ToxinList  # noqa: E402
+from text_2_entity import MIN_CACHEABLE_PREFIX_TOKENS, PromptPrefix  # noqa: E402
+
+
+def test_variable_content_comes_after_the_fixed_prefix() -> None:
+    prefix = PromptPrefix("system", (("example in", "example out"),))
+
+    first = prefix.messages("page one")
+    second = prefix.messages("page two")
+
+    assert [message["role"] for message in first] == ["system", "user", "assistant", "user"]
+    assert first[:-1] == second[:-1]
+    assert first[-1]["content"] == "page one"
+    assert prefix.key() == PromptPrefix("system", (("example in", "example out"),)).key()
+    assert prefix.key() != PromptPrefix("system").key()
+
+
+def test_extraction_prefix_is_cacheable_and_examples_are_valid() -> None:
+    prefix = PromptPrefix(
+        prompt_to_extract_toxins + extraction_guidelines, tuple(extraction_examples)
+    )
+
+    assert prefix.estimated_tokens >= MIN_CACHEABLE_PREFIX_TOKENS
+    assert not PromptPrefix(prompt_to_extract_toxins).stats()["cacheable"]
+    for _, output in extraction_examples:
+        ToxinList.model_validate_json(output)
+
+
+if __name__ == "__main__":
+    test_variable_content_comes_after_the_fixed_prefix()
+    test_extraction_prefix_is_cacheable_and_examples_are_valid()
+
+    print("All tests completed successfully!")
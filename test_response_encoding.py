@@ -0,0 +1,94 @@
+import json
+import os
+import sys
+from typing import AsyncIterator
+
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pydantic_models import ToxinList, ToxinListResponse  # noqa: E402
+from response_encoding import (  # noqa: E402
+    CompressionMiddleware,
+    choose_encoding,
+    parse_fields,
+    toxin_response,
+)
+
+TOXIN = ToxinList.Toxin(
+    name="Benzene",
+    sources=["gasoline"],
+    health_effects=["leukemia"],
+    related_diseases=["leukemia"],
+    reference_context="Benzene exposure from gasoline vapour is linked to leukemia. " * 20,
+    relevant_regulations=["Clean Air Act"],
+    cas_number="71-43-2",
+)
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+
+@app.get("/toxins")
+async def toxins(fields: str | None = None) -> Response:
+    return toxin_response(ToxinListResponse(toxins=[TOXIN], urls=["u"]), parse_fields(fields))
+
+
+@app.get("/stream")
+async def stream() -> StreamingResponse:
+    async def lines() -> AsyncIterator[str]:
+        yield TOXIN.model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+client = TestClient(app)
+
+
+def test_choose_encoding() -> None:
+    assert choose_encoding("gzip, deflate, br") == "br"
+    assert choose_encoding("br;q=0, gzip;q=0.5") == "gzip"
+    assert choose_encoding("*") == "br"
+    assert choose_encoding("identity") is None
+    # q-values outrank the server's preference for brotli
+    assert choose_encoding("gzip;q=1.0, br;q=0.5") == "gzip"
+    assert choose_encoding("br;q=0.8, *;q=0.9") == "gzip"
+    assert choose_encoding("gzip;q=0, *") == "br"
+    assert choose_encoding("gzip;q=0, br;q=0") is None
+    assert choose_encoding("") is None
+
+
+def test_compression_negotiated() -> None:
+    expected = json.loads(TOXIN.model_dump_json())
+
+    for encoding in ("br", "gzip"):
+        response = client.get("/toxins", headers={"Accept-Encoding": encoding})
+        assert response.headers["content-encoding"] == encoding
+        assert response.headers["vary"] == "Accept-Encoding"
+        # httpx decodes the body; the header still holds the compressed size
+        assert int(response.headers["content-length"]) < len(response.content)
+        assert response.json()["toxins"] == [expected]
+
+    # Streamed NDJSON and small bodies are sent uncompressed
+    streamed = client.get("/stream", headers={"Accept-Encoding": "gzip, br"})
+    assert "content-encoding" not in streamed.headers
+    small = client.get("/toxins?fields=name", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+def test_fields_projection() -> None:
+    response = client.get("/toxins?fields=cas_number", headers={"Accept-Encoding": "identity"})
+
+    assert response.json() == {
+        "toxins": [{"name": "Benzene", "cas_number": "71-43-2"}],
+        "urls": ["u"],
+    }
+    assert client.get("/toxins?fields=bogus").status_code == 400
+
+
+if __name__ == "__main__":
+    test_choose_encoding()
+    test_compression_negotiated()
+    test_fields_projection()
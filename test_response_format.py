@@ -0,0 +1,65 @@
+import os
+import sys
+from typing import Any, Optional
+
+from openai.types.chat import ChatCompletion
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from pydantic_models import ToxinList  # noqa: E402
+from text_2_entity import compile_response_format  # noqa: E402
+
+
+def completion(
+    content: Optional[str], finish_reason: str = "stop", refusal: Optional[str] = None
+) -> ChatCompletion:
+    message: dict[str, Any] = {"role": "assistant", "content": content, "refusal": refusal}
+    return ChatCompletion.model_validate(
+        {
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": [{"index": 0, "finish_reason": finish_reason, "message": message}],
+        }
+    )
+
+
+def parse_error(reply: ChatCompletion) -> str:
+    try:
+        compile_response_format(ToxinList).parse(reply)
+    except ValueError as e:
+        return str(e)
+    raise AssertionError("expected ValueError")
+
+
+def test_schema_is_compiled_once_per_model() -> None:
+    compiled = compile_response_format(ToxinList)
+
+    assert compile_response_format(ToxinList) is compiled
+    assert compile_response_format(ToxinList.Toxin) is not compiled
+    json_schema = compiled.response_format["json_schema"]
+    assert json_schema["name"] == "ToxinList"
+    assert json_schema["strict"] is True
+    assert json_schema["schema"]["additionalProperties"] is False
+
+
+def test_parse_validates_content() -> None:
+    result = compile_response_format(ToxinList).parse(completion('{"toxins": []}'))
+
+    assert result == ToxinList(toxins=[])
+
+
+def test_parse_reports_refusal_truncation_and_empty_replies() -> None:
+    assert "refused" in parse_error(completion(None, refusal="I can't help with that"))
+    assert "truncated" in parse_error(completion('{"toxins": [', finish_reason="length"))
+    assert parse_error(completion(None)) == "Failed to parse response."
+
+
+if __name__ == "__main__":
+    test_schema_is_compiled_once_per_model()
+    test_parse_validates_content()
+    test_parse_reports_refusal_truncation_and_empty_replies()
+
+    print("All tests completed successfully!")
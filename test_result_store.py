@@ -0,0 +1,136 @@
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pydantic_models import ToxinList  # noqa: E402
+from result_store import ResultStore, decode_cursor, encode_cursor  # noqa: E402
+
+
+def make_toxin(
+    name: str, diseases: list[str], regulations: list[str]
+) -> ToxinList.Toxin:
+    return ToxinList.Toxin(
+        name=name,
+        sources=["degreasers"],
+        health_effects=["liver damage"],
+        related_diseases=diseases,
+        reference_context="",
+        relevant_regulations=regulations,
+    )
+
+
+def make_store() -> ResultStore:
+    store = ResultStore(":memory:")
+    store.save_extraction(
+        "page one",
+        ToxinList(
+            toxins=[
+                make_toxin("TCE", ["kidney cancer"], ["TSCA Section 6"]),
+                make_toxin("Benzene", ["leukemia"], ["Clean Air Act"]),
+            ]
+        ),
+        model="gpt-4o",
+        source_url="https://www.epa.gov/a",
+    )
+    return store
+
+
+def test_search_by_synonym_uses_normalized_name() -> None:
+    store = make_store()
+
+    results = store.search_toxins(name="Trichloroethylene")
+
+    assert [toxin.name for toxin in results] == ["TCE"]
+    assert results[0].source_url == "https://www.epa.gov/a"
+
+
+def test_search_by_regulation_and_disease() -> None:
+    store = make_store()
+
+    assert [t.name for t in store.search_toxins(regulation="tsca")] == ["TCE"]
+    assert [t.name for t in store.search_toxins(disease="leukemia")] == ["Benzene"]
+    assert store.search_toxins(regulation="tsca", disease="leukemia") == []
+
+
+def test_search_input_is_not_parsed_as_fts_syntax() -> None:
+    store = make_store()
+
+    assert store.search_toxins(query='cancer" OR "') == []
+
+
+def test_cached_result_is_keyed_by_text_and_model() -> None:
+    store = make_store()
+
+    cached = store.get_cached("page one", "gpt-4o")
+
+    assert cached is not None
+    assert len(cached.toxins) == 2
+    assert store.get_cached("page one", "gpt-4o-mini") is None
+    assert store.get_cached("page two", "gpt-4o") is None
+
+
+def test_cached_result_is_keyed_by_prompt() -> None:
+    store = make_store()
+    store.save_extraction("page three", ToxinList(toxins=[]), "gpt-4o", prompt_key="v1")
+
+    assert store.get_cached("page three", "gpt-4o", "v1") == ToxinList(toxins=[])
+    assert store.get_cached("page three", "gpt-4o", "v2") is None
+    assert store.get_cached("page three", "gpt-4o") is None
+
+
+def test_stores_without_prompt_keys_are_migrated(tmp_path: Path) -> None:
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE extractions (id INTEGER PRIMARY KEY, source_url TEXT, "
+        "text_hash TEXT NOT NULL, model TEXT NOT NULL, created_at REAL NOT NULL, "
+        "result_json TEXT NOT NULL)"
+    )
+    conn.close()
+
+    store = ResultStore(path)
+    store.save_extraction("page", ToxinList(toxins=[]), "gpt-4o", prompt_key="v1")
+
+    assert store.get_cached("page", "gpt-4o", "v1") is not None
+
+
+def test_keyset_pages_cover_every_toxin_once() -> None:
+    store = make_store()
+    store.save_extraction(
+        "page two",
+        ToxinList(toxins=[make_toxin(f"Toxin {i}", [], []) for i in range(5)]),
+        model="gpt-4o",
+        source_url="https://www.epa.gov/b",
+    )
+
+    names: list[str] = []
+    before_id = None
+    while True:
+        page = store.search_toxins(limit=3, before_id=before_id)
+        names.extend(toxin.name for toxin in page)
+        if len(page) < 3:
+            break
+        before_id = decode_cursor(encode_cursor(page[-1].id))
+
+    assert names == [f"Toxin {i}" for i in reversed(range(5))] + ["Benzene", "TCE"]
+    assert len(store.search_toxins(source_url="https://www.epa.gov/a")) == 2
+    for cursor in ("", "not-a-cursor", "eDE"):
+        try:
+            decode_cursor(cursor)
+            raise AssertionError(f"{cursor!r} accepted")
+        except ValueError:
+            pass
+
+
+if __name__ == "__main__":
+    test_search_by_synonym_uses_normalized_name()
+    test_search_by_regulation_and_disease()
+    test_search_input_is_not_parsed_as_fts_syntax()
+    test_cached_result_is_keyed_by_text_and_model()
+    test_cached_result_is_keyed_by_prompt()
+    test_keyset_pages_cover_every_toxin_once()
+
+    print("All tests completed successfully!")
@@ -0,0 +1,81 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, Tuple
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("SCRAPER_API_KEY", "test")
+
+from bs4thingy import extract_text_from_html, extract_text_from_html_chunks  # noqa: E402
+from extractor_api import (  # noqa: E402
+    DownloadTooLarge,
+    UnsupportedContentType,
+    fetch_document,
+    fetch_webpage,
+)
+
+PAGE = "<html><head><title>T</title></head><body><p>Crème brûlée</p><p>TCE</p></body></html>"
+
+# path -> (content type, body, send Content-Length)
+ROUTES: Dict[str, Tuple[str, bytes, bool]] = {
+    "/page": ("text/html; charset=utf-8", PAGE.encode("utf-8"), True),
+    "/image": ("image/png", b"\x89PNG" + b"\0" * 100, True),
+    "/large": ("text/html", b"<p>" + b"x" * 5000 + b"</p>", True),
+    "/large-chunked": ("text/html", b"<p>" + b"x" * 5000 + b"</p>", False),
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        content_type, body, send_length = ROUTES[self.path]
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        if send_length:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture(scope="module")
+def server() -> Iterator[str]:
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_incremental_parser_matches_full_parse() -> None:
+    html = PAGE.replace("<p>TCE</p>", "<script>x()</script><ul><li>a</li><li>b</li></ul>")
+    for size in (1, 5, 64):
+        chunks = [html[i:][:size] for i in range(0, len(html), size)]
+        assert extract_text_from_html_chunks(chunks) == extract_text_from_html(html)
+
+
+def test_fetch_decodes_streamed_page(server: str) -> None:
+    assert fetch_webpage(f"{server}/page", proxy=False) == PAGE
+
+    with fetch_document(f"{server}/page", proxy=False, incremental_html=True) as document:
+        assert document.extracted
+        assert document.text == "Crème brûlée \n TCE"
+
+
+def test_unsupported_content_type_is_rejected(server: str) -> None:
+    with pytest.raises(UnsupportedContentType):
+        fetch_webpage(f"{server}/image", proxy=False)
+    with pytest.raises(UnsupportedContentType):
+        fetch_document(f"{server}/image", proxy=False)
+
+
+def test_download_size_limit(server: str) -> None:
+    with pytest.raises(DownloadTooLarge):
+        fetch_webpage(f"{server}/large", proxy=False, max_bytes=1000)
+    with pytest.raises(DownloadTooLarge):
+        fetch_webpage(f"{server}/large-chunked", proxy=False, max_bytes=1000)
+    assert len(fetch_webpage(f"{server}/large", proxy=False, max_bytes=10_000)) == 5007
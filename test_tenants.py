@@ -0,0 +1,127 @@
+import asyncio
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+from typing import Any, List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("SCRAPER_API_KEY", "test")
+os.environ.setdefault(
+    "RESULT_STORE_PATH", os.path.join(tempfile.mkdtemp(), "test_tenants.sqlite3")
+)
+
+import router  # noqa: E402
+from priority_scheduler import BATCH, INTERACTIVE, PriorityScheduler  # noqa: E402
+from tenants import Tenant, TenantMiddleware, TenantRegistry, current_tenant  # noqa: E402
+from token_usage import UsageMiddleware, record_usage  # noqa: E402
+
+USAGE = SimpleNamespace(prompt_tokens=600, completion_tokens=100, prompt_tokens_details=None)
+
+
+def test_interactive_work_jumps_ahead_of_batch_work() -> None:
+    scheduler = PriorityScheduler(max_concurrent=1)
+    order: List[str] = []
+
+    async def job(name: str, priority: int) -> None:
+        async with scheduler.slot(priority):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def run() -> None:
+        first = asyncio.create_task(job("running", BATCH))
+        await asyncio.sleep(0)
+        batch = [asyncio.create_task(job(f"batch{i}", BATCH)) for i in range(2)]
+        await asyncio.sleep(0)
+        cancelled = asyncio.create_task(job("cancelled", INTERACTIVE))
+        interactive = asyncio.create_task(job("interactive", INTERACTIVE))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.gather(first, *batch, interactive)
+
+    asyncio.run(run())
+
+    assert order == ["running", "interactive", "batch0", "batch1"]
+    assert scheduler.active == 0
+    assert scheduler.stats()["batch_queued"] == 0
+
+
+registry = TenantRegistry(
+    {
+        "key-web-app": Tenant("web-app", max_concurrency=1),
+        "key-bulk": Tenant("bulk", priority=BATCH, token_quota=1000),
+    }
+)
+app = FastAPI()
+app.add_middleware(UsageMiddleware)
+app.add_middleware(TenantMiddleware, registry=registry)
+
+
+@app.post("/extract")
+async def extract() -> dict[str, str | int | None]:
+    record_usage("gpt-4o", USAGE)
+    return {"tenant": current_tenant().name, "in_flight": registry.stats()["web-app"]["in_flight"]}
+
+
+def test_requests_are_authenticated_by_api_key() -> None:
+    client = TestClient(app)
+
+    assert client.post("/extract").status_code == 401
+    assert client.post("/extract", headers={"X-API-Key": "wrong"}).status_code == 401
+    response = client.post("/extract", headers={"Authorization": "Bearer key-web-app"})
+    assert response.json() == {"tenant": "web-app", "in_flight": 1}
+    assert response.headers["x-token-usage-prompt"] == "600"
+    assert registry.stats()["web-app"]["in_flight"] == 0
+
+
+def test_concurrency_limit_is_enforced() -> None:
+    assert registry.try_start(registry.tenants["key-web-app"])
+    try:
+        response = TestClient(app).post("/extract", headers={"X-API-Key": "key-web-app"})
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "1"
+    finally:
+        registry.finish(registry.tenants["key-web-app"])
+
+
+def test_token_quota_is_enforced() -> None:
+    client = TestClient(app)
+    headers = {"X-API-Key": "key-bulk"}
+
+    # 700 tokens used, still under the quota of 1000
+    assert client.post("/extract", headers=headers).status_code == 200
+    assert client.post("/extract", headers=headers).status_code == 200
+    response = client.post("/extract", headers=headers)
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) > 0
+    assert registry.stats()["bulk"]["tokens_used"] == 1400
+
+
+def test_metrics_only_show_the_callers_usage(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(router, "tenant_registry", registry)
+    TestClient(app).post("/extract", headers={"X-API-Key": "key-web-app"})
+
+    def metrics_for(tenant: Tenant) -> dict[str, Any]:
+        monkeypatch.setattr(router, "current_tenant", lambda: tenant)
+        return asyncio.run(router.metrics())
+
+    own = metrics_for(registry.tenants["key-bulk"])
+    assert {row["tenant"] for row in own["token_usage"]} <= {"bulk"}
+    assert list(own["tenants"]) == ["bulk"]
+    everything = metrics_for(Tenant("ops", admin=True))
+    assert "web-app" in {row["tenant"] for row in everything["token_usage"]}
+    assert list(everything["tenants"]) == ["bulk", "web-app"]
+
+
+if __name__ == "__main__":
+    test_interactive_work_jumps_ahead_of_batch_work()
+    test_requests_are_authenticated_by_api_key()
+    test_concurrency_limit_is_enforced()
+    test_token_quota_is_enforced()
+
+    print("All tests completed successfully!")
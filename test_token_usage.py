@@ -0,0 +1,100 @@
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+from typing import Any
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from openai.types.chat import ChatCompletion
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from pydantic_models import ToxinList  # noqa: E402
+from tenants import TenantMiddleware  # noqa: E402
+from text_2_entity import parse_input_async  # noqa: E402
+from token_usage import TokenUsage, UsageMiddleware, usage_stats  # noqa: E402
+
+USAGE = {
+    "prompt_tokens": 1000,
+    "completion_tokens": 100,
+    "total_tokens": 1100,
+    "prompt_tokens_details": {"cached_tokens": 400},
+}
+
+
+class FakeCompletions:
+    async def create(self, **kwargs: Any) -> ChatCompletion:
+        return ChatCompletion.model_validate(
+            {
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": kwargs["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": json.dumps({"toxins": []})},
+                    }
+                ],
+                "usage": USAGE,
+            }
+        )
+
+
+fake_client: Any = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+
+app = FastAPI()
+app.add_middleware(UsageMiddleware)
+app.add_middleware(TenantMiddleware, allowed_tenants=["acme"])
+
+
+@app.post("/extract")
+async def extract() -> dict[str, int]:
+    async def call() -> ToxinList:
+        return await parse_input_async("system", "text", ToxinList, "gpt-4o", fake_client)
+
+    # Completions made in child tasks count toward the request
+    results = await asyncio.gather(call(), call())
+    return {"results": len(results)}
+
+
+def test_cost_counts_cached_tokens_at_cached_price() -> None:
+    usage = TokenUsage.from_completion("gpt-4o", SimpleNamespace(**USAGE))
+
+    assert usage.cached_tokens == 400
+    # 600 uncached at $2.50, 400 cached at $1.25 and 100 output at $10 per 1M
+    assert round(usage.cost_usd, 6) == 0.003
+    assert usage.as_dict()["cached_ratio"] == 0.4
+
+
+def test_usage_is_reported_per_request_and_tenant() -> None:
+    response = TestClient(app).post("/extract", headers={"X-Tenant-ID": "acme"})
+
+    assert response.headers["x-token-usage-prompt"] == "2000"
+    assert response.headers["x-token-usage-completion"] == "200"
+    assert response.headers["x-token-usage-cached"] == "800"
+    assert response.headers["x-token-usage-cost-usd"] == "0.006000"
+    [totals] = [row for row in usage_stats() if row["tenant"] == "acme"]
+    assert totals["endpoint"] == "/extract"
+    assert totals["model"] == "gpt-4o"
+    assert totals["calls"] == 2
+
+
+def test_unknown_tenant_ids_are_counted_as_default() -> None:
+    TestClient(app).post("/extract", headers={"X-Tenant-ID": "made-up"})
+
+    tenants = {row["tenant"] for row in usage_stats()}
+    assert "made-up" not in tenants
+    assert "default" in tenants
+
+
+if __name__ == "__main__":
+    test_cost_counts_cached_tokens_at_cached_price()
+    test_usage_is_reported_per_request_and_tenant()
+    test_unknown_tenant_ids_are_counted_as_default()
+
+    print("All tests completed successfully!")
@@ -0,0 +1,64 @@
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pydantic_models import ToxinList  # noqa: E402
+from result_store import ResultStore  # noqa: E402
+from toxin_export import iter_export  # noqa: E402
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.ipc  # type: ignore  # noqa: E402
+import pyarrow.parquet  # type: ignore  # noqa: E402
+
+
+def make_store(extractions: int = 5, toxins: int = 4) -> ResultStore:
+    store = ResultStore(":memory:")
+    for e in range(extractions):
+        store.save_extraction(
+            f"page {e}",
+            ToxinList(
+                toxins=[
+                    ToxinList.Toxin(
+                        name=f"Toxin {t}",
+                        sources=["degreasers"],
+                        health_effects=["cancer"],
+                        related_diseases=["kidney cancer", "leukemia"],
+                        reference_context="not exported",
+                        relevant_regulations=["TSCA"],
+                    )
+                    for t in range(toxins)
+                ]
+            ),
+            model="gpt-4o",
+            source_url=f"https://example.com/{e % 2}",
+        )
+    return store
+
+
+def test_parquet_export_is_streamed_in_row_groups() -> None:
+    parts = list(iter_export(make_store(), "parquet", row_group_size=6))
+
+    data = io.BytesIO(b"".join(parts))
+    assert pyarrow.parquet.ParquetFile(data).metadata.num_row_groups == 4
+    table = pyarrow.parquet.read_table(data)
+    # One part per row group plus the footer
+    assert len(parts) == 5
+    assert table.num_rows == 20
+    assert table.column("id").to_pylist() == list(range(1, 21))
+    assert pa.types.is_dictionary(table.schema.field("name").type)
+    assert "reference_context" not in table.schema.names
+    assert table.slice(0, 1).to_pylist()[0]["related_diseases"] == ["kidney cancer", "leukemia"]
+
+
+def test_arrow_export_filters_by_source_url() -> None:
+    data = b"".join(iter_export(make_store(), "arrow", source_url="https://example.com/1"))
+
+    table = pyarrow.ipc.open_stream(data).read_all()
+    assert table.num_rows == 8
+    assert set(table.column("source_url").to_pylist()) == {"https://example.com/1"}
+    with pytest.raises(ValueError):
+        list(iter_export(make_store(), "csv"))
@@ -0,0 +1,60 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pydantic_models import ToxinList  # noqa: E402
+from toxin_merge import merge_records  # noqa: E402
+from toxin_record import StoredToxinRecord, ToxinRecord  # noqa: E402
+
+TOXIN = ToxinList.Toxin(
+    name="Benzene",
+    sources=["gasoline"],
+    health_effects=["leukemia"],
+    related_diseases=["leukemia"],
+    reference_context="Benzene exposure from gasoline.",
+    relevant_regulations=["Clean Air Act"],
+    cas_number="71-43-2",
+)
+
+
+def test_round_trip_and_interning() -> None:
+    record = ToxinRecord.from_model(TOXIN)
+    decoded = ToxinRecord(**json.loads(TOXIN.model_dump_json()))
+
+    assert record == decoded
+    assert record.to_model() == TOXIN
+    # Equal strings decoded separately share one object
+    assert decoded.related_diseases[0] is record.health_effects[0]
+    assert not hasattr(record, "__dict__")
+
+    stored = StoredToxinRecord(
+        **TOXIN.model_dump(), id=7, source_url="https://example.com", model="m", extracted_at=1.0
+    )
+    assert stored.to_model().model_dump() == {
+        **TOXIN.model_dump(),
+        "id": 7,
+        "source_url": "https://example.com",
+        "model": "m",
+        "extracted_at": 1.0,
+    }
+
+
+def test_merge_records_leaves_inputs_unchanged() -> None:
+    first = ToxinRecord("Trichloroethylene", sources=["degreasers"])
+    second = ToxinRecord("TCE", sources=["dry cleaning", "degreasers"], cas_number="79-01-6")
+
+    merged = merge_records([first, ToxinRecord("Benzene"), second])
+
+    assert [record.name for record in merged] == ["Trichloroethylene", "Benzene"]
+    assert merged[0].sources == ("degreasers", "dry cleaning")
+    assert merged[0].cas_number == "79-01-6"
+    assert first.sources == ("degreasers",)
+
+
+if __name__ == "__main__":
+    test_round_trip_and_interning()
+    test_merge_records_leaves_inputs_unchanged()
+
+    print("All tests completed successfully!")
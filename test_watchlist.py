@@ -0,0 +1,143 @@
+import asyncio
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("SCRAPER_API_KEY", "test")
+
+import watchlist  # noqa: E402
+from extractor_api import ConditionalFetchResult  # noqa: E402
+from pydantic_models import ToxinList  # noqa: E402
+from result_store import ResultStore  # noqa: E402
+from watchlist import WatchList, diff_toxins, fingerprint_text  # noqa: E402
+
+URL = "https://www.epa.gov/tsca"
+
+
+def make_toxin(name: str) -> ToxinList.Toxin:
+    return ToxinList.Toxin(
+        name=name,
+        sources=[],
+        health_effects=[],
+        related_diseases=[],
+        reference_context="",
+        relevant_regulations=[],
+    )
+
+
+class FakeSite:
+    """Serves pages by URL and answers conditional requests by ETag"""
+
+    def __init__(self) -> None:
+        self.pages: Dict[str, Tuple[str, str]] = {}
+        self.requests: List[Optional[str]] = []
+
+    def fetch(
+        self,
+        url: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        proxy: bool = True,
+    ) -> ConditionalFetchResult:
+        self.requests.append(etag)
+        if url not in self.pages:
+            raise ConnectionError(f"{url} is down")
+        html, current_etag = self.pages[url]
+        if etag == current_etag:
+            return ConditionalFetchResult(True, None, current_etag, None)
+        return ConditionalFetchResult(False, html, current_etag, None)
+
+
+class FakeExtractor:
+    """Treats every capitalised word of the page text as a toxin"""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def __call__(self, url: str, text: str) -> ToxinList:
+        self.calls += 1
+        return ToxinList(
+            toxins=[make_toxin(word) for word in text.split() if word.istitle() or word.isupper()]
+        )
+
+
+@pytest.fixture
+def site(monkeypatch: pytest.MonkeyPatch) -> FakeSite:
+    site = FakeSite()
+    monkeypatch.setattr(watchlist, "fetch_webpage_conditional", site.fetch)
+    return site
+
+
+def make_watch_list() -> Tuple[WatchList, FakeExtractor]:
+    store = ResultStore(":memory:")
+    store.add_watch(URL)
+    extractor = FakeExtractor()
+    return WatchList(store, extractor), extractor
+
+
+def test_fingerprint_ignores_whitespace() -> None:
+    assert fingerprint_text("Benzene  found\n") == fingerprint_text("Benzene found")
+    assert fingerprint_text("Benzene found") != fingerprint_text("Toluene found")
+
+
+def test_diff_toxins_matches_synonyms() -> None:
+    old = [make_toxin("TCE"), make_toxin("Benzene")]
+    new = [make_toxin("Trichloroethylene"), make_toxin("Toluene")]
+
+    assert diff_toxins(old, new) == (["Toluene"], ["Benzene"])
+
+
+def test_unchanged_pages_are_not_re_extracted(site: FakeSite) -> None:
+    watch_list, extractor = make_watch_list()
+
+    site.pages[URL] = ("<p>Benzene and TCE</p>", '"v1"')
+    first = asyncio.run(watch_list.check(URL))
+    assert first.status == "new"
+    assert sorted(first.added_toxins) == ["Benzene", "TCE"]
+
+    # The stored ETag is sent back and the 304 skips extraction
+    assert asyncio.run(watch_list.check(URL)).status == "not_modified"
+    assert site.requests == [None, '"v1"']
+
+    # A new ETag with the same text is not a content change either
+    site.pages[URL] = ("<p>Benzene   and TCE</p>", '"v2"')
+    assert asyncio.run(watch_list.check(URL)).status == "unchanged"
+    assert extractor.calls == 1
+
+
+def test_changed_page_reports_toxin_diff(site: FakeSite) -> None:
+    watch_list, extractor = make_watch_list()
+    site.pages[URL] = ("<p>Benzene and TCE</p>", '"v1"')
+    asyncio.run(watch_list.check(URL))
+
+    site.pages[URL] = ("<p>Trichloroethylene and Toluene</p>", '"v2"')
+    result = asyncio.run(watch_list.check(URL))
+
+    assert result.status == "changed"
+    assert result.added_toxins == ["Toluene"]
+    assert result.removed_toxins == ["Benzene"]
+    assert extractor.calls == 2
+    watch = watch_list.store.get_watch(URL)
+    assert watch is not None and watch.etag == '"v2"'
+    assert [toxin.name for toxin in watch.toxins] == ["Trichloroethylene", "Toluene"]
+
+
+def test_check_all_reports_failures_per_url(site: FakeSite) -> None:
+    watch_list, _ = make_watch_list()
+    watch_list.store.add_watch("https://example.com/down")
+    site.pages[URL] = ("<p>Benzene</p>", '"v1"')
+
+    results = {result.url: result for result in asyncio.run(watch_list.check_all())}
+
+    assert results[URL].status == "new"
+    assert results["https://example.com/down"].status == "error"
+
+
+if __name__ == "__main__":
+    test_fingerprint_ignores_whitespace()
+    test_diff_toxins_matches_synonyms()
+
+    print("All tests completed successfully!")
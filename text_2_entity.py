@@ -1,11 +1,27 @@
 # Parser function
-from pydantic import BaseModel
-
-from openai import OpenAI, AsyncOpenAI
+from pydantic import BaseModel, TypeAdapter
+
+from openai import NOT_GIVEN, OpenAI, AsyncOpenAI
+import openai
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import deque
+from openai.lib._pydantic import to_strict_json_schema
+from openai.types.chat import ChatCompletion, ChatCompletionMessageParam
+from openai.types.shared_params import ResponseFormatJSONSchema
 import os
-from typing import Type, TypeVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, AsyncGenerator, ContextManager, Generic, Type, TypeVar
 import dotenv
 
+from circuit_breaker import get_breaker
+from incremental_json import IncrementalArrayParser
+from token_usage import record_usage
+
 dotenv.load_dotenv()
 
 # Define a generic type variable
@@ -14,9 +30,167 @@ T = TypeVar("T", bound=BaseModel)
 
 OPENAI_KEY = os.environ["OPENAI_API_KEY"]
 
+logger = logging.getLogger(__name__)
+
+# Errors that indicate an OpenAI outage rather than a bad request
+OPENAI_OUTAGE_ERRORS = (
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+def is_openai_outage(error: BaseException) -> bool:
+    return isinstance(error, OPENAI_OUTAGE_ERRORS)
+
+
+# Large structured extractions routinely take well over 10 s, so only calls
+# far beyond the model's normal latency count as slow
+openai_breaker = get_breaker(
+    "openai",
+    is_openai_outage,
+    slow_call_seconds=float(os.environ.get("OPENAI_SLOW_CALL_SECONDS", "90")),
+)
+
+
+def openai_guard(timeout: float | None = None) -> ContextManager[None]:
+    """
+    Breaker guard for one OpenAI call. When the caller shortened the timeout,
+    e.g. to the time left before a request deadline, running into it is the
+    deadline passing rather than an outage and is not counted.
+
+    Args:
+        timeout (float | None): The timeout passed to the call, if any
+    """
+    return openai_breaker.guard(ignore=(openai.APITimeoutError,) if timeout is not None else ())
+
+
+@lru_cache(maxsize=None)
+def get_shared_async_client() -> AsyncOpenAI:
+    """
+    Return a process-wide AsyncOpenAI client so connections are pooled
+    across requests instead of being re-created on every call.
+    """
+    return AsyncOpenAI(api_key=OPENAI_KEY)
+
+
+@dataclass(frozen=True)
+class CompiledResponseFormat(Generic[T]):
+    """
+    A pydantic model compiled once into the strict JSON schema sent as
+    response_format and the validator used to parse the reply.
+    """
+
+    response_format: ResponseFormatJSONSchema
+    adapter: TypeAdapter[T]
+
+    def parse(self, completion: ChatCompletion) -> T:
+        """
+        Validate the first choice of a completion against the model.
+
+        Raises:
+            ValueError: If the model refused, was cut off, or returned no content.
+        """
+        choice = completion.choices[0]
+        if choice.finish_reason == "length":
+            raise ValueError("Failed to parse response: output was truncated.")
+        if choice.message.refusal:
+            raise ValueError(f"Model refused to respond: {choice.message.refusal}")
+        if not choice.message.content:
+            raise ValueError("Failed to parse response.")
+        return self.adapter.validate_json(choice.message.content)
+
+
+_compiled_formats: dict[type, CompiledResponseFormat[Any]] = {}
+
+
+def compile_response_format(response_format: Type[T]) -> CompiledResponseFormat[T]:
+    """
+    Return the cached response_format schema and validator for a model,
+    compiling them on first use.
+
+    Args:
+        response_format (Type[T]): The Pydantic model to compile.
+
+    Returns:
+        CompiledResponseFormat[T]: Schema and validator reused across calls.
+    """
+    compiled = _compiled_formats.get(response_format)
+    if compiled is None:
+        compiled = CompiledResponseFormat(
+            response_format={
+                "type": "json_schema",
+                "json_schema": {
+                    "schema": to_strict_json_schema(response_format),
+                    "name": response_format.__name__,
+                    "strict": True,
+                },
+            },
+            adapter=TypeAdapter(response_format),
+        )
+        _compiled_formats[response_format] = compiled
+    return compiled
+
+
+# OpenAI caches prompt prefixes of at least this many tokens
+MIN_CACHEABLE_PREFIX_TOKENS = 1024
+
+
+@dataclass(frozen=True)
+class PromptPrefix:
+    """
+    The fixed part of a prompt: system content followed by few-shot
+    (user, assistant) example turns. Messages are always laid out as this
+    prefix first and the variable content last, so every request with the
+    same prefix shares it byte for byte and OpenAI's automatic prompt caching
+    can serve it once it is long enough (MIN_CACHEABLE_PREFIX_TOKENS).
+    """
+
+    system_content: str
+    examples: tuple[tuple[str, str], ...] = ()
+
+    def messages(self, user_content: str) -> list[ChatCompletionMessageParam]:
+        """The chat messages for one request: the prefix, then user_content"""
+        messages: list[ChatCompletionMessageParam] = [
+            {"role": "system", "content": self.system_content}
+        ]
+        for example_user, example_assistant in self.examples:
+            messages.append({"role": "user", "content": example_user})
+            messages.append({"role": "assistant", "content": example_assistant})
+        messages.append({"role": "user", "content": user_content})
+        return messages
+
+    @property
+    def estimated_tokens(self) -> int:
+        """Rough token count (4 characters per token) of the prefix messages"""
+        chars = len(self.system_content) + sum(
+            len(user) + len(assistant) for user, assistant in self.examples
+        )
+        return chars // 4
+
+    def key(self) -> str:
+        """Stable identifier of the prefix, e.g. for caches of its results"""
+        return hashlib.sha256(
+            json.dumps([self.system_content, self.examples]).encode("utf-8")
+        ).hexdigest()
+
+    def stats(self) -> dict[str, int | bool]:
+        return {
+            "examples": len(self.examples),
+            "estimated_tokens": self.estimated_tokens,
+            "cacheable": self.estimated_tokens >= MIN_CACHEABLE_PREFIX_TOKENS,
+        }
+
+
+def _as_prefix(system_content: str | PromptPrefix) -> PromptPrefix:
+    if isinstance(system_content, PromptPrefix):
+        return system_content
+    return PromptPrefix(system_content)
+
 
 def parse_input(
-    system_content: str,
+    system_content: str | PromptPrefix,
     user_content: str,
     response_format: Type[T],
     model: str = "gpt-4o-2024-08-06",
@@ -27,7 +201,8 @@ def parse_input(
 
     Args:
         model (str): The OpenAI model to use for the completion.
-        system_content (str): Content for the system role.
+        system_content (str | PromptPrefix): Content for the system role, or
+          the system content and few-shot examples to send ahead of user_content.
         user_content (str): Content for the user query.
         response_format (Type[T]): The class type of the response
           format (a Pydantic model).
@@ -38,37 +213,38 @@ def parse_input(
     if client is None:
         client = OpenAI(api_key=OPENAI_KEY)
 
-    completion = client.beta.chat.completions.parse(
-        model=model,
-        messages=[
-            {"role": "system", "content": system_content},
-            {"role": "user", "content": user_content},
-        ],
-        response_format=response_format,
-    )
-
-    if completion.choices[0].message.parsed is None:
-        raise ValueError("Failed to parse response.")
+    compiled = compile_response_format(response_format)
+    with openai_guard():
+        completion = client.chat.completions.create(
+            model=model,
+            messages=_as_prefix(system_content).messages(user_content),
+            response_format=compiled.response_format,
+        )
 
-    return completion.choices[0].message.parsed
+    record_usage(model, completion.usage)
+    return compiled.parse(completion)
 
 
 async def parse_input_async(
-    system_content: str,
+    system_content: str | PromptPrefix,
     user_content: str,
     response_format: Type[T],
     model: str = "gpt-4o-2024-08-06",
     async_client: AsyncOpenAI | None = None,
+    timeout: float | None = None,
 ) -> T:
     """
     Generates a response from OpenAI based on the given inputs and model.
 
     Args:
         model (str): The OpenAI model to use for the completion.
-        system_content (str): Content for the system role.
+        system_content (str | PromptPrefix): Content for the system role, or
+          the system content and few-shot examples to send ahead of user_content.
         user_content (str): Content for the user query.
         response_format (Type[T]): The class type of the
           response format (a Pydantic model).
+        timeout (float | None): Request timeout in seconds, e.g. the time
+          left before the API request's deadline. None uses the client default.
 
     Returns:
         T: Parsed response from the completion in the type specified by response_format.
@@ -76,19 +252,216 @@ async def parse_input_async(
     if async_client is None:
         async_client = AsyncOpenAI(api_key=OPENAI_KEY)
 
-    completion = await async_client.beta.chat.completions.parse(
-        model=model,
-        messages=[
-            {"role": "system", "content": system_content},
-            {"role": "user", "content": user_content},
-        ],
-        response_format=response_format,
+    compiled = compile_response_format(response_format)
+    with openai_guard(timeout):
+        completion = await async_client.chat.completions.create(
+            model=model,
+            messages=_as_prefix(system_content).messages(user_content),
+            response_format=compiled.response_format,
+            timeout=NOT_GIVEN if timeout is None else timeout,
+        )
+
+    record_usage(model, completion.usage)
+    return compiled.parse(completion)
+
+
+@dataclass
+class HedgePolicy:
+    """
+    Opt-in policy for hedged requests: if a completion has not returned
+    after the configured percentile of recent latencies, a duplicate request
+    is fired (optionally to a fallback model) and the first to finish wins.
+    """
+
+    percentile: float = 95.0
+    initial_delay: float = 4.0
+    min_delay: float = 0.5
+    max_delay: float = 15.0
+    min_samples: int = 20
+    window: int = 500
+    fallback_model: str | None = None
+    requests: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+    cancelled_calls: int = 0
+    wasted_prompt_tokens_estimate: int = 0
+    latencies: deque[float] = field(default_factory=deque)
+
+    def delay(self) -> float:
+        """Seconds to wait for the first request before hedging"""
+        if len(self.latencies) < self.min_samples:
+            return self.initial_delay
+        ordered = sorted(self.latencies)
+        rank = min(int(len(ordered) * self.percentile / 100), len(ordered) - 1)
+        return min(max(ordered[rank], self.min_delay), self.max_delay)
+
+    def record_latency(self, latency: float) -> None:
+        self.latencies.append(latency)
+        while len(self.latencies) > self.window:
+            self.latencies.popleft()
+
+    def stats(self) -> dict[str, float | int]:
+        return {
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_rate": round(self.hedges / self.requests, 4) if self.requests else 0.0,
+            "hedge_wins": self.hedge_wins,
+            "cancelled_calls": self.cancelled_calls,
+            "wasted_prompt_tokens_estimate": self.wasted_prompt_tokens_estimate,
+            "current_delay_s": round(self.delay(), 3),
+        }
+
+
+async def parse_input_hedged_async(
+    system_content: str | PromptPrefix,
+    user_content: str,
+    response_format: Type[T],
+    policy: HedgePolicy,
+    model: str = "gpt-4o-2024-08-06",
+    async_client: AsyncOpenAI | None = None,
+    timeout: float | None = None,
+) -> T:
+    """
+    Hedged variant of parse_input_async that cuts tail latency by racing a
+    second request against a slow first one.
+
+    Args:
+        system_content (str | PromptPrefix): Content for the system role, or
+          the system content and few-shot examples to send ahead of user_content.
+        user_content (str): Content for the user query.
+        response_format (Type[T]): The class type of the
+          response format (a Pydantic model).
+        policy (HedgePolicy): Hedging delay, fallback model and counters.
+        model (str): The OpenAI model to use for the first request.
+        timeout (float | None): Overall time budget in seconds; the hedge
+          only gets whatever is left of it.
+
+    Returns:
+        T: Parsed response from whichever request finished first.
+
+    Raises:
+        Exception: The last error if every request fails.
+    """
+    policy.requests += 1
+    start = time.perf_counter()
+    primary = asyncio.ensure_future(
+        parse_input_async(
+            system_content, user_content, response_format, model, async_client, timeout
+        )
     )
+    pending: set[asyncio.Future[T]] = {primary}
+    try:
+        done, _ = await asyncio.wait(pending, timeout=policy.delay())
+        remaining = None if timeout is None else timeout - (time.perf_counter() - start)
+        if not done and (remaining is None or remaining > 0):
+            policy.hedges += 1
+            hedge_model = policy.fallback_model or model
+            logger.info(f"Hedging slow completion with a request to {hedge_model}")
+            hedge = asyncio.ensure_future(
+                parse_input_async(
+                    system_content,
+                    user_content,
+                    response_format,
+                    hedge_model,
+                    async_client,
+                    remaining,
+                )
+            )
+            pending.add(hedge)
+
+        error: BaseException | None = None
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                error = task.exception()
+                if error is None:
+                    # Only primary latencies set the delay: hedge wins are
+                    # faster by construction and would pull it down
+                    if task is primary:
+                        policy.record_latency(time.perf_counter() - start)
+                    else:
+                        policy.hedge_wins += 1
+                    return task.result()
+        assert error is not None
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+            policy.cancelled_calls += 1
+            policy.wasted_prompt_tokens_estimate += (
+                _as_prefix(system_content).estimated_tokens + len(user_content) // 4
+            )
+
+
+async def parse_input_stream_async(
+    system_content: str | PromptPrefix,
+    user_content: str,
+    response_format: Type[BaseModel],
+    array_key: str,
+    item_format: Type[T],
+    model: str = "gpt-4o-2024-08-06",
+    async_client: AsyncOpenAI | None = None,
+    timeout: float | None = None,
+) -> AsyncGenerator[T, None]:
+    """
+    Streams a structured response from OpenAI and yields each element of
+    one of its list fields as soon as the element's JSON object is complete.
 
-    if completion.choices[0].message.parsed is None:
-        raise ValueError("Failed to parse response.")
+    Args:
+        system_content (str | PromptPrefix): Content for the system role, or
+          the system content and few-shot examples to send ahead of user_content.
+        user_content (str): Content for the user query.
+        response_format (Type[BaseModel]): The Pydantic model the full
+          response conforms to.
+        array_key (str): Name of the top-level list field to stream.
+        item_format (Type[T]): The Pydantic model of the list elements.
+        model (str): The OpenAI model to use for the completion.
+        timeout (float | None): Request timeout in seconds. None uses the
+          client default.
 
-    return completion.choices[0].message.parsed
+    Yields:
+        T: Each parsed list element, in generation order.
+
+    Raises:
+        ValueError: If the model refuses, is cut off, or emits invalid JSON.
+    """
+    if async_client is None:
+        async_client = AsyncOpenAI(api_key=OPENAI_KEY)
+
+    compiled = compile_response_format(response_format)
+    item_adapter = compile_response_format(item_format).adapter
+    parser = IncrementalArrayParser(array_key)
+
+    # The guard spans the whole stream, so errors mid-stream reach the breaker
+    with openai_guard(timeout):
+        stream = await async_client.chat.completions.create(
+            model=model,
+            messages=_as_prefix(system_content).messages(user_content),
+            response_format=compiled.response_format,
+            stream=True,
+            # Usage arrives in a final chunk without choices
+            stream_options={"include_usage": True},
+            timeout=NOT_GIVEN if timeout is None else timeout,
+        )
+        # The stream only closes its HTTP response once read to the end; when
+        # iteration stops early (deadline, disconnect, refusal) close it here
+        # so OpenAI stops generating billed tokens
+        async with stream:
+            async for chunk in stream:
+                if chunk.usage is not None:
+                    record_usage(model, chunk.usage)
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                if choice.delta.refusal:
+                    raise ValueError(f"Model refused to respond: {choice.delta.refusal}")
+                if choice.delta.content:
+                    for item in parser.feed(choice.delta.content):
+                        yield item_adapter.validate_python(item)
+                if choice.finish_reason == "length":
+                    raise ValueError("Failed to parse response: output was truncated.")
 
 
 def get_openai_text_response(
@@ -118,14 +491,16 @@ def get_openai_text_response(
     if client is None:
         client = OpenAI(api_key=OPENAI_KEY)
 
-    response = client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-    )
+    with openai_guard():
+        response = client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+        )
 
+    record_usage(model, response.usage)
     if not response.choices[0].message.content:
         raise ValueError("Failed to generate response.")
 
@@ -182,10 +557,12 @@ def open_ai_sequence_response(
     if client is None:
         client = OpenAI()
 
-    response = client.chat.completions.create(
-        model=model, messages=messages  # type: ignore
-    )
+    with openai_guard():
+        response = client.chat.completions.create(
+            model=model, messages=messages  # type: ignore
+        )
 
+    record_usage(model, response.usage)
     if not response.choices[0].message.content:
         raise ValueError("Failed to generate response.")
 
@@ -219,15 +596,69 @@ async def get_openai_text_response_async(
     """
     if async_client is None:
         async_client = AsyncOpenAI()
-    response = await async_client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-    )
-
+    with openai_guard():
+        response = await async_client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+        )
+
+    record_usage(model, response.usage)
     if not response.choices[0].message.content:
         raise ValueError("Failed to generate response.")
 
     return response.choices[0].message.content
+
+
+async def open_ai_sequence_response_async(
+    messages: Iterable[ChatCompletionMessageParam | ChatMessageUser],
+    model: str = "gpt-4o",
+    async_client: AsyncOpenAI | None = None,
+    timeout: float | None = None,
+) -> list[ChatCompletionMessageParam | ChatMessageUser]:
+    """
+    Async variant of open_ai_sequence_response: continues a conversation
+    with the next assistant turn. The returned history can be passed back
+    in for the following turn. Messages are sent as given; keep long
+    conversations within a token budget with conversation.ConversationHistory.
+
+    Args:
+        messages: The conversation so far, as message dicts or ChatMessageUser.
+        model (str, optional): The model to use for generating the response.
+        Defaults to "gpt-4o".
+        async_client (AsyncOpenAI | None, optional): The async client for OpenAI.
+            Defaults to the process-wide shared client.
+        timeout (float | None): Request timeout in seconds. None uses the
+          client default.
+
+    Returns:
+        list: The messages followed by the assistant's reply as a ChatMessageUser.
+
+    Raises:
+        ValueError: If the response fails to generate.
+    """
+    if async_client is None:
+        async_client = get_shared_async_client()
+
+    history = list(messages)
+    payload: list[Any] = [
+        message.model_dump() if isinstance(message, ChatMessageUser) else message
+        for message in history
+    ]
+    with openai_guard(timeout):
+        response = await async_client.chat.completions.create(
+            model=model,
+            messages=payload,
+            timeout=NOT_GIVEN if timeout is None else timeout,
+        )
+
+    record_usage(model, response.usage)
+    if not response.choices[0].message.content:
+        raise ValueError("Failed to generate response.")
+
+    return [
+        *history,
+        ChatMessageUser(content=response.choices[0].message.content, role="assistant"),
+    ]
@@ -0,0 +1,194 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class ModelPrice(NamedTuple):
+    """USD per 1M tokens"""
+
+    input: float
+    cached_input: float
+    output: float
+
+
+# Update when OpenAI pricing changes; unknown models are reported at $0
+MODEL_PRICES = {
+    "gpt-4o": ModelPrice(2.50, 1.25, 10.00),
+    "gpt-4o-2024-08-06": ModelPrice(2.50, 1.25, 10.00),
+    "gpt-4o-mini": ModelPrice(0.15, 0.075, 0.60),
+}
+
+
+@dataclass
+class TokenUsage:
+    """Token counts of one or more completions"""
+
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    # Prompt tokens served from OpenAI's prompt cache, included in prompt_tokens
+    cached_tokens: int = 0
+    cost_usd: float = 0.0
+
+    def add(self, other: "TokenUsage") -> None:
+        self.calls += other.calls
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.cached_tokens += other.cached_tokens
+        self.cost_usd += other.cost_usd
+
+    @classmethod
+    def from_completion(cls, model: str, usage: Any) -> "TokenUsage":
+        """
+        Read the usage of one completion.
+
+        Args:
+            model (str): Model the completion was requested from
+            usage (CompletionUsage): `completion.usage` as returned by the API
+        """
+        # Older openai releases keep prompt_tokens_details as an untyped dict
+        details = getattr(usage, "prompt_tokens_details", None)
+        if isinstance(details, dict):
+            cached = details.get("cached_tokens") or 0
+        else:
+            cached = getattr(details, "cached_tokens", None) or 0
+        price = MODEL_PRICES.get(model, ModelPrice(0.0, 0.0, 0.0))
+        return cls(
+            calls=1,
+            prompt_tokens=usage.prompt_tokens,
+            completion_tokens=usage.completion_tokens,
+            cached_tokens=cached,
+            cost_usd=(
+                (usage.prompt_tokens - cached) * price.input
+                + cached * price.cached_input
+                + usage.completion_tokens * price.output
+            )
+            / 1_000_000,
+        )
+
+    def as_dict(self) -> dict[str, float | int]:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cached_ratio": (
+                round(self.cached_tokens / self.prompt_tokens, 4) if self.prompt_tokens else 0.0
+            ),
+            "cost_usd": round(self.cost_usd, 6),
+        }
+
+
+@dataclass
+class UsageScope:
+    """What the completions of one API request are attributed to"""
+
+    endpoint: str
+    tenant: str
+    usage: TokenUsage
+
+
+_current_scope: ContextVar[Optional[UsageScope]] = ContextVar("usage_scope", default=None)
+_totals: Dict[Tuple[str, str, str], TokenUsage] = {}
+_totals_lock = threading.Lock()
+
+
+@contextmanager
+def track_usage(endpoint: str, tenant: str = "default") -> Iterator[TokenUsage]:
+    """
+    Attribute every completion made inside the block, including in tasks
+    and threads started from it, to an endpoint and tenant.
+
+    Args:
+        endpoint (str): e.g. the route path "/parse/text"
+        tenant (str): Tenant the request is made for
+
+    Yields:
+        TokenUsage: Running total of the block's completions
+    """
+    scope = UsageScope(endpoint, tenant, TokenUsage())
+    token = _current_scope.set(scope)
+    try:
+        yield scope.usage
+    finally:
+        _current_scope.reset(token)
+
+
+def record_usage(model: str, usage: Any) -> None:
+    """
+    Record the usage of a completion against the current scope (see
+    track_usage) and the process-wide totals. Completions outside any scope,
+    e.g. from CLI tools, are attributed to the endpoint "-".
+
+    Args:
+        model (str): Model the completion was requested from
+        usage (Optional[CompletionUsage]): `completion.usage`, may be None
+    """
+    if usage is None:
+        return
+    tokens = TokenUsage.from_completion(model, usage)
+    scope = _current_scope.get()
+    key = (scope.endpoint, model, scope.tenant) if scope else ("-", model, "default")
+    with _totals_lock:
+        # Scopes are shared with worker threads, e.g. asyncio.to_thread
+        if scope is not None:
+            scope.usage.add(tokens)
+        _totals.setdefault(key, TokenUsage()).add(tokens)
+
+
+def usage_stats() -> List[dict[str, float | int | str]]:
+    """Token usage and cost per endpoint, model and tenant since startup"""
+    with _totals_lock:
+        totals = sorted(_totals.items())
+        return [
+            {"endpoint": endpoint, "model": model, "tenant": tenant, **usage.as_dict()}
+            for (endpoint, model, tenant), usage in totals
+        ]
+
+
+def tenant_tokens(tenant: str) -> int:
+    """Prompt plus completion tokens used by a tenant since startup"""
+    with _totals_lock:
+        return sum(
+            usage.prompt_tokens + usage.completion_tokens
+            for (_, _, key_tenant), usage in _totals.items()
+            if key_tenant == tenant
+        )
+
+
+class UsageMiddleware:
+    """
+    Tracks the token usage of every HTTP request by path and tenant (as
+    set in scope["state"] by TenantMiddleware, else "default") and, if
+    add_headers is set, reports it in
+    X-Token-Usage-* response headers. Streamed responses start before their
+    completions finish, so their usage is only counted in the totals.
+    """
+
+    def __init__(self, app: ASGIApp, add_headers: bool = True) -> None:
+        self.app = app
+        self.add_headers = add_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        tenant = scope.get("state", {}).get("tenant", "default")
+
+        with track_usage(scope["path"], tenant) as usage:
+
+            async def send_with_usage(message: Message) -> None:
+                if message["type"] == "http.response.start" and self.add_headers and usage.calls:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-Token-Usage-Prompt"] = str(usage.prompt_tokens)
+                    headers["X-Token-Usage-Completion"] = str(usage.completion_tokens)
+                    headers["X-Token-Usage-Cached"] = str(usage.cached_tokens)
+                    headers["X-Token-Usage-Cost-USD"] = f"{usage.cost_usd:.6f}"
+                await send(message)
+
+            await self.app(scope, receive, send_with_usage)
@@ -0,0 +1,64 @@
+import copy
+from typing import Dict, Iterable, List
+
+from chemical_index import normalize_toxin_name
+from pydantic_models import ToxinList
+from toxin_record import LIST_FIELDS, ToxinRecord
+
+
+def merge_records(records: Iterable[ToxinRecord]) -> List[ToxinRecord]:
+    """
+    Merge toxin records that refer to the same chemical, e.g. when results
+    for several blocks of one document are combined.
+
+    Toxins are matched by normalized name. List fields are unioned in order
+    of first appearance, distinct reference contexts are concatenated and the
+    first known CAS number is kept. The input records are not modified.
+
+    Args:
+        records (Iterable[ToxinRecord]): Toxins to merge, in document order
+
+    Returns:
+        List[ToxinRecord]: One record per distinct chemical
+    """
+    merged: Dict[str, ToxinRecord] = {}
+    # Names repeat across blocks; normalize each distinct name once
+    keys: Dict[str, str] = {}
+    for record in records:
+        key = keys.get(record.name)
+        if key is None:
+            key = keys[record.name] = normalize_toxin_name(record.name)
+        existing = merged.get(key)
+        if existing is None:
+            merged[key] = copy.copy(record)
+            continue
+
+        for field in LIST_FIELDS:
+            values = getattr(existing, field)
+            added = tuple(value for value in getattr(record, field) if value not in values)
+            if added:
+                setattr(existing, field, values + added)
+        context = record.reference_context
+        if context and context not in existing.reference_context:
+            existing.reference_context = (
+                f"{existing.reference_context}\n{context}"
+                if existing.reference_context
+                else context
+            )
+        if not existing.cas_number:
+            existing.cas_number = record.cas_number
+    return list(merged.values())
+
+
+def merge_toxins(toxins: Iterable[ToxinList.Toxin]) -> List[ToxinList.Toxin]:
+    """
+    Merge toxins that refer to the same chemical, see merge_records.
+
+    Args:
+        toxins (Iterable[ToxinList.Toxin]): Toxins to merge, in document order
+
+    Returns:
+        List[ToxinList.Toxin]: One toxin per distinct chemical
+    """
+    records = merge_records(ToxinRecord.from_model(toxin) for toxin in toxins)
+    return [record.to_model() for record in records]
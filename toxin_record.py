@@ -0,0 +1,118 @@
+import sys
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from pydantic_models import StoredToxin, ToxinList
+
+LIST_FIELDS = ("sources", "health_effects", "related_diseases", "relevant_regulations")
+
+
+def _intern_all(values: Iterable[str]) -> Tuple[str, ...]:
+    return tuple(sys.intern(value) for value in values)
+
+
+class ToxinRecord:
+    """
+    Compact in-memory form of ToxinList.Toxin for code that holds many
+    toxins at once (merging, deduplication, exports).
+
+    Slots instead of a pydantic model with a __dict__, tuples instead of
+    lists, and interned strings: names and list items like "cancer" or
+    "TSCA" repeat across thousands of toxins and are stored once. Convert
+    with to_model() only at the API boundary.
+    """
+
+    __slots__ = (
+        "name",
+        "sources",
+        "health_effects",
+        "related_diseases",
+        "reference_context",
+        "relevant_regulations",
+        "cas_number",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        sources: Iterable[str] = (),
+        health_effects: Iterable[str] = (),
+        related_diseases: Iterable[str] = (),
+        reference_context: str = "",
+        relevant_regulations: Iterable[str] = (),
+        cas_number: Optional[str] = None,
+    ) -> None:
+        self.name = sys.intern(name)
+        self.sources = _intern_all(sources)
+        self.health_effects = _intern_all(health_effects)
+        self.related_diseases = _intern_all(related_diseases)
+        # Contexts are quotes from the page and rarely repeat, so not interned
+        self.reference_context = reference_context
+        self.relevant_regulations = _intern_all(relevant_regulations)
+        self.cas_number = sys.intern(cas_number) if cas_number else None
+
+    @classmethod
+    def from_model(cls, toxin: ToxinList.Toxin) -> "ToxinRecord":
+        return cls(
+            toxin.name,
+            toxin.sources,
+            toxin.health_effects,
+            toxin.related_diseases,
+            toxin.reference_context,
+            toxin.relevant_regulations,
+            toxin.cas_number,
+        )
+
+    def to_model(self) -> ToxinList.Toxin:
+        return ToxinList.Toxin.model_construct(**self._model_fields())
+
+    def _model_fields(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "sources": list(self.sources),
+            "health_effects": list(self.health_effects),
+            "related_diseases": list(self.related_diseases),
+            "reference_context": self.reference_context,
+            "relevant_regulations": list(self.relevant_regulations),
+            "cas_number": self.cas_number,
+        }
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ToxinRecord):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in ToxinRecord.__slots__)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(name={self.name!r}, cas_number={self.cas_number!r})"
+
+
+class StoredToxinRecord(ToxinRecord):
+    """
+    ToxinRecord of a stored toxin, the compact form of StoredToxin. Built
+    like StoredToxin from the stored toxin JSON plus the extraction columns.
+    """
+
+    __slots__ = ("id", "source_url", "model", "extracted_at")
+
+    def __init__(
+        self,
+        *,
+        id: int,
+        source_url: Optional[str],
+        model: str,
+        extracted_at: float,
+        **toxin: Any,
+    ) -> None:
+        super().__init__(**toxin)
+        self.id = id
+        self.source_url = sys.intern(source_url) if source_url else None
+        self.model = sys.intern(model)
+        self.extracted_at = extracted_at
+
+    def to_model(self) -> StoredToxin:
+        return StoredToxin.model_construct(
+            **self._model_fields(),
+            id=self.id,
+            source_url=self.source_url,
+            model=self.model,
+            extracted_at=self.extracted_at,
+        )
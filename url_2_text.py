@@ -1,21 +1,71 @@
 # File: EXP/url_to_text.py
 
+import logging
+import os
 from typing import Optional, Dict
-from bs4thingy import extract_text_from_html
-from extractor_api import fetch_webpage
+from extractor_api import (
+    MARKUP_CONTENT_TYPES,
+    DownloadTooLarge,
+    FetchedDocument,
+    ScrapingError,
+    UnsupportedContentType,
+    fetch_document,
+)
+from deadline import Deadline, DeadlineExceeded
+from html_pool import html_to_text
+from pdf_text import extract_text_from_pdf
 import dotenv
 
 dotenv.load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Content types whose body is already plain text and is passed through as is
+PASSTHROUGH_CONTENT_TYPES = (
+    "text/plain",
+    "text/csv",
+    "text/markdown",
+    "application/json",
+    "application/ld+json",
+)
+# Parse HTML while it downloads instead of holding the whole page in memory
+INCREMENTAL_HTML = os.environ.get("INCREMENTAL_HTML", "false").lower() == "true"
+
+
+def document_to_text(document: FetchedDocument) -> str:
+    """
+    Convert a fetched document to text according to its content type:
+    PDFs are extracted page by page, plain text and JSON are passed
+    through and HTML/XML is cleaned with extract_text_from_html, in a
+    process pool for large pages (see html_pool.html_to_text).
+
+    Raises:
+        ScrapingError: If the content type cannot be converted to text
+    """
+    if document.is_pdf and document.path is not None:
+        return extract_text_from_pdf(document.path)
+    if document.text is None:
+        raise ScrapingError(f"Unsupported content type {document.content_type} for {document.url}")
+    if document.extracted or document.content_type in PASSTHROUGH_CONTENT_TYPES:
+        return document.text.strip()
+    if document.content_type.startswith("text/") or document.content_type in MARKUP_CONTENT_TYPES:
+        return html_to_text(document.text)
+    raise ScrapingError(f"Unsupported content type {document.content_type} for {document.url}")
+
+
 def url_to_text(
     url: str,
     scraper_api_key: Optional[str] = None,
     custom_headers: Optional[Dict[str, str]] = None,
     use_proxy: bool = True,
-    timeout: int = 30
+    timeout: int = 30,
+    fallback_to_direct: bool = True,
+    deadline: Optional[Deadline] = None,
+    incremental_html: bool = INCREMENTAL_HTML
 ) -> str:
     """
-    Convert a webpage URL directly to cleaned text content.
+    Convert a webpage URL directly to cleaned text content. HTML pages,
+    PDFs, plain text and JSON are supported (see document_to_text).
     
     Args:
         url (str): The URL of the webpage to extract text from
@@ -23,28 +73,54 @@ def url_to_text(
         custom_headers (Optional[Dict[str, str]]): Custom headers for the request
         use_proxy (bool): Whether to use ScraperAPI proxy
         timeout (int): Request timeout in seconds
+        fallback_to_direct (bool): Retry with a direct request if the proxied
+            fetch fails or its circuit breaker is open
+        deadline (Optional[Deadline]): Request deadline that bounds the fetch
+        incremental_html (bool): Extract text from HTML while it downloads
         
     Returns:
         str: Cleaned text content from the webpage
         
     Raises:
         ScrapingError: If fetching the webpage fails
+        DeadlineExceeded: If the deadline passes before the page is fetched
         Exception: If text extraction fails
     """
     try:
-        # Fetch HTML content
-        html_content = fetch_webpage(
-            target_url=url,
-            custom_headers=custom_headers,
-            proxy=use_proxy,
-            timeout=timeout
-        )
+        # Fetch the document
+        try:
+            document = fetch_document(
+                target_url=url,
+                custom_headers=custom_headers,
+                proxy=use_proxy,
+                timeout=timeout,
+                deadline=deadline,
+                incremental_html=incremental_html
+            )
+        except (UnsupportedContentType, DownloadTooLarge):
+            # The document itself is the problem, a direct fetch gets the same
+            raise
+        except ScrapingError as e:
+            if not (use_proxy and fallback_to_direct):
+                raise
+            if deadline is not None:
+                deadline.check()
+            logger.warning(f"Proxied fetch failed ({e}), falling back to direct request")
+            document = fetch_document(
+                target_url=url,
+                custom_headers=custom_headers,
+                proxy=False,
+                timeout=timeout,
+                deadline=deadline,
+                incremental_html=incremental_html
+            )
         
         # Extract and clean text
-        text_content = extract_text_from_html(html_content)
-        
-        return text_content
+        with document:
+            return document_to_text(document)
         
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise Exception(f"Failed to process URL {url}: {str(e)}")
 
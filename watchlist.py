@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+import logging
+import re
+from typing import Awaitable, Callable, List, Tuple
+
+from chemical_index import normalize_toxin_name
+from extractor_api import fetch_webpage_conditional
+from html_pool import html_to_text
+from pydantic_models import ToxinList, WatchCheckResult
+from result_store import ResultStore
+
+logger = logging.getLogger(__name__)
+
+# Extraction callback: (url, page text) -> extracted toxins
+ExtractFn = Callable[[str, str], Awaitable[ToxinList]]
+
+
+def fingerprint_text(text: str) -> str:
+    """
+    Content fingerprint of extracted page text. Whitespace is normalized so
+    markup-only changes do not count as content changes.
+    """
+    normalized = re.sub(r"\s+", " ", text).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def diff_toxins(
+    old: List[ToxinList.Toxin], new: List[ToxinList.Toxin]
+) -> Tuple[List[str], List[str]]:
+    """
+    Compare two toxin lists by normalized name.
+
+    Args:
+        old (List[ToxinList.Toxin]): Toxins from the previous extraction
+        new (List[ToxinList.Toxin]): Toxins from the new extraction
+
+    Returns:
+        Tuple[List[str], List[str]]: Names added and names removed
+    """
+    old_names = {normalize_toxin_name(t.name): t.name for t in old}
+    new_names = {normalize_toxin_name(t.name): t.name for t in new}
+    added = [name for key, name in new_names.items() if key not in old_names]
+    removed = [name for key, name in old_names.items() if key not in new_names]
+    return added, removed
+
+
+class WatchList:
+    """
+    Re-crawls watched regulatory URLs and only re-runs extraction on pages
+    whose text actually changed.
+
+    Each check sends a conditional request using the stored ETag and
+    Last-Modified validators. A 304, or a page whose extracted text has the
+    same fingerprint as last time, is skipped without calling the model.
+    """
+
+    def __init__(
+        self,
+        store: ResultStore,
+        extract: ExtractFn,
+        proxy: bool = True,
+        concurrency: int = 4,
+    ) -> None:
+        self.store = store
+        self.extract = extract
+        self.proxy = proxy
+        self.concurrency = concurrency
+
+    async def check(self, url: str) -> WatchCheckResult:
+        """
+        Check one watched URL for changes.
+
+        Args:
+            url (str): A URL on the watch list
+
+        Returns:
+            WatchCheckResult: "not_modified", "unchanged", "changed" or "new",
+                with the toxins added/removed for changed pages
+
+        Raises:
+            KeyError: If the URL is not being watched
+        """
+        watch = await asyncio.to_thread(self.store.get_watch, url)
+        if watch is None:
+            raise KeyError(f"{url} is not on the watch list")
+
+        fetched = await asyncio.to_thread(
+            fetch_webpage_conditional,
+            url,
+            etag=watch.etag,
+            last_modified=watch.last_modified,
+            proxy=self.proxy,
+        )
+        if fetched.not_modified or fetched.html is None:
+            await asyncio.to_thread(
+                self.store.update_watch, url, fetched.etag, fetched.last_modified
+            )
+            return WatchCheckResult(url=url, status="not_modified")
+
+        text = await asyncio.to_thread(html_to_text, fetched.html)
+        fingerprint = fingerprint_text(text)
+        if fingerprint == watch.fingerprint:
+            await asyncio.to_thread(
+                self.store.update_watch, url, fetched.etag, fetched.last_modified
+            )
+            return WatchCheckResult(url=url, status="unchanged")
+
+        logger.info(f"Content of {url} changed, re-extracting toxins")
+        toxins = await self.extract(url, text)
+        added, removed = diff_toxins(watch.toxins, toxins.toxins)
+        await asyncio.to_thread(
+            self.store.update_watch,
+            url,
+            fetched.etag,
+            fetched.last_modified,
+            fingerprint,
+            toxins,
+        )
+        return WatchCheckResult(
+            url=url,
+            status="new" if watch.fingerprint is None else "changed",
+            added_toxins=added,
+            removed_toxins=removed,
+        )
+
+    async def check_all(self) -> List[WatchCheckResult]:
+        """
+        Check every watched URL, a few at a time. Failures are reported per
+        URL instead of aborting the run.
+
+        Returns:
+            List[WatchCheckResult]: One result per watched URL
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def check_one(url: str) -> WatchCheckResult:
+            async with semaphore:
+                try:
+                    return await self.check(url)
+                except Exception as e:
+                    logger.error(f"Failed to check {url}: {e}")
+                    return WatchCheckResult(url=url, status="error", error=str(e))
+
+        watches = await asyncio.to_thread(self.store.list_watches)
+        return list(await asyncio.gather(*(check_one(watch.url) for watch in watches)))
+
+
+# Example usage / scheduled run
+if __name__ == "__main__":
+    import argparse
+
+    from router import extract_page_toxins
+    from result_store import get_result_store
+
+    parser = argparse.ArgumentParser(description="Manage and re-check watched URLs")
+    parser.add_argument("command", choices=["add", "remove", "list", "check"])
+    parser.add_argument("urls", nargs="*")
+    args = parser.parse_args()
+
+    store = get_result_store()
+    if args.command == "add":
+        for url in args.urls:
+            store.add_watch(url)
+    elif args.command == "remove":
+        for url in args.urls:
+            store.remove_watch(url)
+    elif args.command == "list":
+        for watch in store.list_watches():
+            print(watch.url, watch.last_changed)
+    else:
+        watch_list = WatchList(store, extract_page_toxins)
+        for result in asyncio.run(watch_list.check_all()):
+            print(result.model_dump_json())